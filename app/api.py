@@ -0,0 +1,410 @@
+"""Headless HTTP API for the analysis graph.
+
+Usage::
+
+    python run_api.py --port 8000 --workers 8 --queue-size 32
+
+Endpoints:
+- ``POST /v1/analyze``: run a query and return the final state;
+- ``POST /v1/analyze/stream``: the same run as server-sent events (node updates and LLM tokens);
+- ``POST /v1/jobs``, then ``GET /v1/jobs/{id}`` to poll or ``GET /v1/jobs/{id}/events`` to follow;
+- ``GET /healthz`` (process is up) and ``GET /readyz`` (workers started, queue not full).
+
+Connections are handled on one asyncio event loop. Graph runs go through a
+bounded queue to a fixed pool of worker threads; when the queue is full new
+work is rejected with 429 and a ``Retry-After`` header. Only requests that
+name a ``run_id`` are checkpointed; anonymous runs leave nothing on disk.
+Synchronous runs are only kept as jobs if they outlive ``API_SYNC_TIMEOUT``.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from config import (
+    API_HOST,
+    API_JOB_TTL,
+    API_MAX_JOB_EVENTS,
+    API_MAX_JOBS,
+    API_PORT,
+    API_QUEUE_SIZE,
+    API_SYNC_TIMEOUT,
+    API_WORKERS,
+    CHECKPOINT_ENABLED,
+    CHECKPOINT_RETENTION,
+)
+from .batch import RESULT_FIELDS, result_fields
+from .graph.builder import build_graph
+from .graph.checkpoint import get_checkpointer, run_config, stream_resumable
+from .graph.state import to_jsonable
+from .utils.market_data import request_scope
+from .observability.monitoring import record_api_job, record_api_queue_depth, start_metrics_server
+from .observability.tracing import set_attributes, span
+
+
+class AnalyzeRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=200)
+    run_id: Optional[str] = Field(None, max_length=128, description="resume or name a checkpointed run")
+
+
+class QueueFull(Exception):
+    """Raised by :meth:`JobQueue.submit` when no more work can be accepted."""
+
+
+class Job:
+    """One graph run and the events it has streamed so far.
+
+    Up to ``max_events`` recent events are kept while the job runs, so
+    followers can attach late; they are dropped once the job is done and no
+    follower is attached. A job belongs to the event loop; worker threads
+    publish to it through ``loop.call_soon_threadsafe``.
+    """
+
+    def __init__(self, query: str, run_id: Optional[str] = None, max_events: int = API_MAX_JOB_EVENTS):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.run_id = run_id
+        self.status = "queued"
+        self.events: Deque[Tuple[str, Any]] = deque(maxlen=max_events)
+        self.published = 0
+        self.followers = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def publish(self, kind: str, payload: Any) -> None:
+        if self.events.maxlen:
+            self.events.append((kind, payload))
+        self.published += 1
+        self._notify()
+
+    def finish(self, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        self.result, self.error = result, error
+        self.status = "failed" if error else "succeeded"
+        self.finished_at = time.time()
+        self._notify()
+        self._release()
+
+    def attach(self) -> None:
+        self.followers += 1
+
+    def detach(self) -> None:
+        self.followers -= 1
+        self._release()
+
+    def _release(self) -> None:
+        if self.done and not self.followers:
+            self.events.clear()
+
+    def _notify(self) -> None:
+        # Wake everyone waiting on the current event; later waiters get a fresh one.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        while not self.done:
+            await self._changed.wait()
+
+    async def follow(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Retained events, then new ones until the job is done; call :meth:`attach` first."""
+        index = 0
+        while True:
+            # Events older than the retained window are skipped.
+            index = max(index, self.published - len(self.events))
+            while index < self.published:
+                yield self.events[index - (self.published - len(self.events))]
+                index += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "run_id": self.run_id,
+            "query": self.query,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded queue of graph runs served by a fixed pool of worker threads."""
+
+    def __init__(
+        self,
+        workers: int = API_WORKERS,
+        maxsize: int = API_QUEUE_SIZE,
+        job_ttl: float = API_JOB_TTL,
+        max_jobs: int = API_MAX_JOBS,
+        graph=None,
+        checkpointed_graph=None,
+    ):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.job_ttl = job_ttl
+        self.max_jobs = max_jobs
+        # Anonymous jobs run on ``graph``; jobs with a client run_id on ``checkpointed_graph``.
+        self.graph = graph
+        self.checkpointed_graph = checkpointed_graph
+        self.running = 0
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._purged_at = 0.0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api")
+        if self.graph is None:
+            self.graph = await self._loop.run_in_executor(self._executor, build_graph)
+            if CHECKPOINT_ENABLED:
+                self.checkpointed_graph = await self._loop.run_in_executor(
+                    self._executor, build_graph, get_checkpointer()
+                )
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def ready(self) -> bool:
+        return self._queue is not None and not self._queue.full()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.maxsize,
+        }
+
+    def submit(self, query: str, run_id: Optional[str] = None, track: bool = True) -> Job:
+        """Queue a run. ``track=False`` keeps it out of the job table (see :meth:`track`).
+
+        ``run_id`` is dropped when checkpointing is off, since nothing would be saved under it.
+        """
+        if self._queue is None:
+            raise QueueFull("workers are not running")
+        self._prune()
+        if self.checkpointed_graph is None:
+            run_id = None
+        job = Job(query, run_id, max_events=API_MAX_JOB_EVENTS if track else 0)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            record_api_job("rejected")
+            raise QueueFull(f"{self.running} running and {self.maxsize} queued") from None
+        if track:
+            self.track(job)
+        record_api_queue_depth(self._queue.qsize())
+        return job
+
+    def track(self, job: Job) -> None:
+        """Make ``job`` reachable under ``/v1/jobs/{id}``."""
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        now = time.time()
+        cutoff = now - self.job_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished_at < cutoff:
+                del self._jobs[job_id]
+        # Past max_jobs, the oldest finished jobs go first (running ones are bounded by the queue).
+        excess = len(self._jobs) - self.max_jobs + 1
+        if excess > 0:
+            finished = sorted((job for job in self._jobs.values() if job.done), key=lambda job: job.finished_at)
+            for job in finished[:excess]:
+                del self._jobs[job.id]
+        # Checkpointed runs past CHECKPOINT_RETENTION go on the same cadence, off the event loop.
+        purge = getattr(getattr(self.checkpointed_graph, "checkpointer", None), "purge_older_than", None)
+        if purge is not None and now - self._purged_at >= self.job_ttl:
+            self._purged_at = now
+            self._executor.submit(purge, CHECKPOINT_RETENTION)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            record_api_queue_depth(self._queue.qsize())
+            job.status = "running"
+            self.running += 1
+            try:
+                result = await self._loop.run_in_executor(
+                    self._executor, contextvars.copy_context().run, self._run, job
+                )
+                job.finish(result, None)
+                record_api_job("ok")
+            except Exception as exc:
+                job.finish(None, f"{type(exc).__name__}: {exc}")
+                record_api_job("error")
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    def _run(self, job: Job) -> Dict[str, Any]:
+        """Stream the graph for ``job`` on a worker thread, publishing events to the loop."""
+        def publish(kind: str, payload: Any) -> None:
+            self._loop.call_soon_threadsafe(job.publish, kind, payload)
+
+        state: Dict[str, Any] = {"user_input": job.query}
+        checkpointed = job.run_id is not None and self.checkpointed_graph is not None
+        graph = self.checkpointed_graph if checkpointed else self.graph
+        with request_scope(), span("query", new_trace=True, user_input=job.query, mode="api"):
+            if checkpointed:
+                events = stream_resumable(graph, dict(state), job.run_id, stream_mode=["updates", "custom"])
+            else:
+                events = graph.stream(dict(state), stream_mode=["updates", "custom"])
+            for mode, chunk in events:
+                if mode == "custom":
+                    publish("token", chunk)
+                    continue
+                for node, update in chunk.items():
+                    update = {field: value for field, value in (update or {}).items() if field in RESULT_FIELDS}
+                    if update.get("ticker"):
+                        set_attributes(ticker=update["ticker"])
+                    state.update(update)
+                    publish("update", {"node": node, **to_jsonable(update)})
+            if checkpointed:
+                state = dict(graph.get_state(run_config(job.run_id)).values)
+        return result_fields(state)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _event_stream(job: Job) -> StreamingResponse:
+    # Attach now, not when the body starts, so a fast run cannot drop its events first.
+    job.attach()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield _sse("job", {"job_id": job.id, "run_id": job.run_id})
+            async for kind, payload in job.follow():
+                yield _sse(kind, payload)
+            yield _sse("error" if job.error else "done", job.to_dict())
+        finally:
+            job.detach()
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def create_app(jobs: Optional[JobQueue] = None) -> FastAPI:
+    jobs = jobs or JobQueue()
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        await jobs.start()
+        try:
+            yield
+        finally:
+            await jobs.stop()
+
+    app = FastAPI(title="Stock Analyzer API", lifespan=lifespan)
+    app.state.jobs = jobs
+
+    @app.exception_handler(QueueFull)
+    async def queue_full(_: Request, exc: QueueFull) -> JSONResponse:
+        return JSONResponse(
+            {"detail": f"server is saturated: {exc}"}, status_code=429, headers={"Retry-After": "1"}
+        )
+
+    def _job(job_id: str) -> Job:
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"unknown job {job_id!r}")
+        return job
+
+    @app.get("/healthz")
+    async def healthz() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz() -> JSONResponse:
+        body = {"ready": jobs.ready, **jobs.stats()}
+        return JSONResponse(body, status_code=200 if jobs.ready else 503)
+
+    @app.post("/v1/analyze")
+    async def analyze(request: AnalyzeRequest) -> JSONResponse:
+        job = jobs.submit(request.query.strip(), request.run_id, track=False)
+        try:
+            await asyncio.wait_for(asyncio.shield(job.wait()), API_SYNC_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Still running: hand the client the job to poll instead of holding the connection.
+            jobs.track(job)
+            return JSONResponse(job.to_dict(), status_code=202, headers={"Location": f"/v1/jobs/{job.id}"})
+        return JSONResponse(job.to_dict(), status_code=502 if job.error else 200)
+
+    @app.post("/v1/analyze/stream")
+    async def analyze_stream(request: AnalyzeRequest) -> StreamingResponse:
+        return _event_stream(jobs.submit(request.query.strip(), request.run_id))
+
+    @app.post("/v1/jobs", status_code=202)
+    async def submit_job(request: AnalyzeRequest) -> JSONResponse:
+        job = jobs.submit(request.query.strip(), request.run_id)
+        return JSONResponse(job.to_dict(), status_code=202, headers={"Location": f"/v1/jobs/{job.id}"})
+
+    @app.get("/v1/jobs/{job_id}")
+    async def get_job(job_id: str) -> Dict[str, Any]:
+        return _job(job_id).to_dict()
+
+    @app.get("/v1/jobs/{job_id}/events")
+    async def job_events(job_id: str) -> StreamingResponse:
+        return _event_stream(_job(job_id))
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the analysis graph over HTTP.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=API_WORKERS, help="concurrent graph runs")
+    parser.add_argument("-q", "--queue-size", type=int, default=API_QUEUE_SIZE, help="queued runs before 429")
+    args = parser.parse_args(argv)
+
+    try:
+        start_metrics_server(9100)
+    except Exception:
+        pass
+    app = create_app(JobQueue(workers=args.workers, maxsize=args.queue_size))
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
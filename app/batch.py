@@ -0,0 +1,166 @@
+"""Run a watchlist of queries through the analysis graph concurrently.
+
+Usage::
+
+    python -m app.batch watchlist.txt -o results.jsonl --workers 32 --limit groq=4
+
+Each query runs under a stable run ID with graph checkpoints (see
+``graph.checkpoint``): re-running a watchlist reuses node outputs younger
+than ``CHECKPOINT_TTL`` and resumes failed queries from their last
+completed node.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .graph.builder import build_graph
+from .graph.checkpoint import get_checkpointer, invoke_resumable, run_id_for
+from .graph.state import to_jsonable
+from .utils.limits import BATCH, configure_limits, parse_limits, priority_scope
+from .utils.market_data import request_scope
+from .observability.tracing import span
+from config import BATCH_WORKERS, CHECKPOINT_ENABLED, CHECKPOINT_TTL
+
+
+# News items stay in the checkpoint; results carry the metrics and the structured recommendation.
+RESULT_FIELDS = ("ticker", "metrics", "summary", "analysis", "recommendation")
+
+
+def result_fields(values: Mapping[str, Any]) -> Dict[str, Any]:
+    """The JSON-ready result fields of final graph values."""
+    return {field: to_jsonable(values.get(field)) for field in RESULT_FIELDS}
+
+
+@dataclass
+class BatchReport:
+    total: int
+    succeeded: int
+    failed: int
+    elapsed_s: float
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.total} queries ({self.succeeded} ok, {self.failed} failed) "
+            f"in {self.elapsed_s:.1f}s, {self.throughput:.2f} queries/s"
+        )
+
+
+def load_queries(path: Path) -> List[str]:
+    """Read one query per line; JSONL lines may carry a ``query`` field."""
+    queries: List[str] = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                line = record.get("query") or record.get("user_input", "")
+            queries.append(line)
+    return queries
+
+
+def _run_one(graph, query: str, max_age: float = CHECKPOINT_TTL) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    record: Dict[str, Any] = {"query": query}
+    try:
+        with request_scope(), priority_scope(BATCH), span("query", new_trace=True, user_input=query, mode="batch"):
+            if getattr(graph, "checkpointer", None):
+                record["run_id"] = run_id_for(query, prefix="batch")
+                state = invoke_resumable(graph, {"user_input": query}, record["run_id"], max_age=max_age)
+            else:
+                state = graph.invoke({"user_input": query})
+        record.update(result_fields(state))
+        record["error"] = None
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["elapsed_s"] = round(time.perf_counter() - start_time, 3)
+    return record
+
+
+def run_batch(
+    queries: Iterable[str],
+    output_path: Path,
+    workers: int = BATCH_WORKERS,
+    limits: Optional[Mapping[str, int]] = None,
+    graph=None,
+    resume: bool = CHECKPOINT_ENABLED,
+    max_age: float = CHECKPOINT_TTL,
+) -> BatchReport:
+    """Analyze ``queries`` concurrently, appending one JSON line per finished query.
+
+    With ``resume``, node outputs saved by earlier runs within ``max_age``
+    seconds are reused instead of calling the providers again.
+    """
+    if limits:
+        configure_limits(limits)
+    graph = graph or build_graph(checkpointer=get_checkpointer() if resume else None)
+    queries = list(queries)
+
+    succeeded = failed = 0
+    write_lock = threading.Lock()
+    start_time = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="batch"
+    ) as pool:
+        futures = [pool.submit(_run_one, graph, q, max_age) for q in queries]
+        for future in as_completed(futures):
+            record = future.result()
+            with write_lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+            if record["error"] is None:
+                succeeded += 1
+            else:
+                failed += 1
+
+    return BatchReport(
+        total=len(queries),
+        succeeded=succeeded,
+        failed=failed,
+        elapsed_s=round(time.perf_counter() - start_time, 3),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> BatchReport:
+    parser = argparse.ArgumentParser(description="Batch-analyze a watchlist of tickers or company names.")
+    parser.add_argument("queries", type=Path, help="file with one query per line (or JSONL with a 'query' field)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("batch_results.jsonl"))
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument(
+        "--limit", action="append", default=[], metavar="PROVIDER=N",
+        help="per-provider concurrency cap, e.g. --limit groq=4 (repeatable)",
+    )
+    parser.add_argument(
+        "--no-resume", dest="resume", action="store_false", default=CHECKPOINT_ENABLED,
+        help="ignore saved checkpoints and run every query from scratch",
+    )
+    parser.add_argument(
+        "--max-age", type=float, default=CHECKPOINT_TTL,
+        help="seconds a saved node output stays reusable (default: CHECKPOINT_TTL)",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_batch(
+        load_queries(args.queries),
+        args.output,
+        workers=args.workers,
+        limits=parse_limits(",".join(args.limit)),
+        resume=args.resume,
+        max_age=args.max_age,
+    )
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
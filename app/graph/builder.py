@@ -0,0 +1,47 @@
+from config import COALESCE_ENABLED
+from .coalesce import coalesce_by_input, coalesce_by_ticker
+from .state import StockState
+from .nodes.infer import infer_ticker_node, normalize_query
+from .nodes.crawl import crawl_node
+from .nodes.analyze import analyze_node
+from .nodes.recommend import recommend_node
+
+
+def build_graph(checkpointer=None, coalesce: bool = COALESCE_ENABLED):
+    """Compile the analysis graph.
+
+    With a ``checkpointer`` (see ``graph.checkpoint``) state is saved after
+    every node, and each call needs a run ID: ``config=run_config(run_id)``.
+    With ``coalesce``, concurrent runs share node executions (see ``graph.coalesce``).
+    """
+    # Imported here so importing the package stays cheap; only building needs LangGraph.
+    from langgraph.graph import StateGraph
+
+    nodes = {
+        "infer_ticker": infer_ticker_node,
+        "crawl": crawl_node,
+        "analyze": analyze_node,
+        "recommend": recommend_node,
+    }
+    if coalesce:
+        nodes = {
+            "infer_ticker": coalesce_by_input(
+                "infer_ticker", infer_ticker_node,
+                key=lambda state: normalize_query(state.user_input), fields=("ticker",),
+            ),
+            "crawl": coalesce_by_ticker("crawl", crawl_node, fields=("metrics", "news", "summary")),
+            "analyze": coalesce_by_ticker("analyze", analyze_node, fields=("analysis",)),
+            "recommend": coalesce_by_ticker("recommend", recommend_node, fields=("recommendation",), last=True),
+        }
+
+    graph_builder = StateGraph(StockState)
+    for name, node in nodes.items():
+        graph_builder.add_node(name, node)
+    graph_builder.set_entry_point("infer_ticker")
+    graph_builder.add_edge("infer_ticker", "crawl")
+    graph_builder.add_edge("crawl", "analyze")
+    graph_builder.add_edge("analyze", "recommend")
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+__all__ = ["build_graph"]
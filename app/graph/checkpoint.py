@@ -0,0 +1,298 @@
+"""Durable checkpoints for the analysis graph, so failed runs resume by run ID.
+
+``build_graph(checkpointer=get_checkpointer())`` saves ``StockState`` to a
+local SQLite file after every node. Re-running a run ID picks up after the
+last completed node instead of repeating the Gemini calls::
+
+    graph = build_graph(checkpointer=get_checkpointer())
+    state = invoke_resumable(graph, {"user_input": "Apple"}, run_id="apple-1")
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config import CHECKPOINT_PATH, CHECKPOINT_RETENTION, CHECKPOINT_TTL
+from .state import CHECKPOINT_TYPES
+from ..observability.monitoring import record_cache
+from ..utils.providers import get, register
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer backed by a local SQLite file (WAL mode).
+
+    Each checkpoint row holds the full serialized checkpoint, channel values
+    included; pending writes of a failed step go to a second table so the
+    nodes that did finish in that step are not re-run on resume.
+    """
+
+    def __init__(self, path: str, serde=None):
+        if serde is None:
+            serde = JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+        super().__init__(serde=serde)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_id TEXT,"
+                " type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB, created_at REAL,"
+                " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS writes ("
+                " thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,"
+                " channel TEXT, type TEXT, value BLOB, task_path TEXT,"
+                " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))"
+            )
+
+    def _tuple(self, row: Tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, blob, metadata_type, metadata = row
+        with self._lock:
+            writes = self._conn.execute(
+                "SELECT task_id, channel, type, value FROM writes"
+                " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+                " ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id,
+                }}
+                if parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((wtype, value)))
+                for task_id, channel, wtype, value in writes
+            ],
+        )
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint,"
+            " metadata_type, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: Tuple = (configurable["thread_id"], configurable.get("checkpoint_ns", ""))
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return self._tuple(row) if row else None
+
+    def list(
+        self,
+        config,
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before=None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint,"
+            " metadata_type, metadata FROM checkpoints WHERE 1 = 1"
+        )
+        params: Tuple = ()
+        if config:
+            configurable = config["configurable"]
+            query += " AND thread_id = ?"
+            params += (configurable["thread_id"],)
+            if configurable.get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params += (configurable["checkpoint_ns"],)
+            if get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params += (get_checkpoint_id(config),)
+        if before and get_checkpoint_id(before):
+            query += " AND checkpoint_id < ?"
+            params += (get_checkpoint_id(before),)
+        query += " ORDER BY checkpoint_id DESC"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+            found = self._tuple(row)
+            if filter and not all(found.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield found
+
+    def put(
+        self,
+        config,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> Dict[str, Any]:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], configurable.get("checkpoint_id"),
+                    type_, blob, metadata_type, metadata_blob, time.time(),
+                ),
+            )
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        configurable = config["configurable"]
+        key = (configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((*key, task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, blob, task_path))
+        # Special writes (errors, interrupts) overwrite; regular ones are written once per task.
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        with self._lock:
+            self._conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    def purge_older_than(self, max_age: float) -> int:
+        """Drop runs whose latest checkpoint is older than ``max_age`` seconds."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [row[0] for row in self._conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+            )]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        return len(stale)
+
+    # The graph only runs synchronously today; async callers get the same local SQLite calls.
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for found in self.list(config, filter=filter, before=before, limit=limit):
+            yield found
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+
+def _build_checkpointer() -> SQLiteCheckpointSaver:
+    saver = SQLiteCheckpointSaver(CHECKPOINT_PATH)
+    # Runs nobody came back to within the retention window are dropped on open.
+    saver.purge_older_than(CHECKPOINT_RETENTION)
+    return saver
+
+
+register("checkpointer", _build_checkpointer)
+
+
+def get_checkpointer() -> SQLiteCheckpointSaver:
+    """The shared checkpointer at ``CHECKPOINT_PATH``, opened on first use."""
+    return get("checkpointer")
+
+
+def run_config(run_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": run_id}}
+
+
+def run_id_for(query: str, prefix: str = "run") -> str:
+    """Stable run ID for a query, so re-running it finds its earlier checkpoints."""
+    digest = hashlib.sha256(" ".join(query.lower().split()).encode("utf-8")).hexdigest()
+    return f"{prefix}-{digest[:16]}"
+
+
+def _age(snapshot) -> float:
+    if not snapshot.created_at:
+        return float("inf")
+    return time.time() - datetime.fromisoformat(snapshot.created_at).timestamp()
+
+
+def _prepare(graph, state: Dict[str, Any], run_id: str, max_age: float) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Return ``(graph_input, finished_values)`` for running ``run_id``.
+
+    The input is ``state`` for a new run and ``None`` to continue a saved
+    one; a finished run still younger than ``max_age`` seconds comes back
+    as its saved values instead. Older checkpoints are dropped and the run
+    starts over, so stale prices or news are not reused.
+    """
+    config = run_config(run_id)
+    snapshot = graph.get_state(config)
+    if snapshot.values and _age(snapshot) > max_age:
+        graph.checkpointer.delete_thread(run_id)
+        snapshot = None
+    if not snapshot or not snapshot.values:
+        record_cache("checkpoint", "miss")
+        return state, None
+    record_cache("checkpoint", "hit")
+    return None, (None if snapshot.next else snapshot.values)
+
+
+def invoke_resumable(graph, state: Dict[str, Any], run_id: str, max_age: float = CHECKPOINT_TTL) -> Dict[str, Any]:
+    """Run ``graph`` under ``run_id``, skipping nodes already saved for it."""
+    graph_input, finished = _prepare(graph, state, run_id, max_age)
+    if finished is not None:
+        return finished
+    return graph.invoke(graph_input, run_config(run_id))
+
+
+def stream_resumable(graph, state: Dict[str, Any], run_id: str, max_age: float = CHECKPOINT_TTL, **kwargs: Any) -> Iterator[Any]:
+    """``graph.stream`` counterpart of :func:`invoke_resumable`.
+
+    Only nodes that actually run produce events; read the final state with
+    ``graph.get_state(run_config(run_id))``.
+    """
+    graph_input, finished = _prepare(graph, state, run_id, max_age)
+    if finished is None:
+        yield from graph.stream(graph_input, run_config(run_id), **kwargs)
+
+
+__all__ = [
+    "SQLiteCheckpointSaver",
+    "get_checkpointer",
+    "run_config",
+    "run_id_for",
+    "invoke_resumable",
+    "stream_resumable",
+]
@@ -0,0 +1,143 @@
+"""Coalesce concurrent graph runs so LLM calls scale with tickers, not requests.
+
+Two levels, both applied by ``build_graph``:
+
+- node level (:func:`coalesce_by_input`): identical in-flight calls of one
+  node, e.g. ticker inference for the same query, run once;
+- graph level (:func:`coalesce_by_ticker`): once a ticker is resolved,
+  every run for it joins one shared pipeline. Each downstream node runs once
+  per ticker; later arrivals reuse finished stages and attach to the running
+  one, replaying its streamed tokens. The pipeline closes when its last
+  node finishes, fails, or is older than ``COALESCE_WINDOW`` seconds.
+"""
+import inspect
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from config import COALESCE_WINDOW
+from ..utils.singleflight import Flight, SingleFlight
+from ..observability.monitoring import record_coalesced
+from ..observability.tracing import span
+
+if TYPE_CHECKING:
+    from langgraph.types import StreamWriter
+
+    from .state import StockState
+
+
+class _TickerRun:
+    """Per-node flights of one shared pipeline for a ticker."""
+
+    def __init__(self):
+        self.flights: Dict[str, Flight] = {}
+        self.started_at = time.monotonic()
+
+
+_runs: Dict[str, _TickerRun] = {}
+_runs_lock = threading.Lock()
+
+
+def _join(node: str, ticker: str, window: float) -> Tuple[_TickerRun, Flight, bool]:
+    with _runs_lock:
+        run = _runs.get(ticker)
+        if run is None or time.monotonic() - run.started_at > window:
+            run = _runs[ticker] = _TickerRun()
+        flight = run.flights.get(node)
+        leader = flight is None
+        if leader:
+            flight = run.flights[node] = Flight()
+    record_coalesced(f"node.{node}", "leader" if leader else "follower")
+    return run, flight, leader
+
+
+def _close(ticker: str, run: _TickerRun) -> None:
+    with _runs_lock:
+        if _runs.get(ticker) is run:
+            del _runs[ticker]
+
+
+def reset() -> None:
+    """Forget all shared pipelines (for tests)."""
+    with _runs_lock:
+        _runs.clear()
+
+
+def _caller(fn: Callable) -> Callable[["StockState", Optional[Callable]], Any]:
+    # LangGraph injects ``writer`` by parameter name; only pass it to nodes that stream.
+    if "writer" in inspect.signature(fn).parameters:
+        return lambda state, writer: fn(state, writer=writer)
+    return lambda state, writer: fn(state)
+
+
+def _owned(result: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    # Only the node's own fields, even if a node returns more.
+    return {field: result[field] for field in fields if field in result}
+
+
+def coalesce_by_input(
+    node: str,
+    fn: Callable,
+    key: Callable[["StockState"], Hashable],
+    fields: Sequence[str],
+) -> Callable:
+    """Wrap node ``fn`` so concurrent calls with the same ``key(state)`` run once."""
+    call = _caller(fn)
+    flights = SingleFlight(f"node.{node}")
+
+    def coalesced(state: "StockState", writer: "StreamWriter" = None) -> Dict[str, Any]:
+        result = flights.run(key(state), lambda emit: call(state, emit), on_event=writer)
+        return _owned(result, fields)
+
+    coalesced.__name__ = getattr(fn, "__name__", node)
+    return coalesced
+
+
+def coalesce_by_ticker(
+    node: str,
+    fn: Callable,
+    fields: Sequence[str],
+    last: bool = False,
+    window: float = COALESCE_WINDOW,
+) -> Callable:
+    """Wrap node ``fn`` so all runs for one ticker share a single execution of it.
+
+    ``fields`` are the state keys the node owns; followers get just those.
+    The node marked ``last`` closes the ticker's pipeline when it finishes.
+    """
+    call = _caller(fn)
+
+    def coalesced(state: "StockState", writer: "StreamWriter" = None) -> Dict[str, Any]:
+        ticker = state.ticker
+        if not ticker or ticker == "UNKNOWN":
+            return call(state, writer)
+        run, flight, leader = _join(node, ticker, window)
+        if not leader:
+            with span(f"node.{node}", ticker=ticker, coalesced=True):
+                for chunk in flight.follow():
+                    if writer is not None:
+                        writer(chunk)
+                return dict(flight.outcome())
+
+        def tee(chunk: Any) -> None:
+            flight.emit(chunk)
+            if writer is not None:
+                writer(chunk)
+
+        try:
+            result = _owned(call(state, tee), fields)
+        except BaseException as exc:
+            flight.finish(error=exc)
+            # A failed stage must not be handed to later requests.
+            _close(ticker, run)
+            raise
+        flight.finish(result=result)
+        if last:
+            _close(ticker, run)
+        return dict(result)
+
+    coalesced.__name__ = getattr(fn, "__name__", node)
+    return coalesced
+
+
+__all__ = ["coalesce_by_input", "coalesce_by_ticker", "reset"]
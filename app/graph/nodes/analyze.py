@@ -1,22 +1,20 @@
+from typing import TYPE_CHECKING, Any, Dict
+
 from ..state import StockState
 from ...utils.agents import llama
+from ...utils.llm import model_name, run_llm
+from ...utils.prompts import build_prompt
 from ...observability.monitoring import instrument
 
+if TYPE_CHECKING:
+    from langgraph.types import StreamWriter
 
-@instrument("analyze")
-def analyze_node(state: StockState) -> StockState:
-    ticker = state.get("ticker", "")
-    summary = state.get("summary", "")
-    
-    if not ticker or ticker == "UNKNOWN" or not summary:
-        state["analysis"] = "Insufficient data for analysis."
-        return state
 
-    prompt = f"""
+ANALYZE_PROMPT = """
 Based on the following summary for {ticker}, provide a detailed financial analysis:
 
 {summary}
-
+{metrics}
 Please analyze:
 1. Financial health and stability
 2. Market position and competitive advantages
@@ -27,6 +25,27 @@ Please analyze:
 Provide specific insights and recommendations.
 """
 
-    response = llama.invoke(prompt)
-    state["analysis"] = response.content
-    return state
+# Summary sentences on these topics are kept first when it has to be cut to the budget.
+FOCUS_KEYWORDS = ("revenue", "earnings", "margin", "debt", "cash", "valuation", "growth", "risk", "competition")
+
+
+@instrument("analyze")
+def analyze_node(state: StockState, writer: "StreamWriter" = None) -> Dict[str, Any]:
+    ticker = state.ticker
+    summary = state.summary
+
+    if not ticker or ticker == "UNKNOWN" or not summary:
+        return {"analysis": "Insufficient data for analysis."}
+
+    metrics_section = (
+        f"\nComputed metrics (use these figures; do not estimate them):\n{state.metrics.block()}\n"
+        if state.metrics else ""
+    )
+    prompt = build_prompt(
+        "analyze", model_name(llama), ANALYZE_PROMPT,
+        fixed={"ticker": ticker, "metrics": metrics_section},
+        flexible={"summary": summary},
+        keywords=(ticker, *FOCUS_KEYWORDS),
+    )
+
+    return {"analysis": run_llm(llama, prompt, node="analyze", provider="groq", ticker=ticker, writer=writer)}
@@ -1,16 +1,93 @@
-from ..state import StockState
+import contextvars
+import hashlib
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
+
+from ..state import Metrics, NewsItem, StockState
 from ...utils.agents import gemini
-from ...observability.monitoring import instrument
+from ...utils.limits import is_rate_limited
+from ...utils.llm import model_name, run_llm
+from ...utils.llm_cache import refresh_ticker
+from ...utils.prompts import build_prompt, dedupe, fingerprint, split_items
+from ...utils.tools import tavily_tool, finnhub_metrics, finnhub_tool, newsapi_tool
+from ...observability.monitoring import instrument, record_source
+from ...observability.tracing import span
+from config import CRAWL_SOURCE_TIMEOUT, CRAWL_MAX_WORKERS
 
 
-@instrument("crawl")
-def crawl_node(state: StockState) -> StockState:
-    ticker = state.get("ticker", "")
-    if not ticker or ticker == "UNKNOWN":
-        state["summary"] = "Unable to determine ticker symbol."
-        return state
+def market_metrics(ticker: str) -> Metrics:
+    """Price metrics and valuation ratios from the local OHLCV store and Yahoo ``info``."""
+    from ...utils.quant import compute_many  # NumPy is loaded only when a ticker is crawled
+
+    computed = compute_many([ticker])[ticker.upper()]
+    valuation = computed.pop("valuation", {})
+    as_of = computed.pop("as_of", "")
+    values = {name: value for name, value in computed.items() if math.isfinite(value)}
+    return Metrics(ticker=ticker.upper(), as_of=as_of, values=values, valuation=valuation)
+
+
+# "yahoo_finance" returns Metrics and "finnhub_metrics" more values for it;
+# the others return news text, one item per line.
+CRAWL_SOURCES: Dict[str, Callable] = {
+    "tavily": tavily_tool,
+    "yahoo_finance": market_metrics,
+    "finnhub": finnhub_tool,
+    "finnhub_metrics": finnhub_metrics,
+    "newsapi": newsapi_tool,
+}
+
+# Shared across queries so concurrent sessions are bounded by one pool.
+_executor = ThreadPoolExecutor(max_workers=CRAWL_MAX_WORKERS, thread_name_prefix="crawl")
+
+
+def _call_source(name: str, source: Callable, ticker: str) -> Any:
+    start_time = time.perf_counter()
+    try:
+        with span(f"source.{name}", ticker=ticker):
+            result = source.invoke(ticker) if hasattr(source, "invoke") else source(ticker)
+    except Exception as exc:
+        outcome = "rate_limited" if is_rate_limited(exc) else "error"
+        record_source(name, outcome, time.perf_counter() - start_time)
+        raise
+    record_source(name, "ok", time.perf_counter() - start_time)
+    return result
+
+
+def gather_sources(
+    ticker: str,
+    sources: Optional[Dict[str, Callable]] = None,
+    timeout: float = CRAWL_SOURCE_TIMEOUT,
+) -> Dict[str, Any]:
+    """Query every source concurrently and return whatever finished in time.
+
+    All sources share one deadline, so the wall-clock cost is that of the
+    slowest source (capped at ``timeout``) rather than the sum of all of them.
+    Sources that fail or miss the deadline are left out of the result.
+    """
+    sources = CRAWL_SOURCES if sources is None else sources
+    # Each task runs in a copy of the caller's context so request-scoped
+    # caches (see utils.market_data.request_scope) are shared with the node.
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, _call_source, name, fn, ticker)
+        for name, fn in sources.items()
+    }
+
+    deadline = time.monotonic() + timeout
+    results: Dict[str, Any] = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception:
+            if not future.done():
+                future.cancel()
+                record_source(name, "timeout", timeout)
+    return results
+
 
-    prompt = f"""
+CRAWL_PROMPT = """
 Analyze the stock {ticker} and provide a comprehensive summary including:
 - Current market performance
 - Key financial metrics
@@ -18,9 +95,59 @@ Analyze the stock {ticker} and provide a comprehensive summary including:
 - Risk factors
 - Growth potential
 
+Use the following data gathered from market data and news sources:
+
+{metrics}
+
+{sources}
+
 Focus on actionable insights for investors.
 """
 
-    response = gemini.invoke(prompt)
-    state["summary"] = response.content
-    return state
+# Sentences mentioning these are kept first when news has to be cut to the budget.
+FOCUS_KEYWORDS = ("earnings", "revenue", "guidance", "growth", "margin", "outlook", "risk", "upgrade", "downgrade")
+
+
+def news_items(results: Dict[str, Any]) -> List[NewsItem]:
+    """One item per line of every news source's text, in source order."""
+    return [
+        NewsItem(id=fingerprint(line), source=name, text=line)
+        for name, text in results.items() if isinstance(text, str)
+        for line in split_items(text)
+    ]
+
+
+def data_digest(metrics: Optional[Metrics], items: List[NewsItem]) -> str:
+    """Changes when a new price bar or a new headline arrives for the ticker."""
+    parts = [metrics.as_of if metrics else "", *sorted({item.id for item in items})]
+    return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+@instrument("crawl")
+def crawl_node(state: StockState) -> Dict[str, Any]:
+    ticker = state.ticker
+    if not ticker or ticker == "UNKNOWN":
+        return {"summary": "Unable to determine ticker symbol."}
+
+    results = gather_sources(ticker)
+    metrics = results.pop("yahoo_finance", None)
+    extra = results.pop("finnhub_metrics", None)
+    if extra:
+        values = {**metrics.values, **extra} if metrics else extra
+        metrics = replace(metrics, values=values) if metrics else Metrics(ticker=ticker.upper(), as_of="", values=values)
+    items = news_items(results)
+    # Cached crawl/analyze/recommend answers for this ticker were built on the old data.
+    refresh_ticker(gemini, ticker, data_digest(metrics, items))
+
+    prompt = build_prompt(
+        "crawl", model_name(gemini), CRAWL_PROMPT,
+        fixed={"ticker": ticker, "metrics": f"[yahoo_finance]\n{metrics.block()}" if metrics else ""},
+        flexible={"sources": [item.line() for item in items] or ["No news could be retrieved."]},
+        keywords=(ticker, *FOCUS_KEYWORDS),
+    )
+    summary = run_llm(gemini, prompt, node="crawl", provider="gemini", ticker=ticker)
+    return {
+        "metrics": metrics,
+        "news": tuple(dedupe(items, text=lambda item: item.text)),
+        "summary": summary,
+    }
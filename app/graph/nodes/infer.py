@@ -1,19 +1,51 @@
+import logging
+import re
+from typing import Any, Dict
+
 from ..state import StockState, validate_ticker
 from ...utils.agents import gemini
-import re
-import yfinance as yf
+from ...utils.llm import run_llm
 from ...utils.tools import tavily_tool
+from ...utils.market_data import get_history
+from ...utils.cache import TTLCache
+from ...utils.errors import is_unavailable
+from ...utils.symbols import get_symbol_index
 from ...observability.monitoring import instrument
+from ...observability.tracing import span
+from config import (
+    TICKER_CACHE_TTL,
+    TICKER_CACHE_NEGATIVE_TTL,
+    TICKER_CACHE_SIZE,
+    SYMBOL_INDEX_MIN_CONFIDENCE,
+)
 
 
-@instrument("infer")
-def infer_ticker_node(state: StockState) -> StockState:
-    user_input = state.get("user_input", "").strip()
+logger = logging.getLogger(__name__)
+
+ticker_cache = TTLCache("ticker", maxsize=TICKER_CACHE_SIZE, ttl=TICKER_CACHE_TTL)
+
+
+def normalize_query(user_input: str) -> str:
+    return " ".join(user_input.lower().split())
+
+
+def resolve_ticker(user_input: str) -> str:
+    """Ticker for ``user_input``, or ``"UNKNOWN"`` once validation has ruled every candidate out.
+
+    Provider outages are raised instead, so an outage is never cached as an
+    unknown ticker.
+    """
+    # Exact symbol/name/alias hits from the local index need no network at all.
+    index_match = get_symbol_index().lookup(user_input)
+    if index_match is not None and index_match.confidence >= 1.0:
+        return index_match.symbol
 
     if user_input.isalpha() and len(user_input) <= 5:
         if validate_ticker(user_input):
-            state["ticker"] = user_input.upper()
-            return state
+            return user_input.upper()
+
+    if index_match is not None and index_match.confidence >= SYMBOL_INDEX_MIN_CONFIDENCE:
+        return index_match.symbol
 
     prompt = (
         f"""
@@ -27,28 +59,43 @@ Rules:
 - Only return the ticker symbol, nothing else.
 """
     )
-    response = gemini.invoke(prompt)
-    inferred_ticker = response.content.strip().upper()
+    inferred_ticker = run_llm(gemini, prompt, node="infer", provider="gemini").strip().upper()
 
     try:
-        test_data = yf.download(inferred_ticker, period="5d", interval="1d")
+        test_data = get_history(inferred_ticker, period="5d")
     except Exception:
         test_data = None
 
+    search_error = None
     if test_data is None or getattr(test_data, "empty", True):
         try:
-            updated = tavily_tool(f"current stock ticker symbol for {inferred_ticker}")
+            with span("infer.search", ticker=inferred_ticker):
+                updated = tavily_tool.invoke(f"current stock ticker symbol for {inferred_ticker}")
             match = re.search(r"\b[A-Z]{1,5}\b", updated)
             if match:
                 inferred_ticker = match.group(0).upper()
-        except Exception:
-            pass
+        except Exception as exc:
+            # Keep the LLM's guess; validate_ticker below has the final say.
+            logger.warning("Ticker search for %r failed: %s", inferred_ticker, exc)
+            search_error = exc
 
     if not validate_ticker(inferred_ticker):
-        state["ticker"] = "UNKNOWN"
-    else:
-        state["ticker"] = inferred_ticker
+        # Without the search the guess was never corrected; that is not a real "unknown".
+        if search_error is not None and is_unavailable(search_error):
+            raise search_error
+        return "UNKNOWN"
+    return inferred_ticker
+
 
-    return state
+@instrument("infer")
+def infer_ticker_node(state: StockState) -> Dict[str, Any]:
+    user_input = state.user_input.strip()
+    key = normalize_query(user_input)
 
+    ticker = ticker_cache.get(key)
+    if ticker is None:
+        ticker = resolve_ticker(user_input)
+        ttl = TICKER_CACHE_NEGATIVE_TTL if ticker == "UNKNOWN" else TICKER_CACHE_TTL
+        ticker_cache.set(key, ticker, ttl=ttl)
 
+    return {"ticker": ticker}
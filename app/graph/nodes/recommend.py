@@ -1,18 +1,20 @@
-from ..state import StockState
+import json
+import math
+import re
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from ..state import Recommendation, StockState
 from ...utils.agents import llama
-from ...observability.monitoring import instrument
+from ...utils.llm import model_name, run_llm
+from ...utils.portfolio import extract_portfolio_allocations, extract_portfolio_section
+from ...utils.prompts import build_prompt
+from ...observability.monitoring import instrument, record_recommendation_parse
 
+if TYPE_CHECKING:
+    from langgraph.types import StreamWriter
 
-@instrument("recommend")
-def recommend_node(state: StockState) -> StockState:
-    ticker = state.get("ticker", "")
-    analysis = state.get("analysis", "")
-    
-    if not ticker or ticker == "UNKNOWN" or not analysis:
-        state["recommendations"] = "Unable to provide recommendations due to insufficient data."
-        return state
 
-    prompt = f"""
+RECOMMEND_PROMPT = """
 Based on the analysis for {ticker}, provide specific investment recommendations:
 
 {analysis}
@@ -25,27 +27,151 @@ Please provide:
 5. Key factors to monitor
 
 Format the portfolio allocation as a clear section for easy parsing.
+
+End your answer with a ```json code block holding only an object that
+matches this JSON schema:
+{schema}
 """
 
-    response = llama.invoke(prompt)
-    state["recommendations"] = response.content
-    return state
+# What the model is asked to end its answer with; ``parse_recommendation`` validates it.
+RECOMMENDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"enum": ["BUY", "HOLD", "SELL"]},
+        "target_price": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "allocations": {
+            "type": "object",
+            "description": "ticker -> percent of the portfolio, 100 in total at most",
+            "additionalProperties": {"type": "number", "minimum": 0, "maximum": 100},
+        },
+    },
+    "required": ["action", "target_price", "allocations"],
+    "additionalProperties": False,
+}
+_SCHEMA_TEXT = json.dumps(RECOMMENDATION_SCHEMA, separators=(",", ":"))
+
+# Analysis sentences on these topics are kept first when it has to be cut to the budget.
+FOCUS_KEYWORDS = ("valuation", "target", "risk", "growth", "thesis", "undervalued", "overvalued", "catalyst")
+
+
+_ACTION = re.compile(r"\b(BUY|HOLD|SELL)\b")
+_ACTION_ANY_CASE = re.compile(_ACTION.pattern, re.IGNORECASE)
+_TARGET = re.compile(r"target(?: price)?[^$\d\n]{0,40}\$\s?(\d[\d,]*(?:\.\d+)?)", re.IGNORECASE)
+
+
+def _target_price(text: str) -> Optional[float]:
+    match = _TARGET.search(text)
+    return float(match.group(1).replace(",", "")) if match else None
+
+
+_JSON_FENCE = "```json"
+_TICKER = re.compile(r"[A-Z]{1,5}(?:[.-][A-Z]{1,2})?")
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(value)
+    return None
+
+
+def _json_block(text: str) -> Tuple[Dict[str, Any], str]:
+    """The last ```json object in ``text`` (or ``{}``) and the text without it."""
+    start = text.rfind(_JSON_FENCE)
+    if start < 0:
+        return {}, text
+    end = text.find("```", start + len(_JSON_FENCE))
+    body = text[start + len(_JSON_FENCE):end if end >= 0 else len(text)]
+    prose = (text[:start] + (text[end + 3:] if end >= 0 else "")).strip()
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return {}, prose
+    return (data if isinstance(data, dict) else {}), prose
+
+
+def validate_structured(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of ``data`` that match ``RECOMMENDATION_SCHEMA``; invalid ones are left out."""
+    valid: Dict[str, Any] = {}
+    action = data.get("action")
+    if isinstance(action, str) and action.upper() in ("BUY", "HOLD", "SELL"):
+        valid["action"] = action.upper()
+    if "target_price" in data:
+        target = data["target_price"]
+        if target is None:
+            valid["target_price"] = None
+        elif _number(target) is not None and target > 0:
+            valid["target_price"] = float(target)
+    allocations = data.get("allocations")
+    if isinstance(allocations, dict):
+        parsed = {str(k).strip().upper(): _number(v) for k, v in allocations.items()}
+        if (
+            all(_TICKER.fullmatch(k) and v is not None and 0 <= v <= 100 for k, v in parsed.items())
+            and sum(parsed.values()) <= 100.5
+        ):
+            valid["allocations"] = parsed
+    return valid
+
+
+def parse_recommendation(text: str) -> Recommendation:
+    """Read action, target price and allocations out of the model's answer, once.
+
+    Fields come from the trailing JSON block when it validates against
+    ``RECOMMENDATION_SCHEMA``; any that are missing or invalid are read from
+    the prose with regexes instead. ``text`` is the answer without the block.
+    """
+    data, prose = _json_block(text)
+    fields = validate_structured(data)
+    record_recommendation_parse(
+        "json" if len(fields) == len(RECOMMENDATION_SCHEMA["required"]) else "partial" if fields else "fallback"
+    )
+    if "action" in fields:
+        action = fields["action"]
+    else:
+        # An upper-case verdict beats a "buy/hold/sell" echoed from the prompt.
+        match = _ACTION.search(prose) or _ACTION_ANY_CASE.search(prose)
+        action = match.group(1).upper() if match else ""
+    return Recommendation(
+        action=action,
+        target_price=fields["target_price"] if "target_price" in fields else _target_price(prose),
+        allocations=fields["allocations"] if "allocations" in fields else extract_portfolio_allocations(prose),
+        portfolio=extract_portfolio_section(prose),
+        text=prose,
+    )
+
+
+@instrument("recommend")
+def recommend_node(state: StockState, writer: "StreamWriter" = None) -> Dict[str, Any]:
+    ticker = state.ticker
+    analysis = state.analysis
+
+    if not ticker or ticker == "UNKNOWN" or not analysis:
+        return {"recommendation": Recommendation(text="Unable to provide recommendations due to insufficient data.")}
+
+    prompt = build_prompt(
+        "recommend", model_name(llama), RECOMMEND_PROMPT,
+        fixed={"ticker": ticker, "schema": _SCHEMA_TEXT}, flexible={"analysis": analysis},
+        keywords=(ticker, *FOCUS_KEYWORDS),
+    )
+
+    text = run_llm(llama, prompt, node="recommend", provider="groq", ticker=ticker, writer=writer)
+    return {"recommendation": parse_recommendation(text)}
+
+
+_HIGHLIGHTS = {
+    "BUY": '<span style="background-color:green;color:white;padding:2px 4px;border-radius:3px;">BUY</span>',
+    "SELL": '<span style="background-color:red;color:white;padding:2px 4px;border-radius:3px;">SELL</span>',
+    "HOLD": '<span style="background-color:yellow;color:black;padding:2px 4px;border-radius:3px;">HOLD</span>',
+    "STRONG": '<span style="font-weight:bold;">STRONG</span>',
+    "WEAK": '<span style="color:orange;">WEAK</span>',
+    "POSITIVE": '<span style="color:green;">POSITIVE</span>',
+    "NEGATIVE": '<span style="color:red;">NEGATIVE</span>',
+}
 
 
 def highlight_recommendation(text: str) -> str:
     """Highlight key recommendation words in HTML."""
-    highlights = {
-        "buy": '<span style="background-color:green;color:white;padding:2px 4px;border-radius:3px;">BUY</span>',
-        "sell": '<span style="background-color:red;color:white;padding:2px 4px;border-radius:3px;">SELL</span>', 
-        "hold": '<span style="background-color:yellow;color:black;padding:2px 4px;border-radius:3px;">HOLD</span>',
-        "strong": '<span style="font-weight:bold;">STRONG</span>',
-        "weak": '<span style="color:orange;">WEAK</span>',
-        "positive": '<span style="color:green;">POSITIVE</span>',
-        "negative": '<span style="color:red;">NEGATIVE</span>'
-    }
-    
-    highlighted = text
-    for word, html in highlights.items():
-        highlighted = highlighted.replace(word.upper(), html)
-    
-    return highlighted
+    # Seven C-level str.replace scans beat any single-pass regex with a Python
+    # callback per match (see benchmarks/bench_parsing.py).
+    for word, html in _HIGHLIGHTS.items():
+        text = text.replace(word, html)
+    return text
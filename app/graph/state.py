@@ -1,22 +1,113 @@
-from typing import TypedDict
-import yfinance as yf
+"""Graph state: typed fields, each written by exactly one node.
 
+- ``infer_ticker`` sets ``ticker``;
+- ``crawl`` sets ``metrics``, ``news`` and ``summary``;
+- ``analyze`` sets ``analysis``;
+- ``recommend`` sets ``recommendation``.
+
+Nodes read a :class:`StockState` and return only the fields they own, so
+LangGraph merges small updates instead of copying whole states around, and
+checkpoints hold typed values rather than re-parsable prose.
+"""
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional, Tuple
+
+from ..utils.errors import is_unavailable
+from ..utils.market_data import get_info
+
+
+@dataclass(frozen=True, slots=True)
+class NewsItem:
+    """One news line from a source; ``id`` fingerprints its wording, so repeats share it."""
+
+    id: str
+    source: str
+    text: str
+
+    def line(self) -> str:
+        return f"[{self.source}] {self.text}"
+
+
+@dataclass(frozen=True, slots=True)
+class Metrics:
+    """Output of the market-data source: computed price metrics and valuation ratios."""
 
-class StockState(TypedDict):
-    user_input: str
     ticker: str
-    summary: str
-    analysis: str
-    recommendations: str
+    as_of: str
+    values: Mapping[str, float] = field(default_factory=dict)
+    valuation: Mapping[str, float] = field(default_factory=dict)
+
+    def block(self) -> str:
+        """Compact text block for prompts (see ``utils.quant.format_block``)."""
+        from ..utils.quant import format_block
+
+        return format_block(self.ticker, {"as_of": self.as_of, **self.values, "valuation": dict(self.valuation)})
+
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    """What ``recommend`` concluded, plus the text it was derived from.
+
+    ``action`` is ``BUY``, ``HOLD``, ``SELL`` or ``""`` when none was given;
+    ``allocations`` maps tickers to suggested portfolio percentages.
+    """
+
+    action: str = ""
+    target_price: Optional[float] = None
+    allocations: Mapping[str, float] = field(default_factory=dict)
+    portfolio: str = ""
+    text: str = ""
+
+
+@dataclass(slots=True)
+class StockState:
+    user_input: str = ""
+    ticker: str = ""
+    metrics: Optional[Metrics] = None
+    news: Tuple[NewsItem, ...] = ()
+    summary: str = ""
+    analysis: str = ""
+    recommendation: Optional[Recommendation] = None
+
+
+# Types stored in checkpoints; the serializer only rebuilds classes it is told about.
+CHECKPOINT_TYPES = [(__name__, cls.__name__) for cls in (NewsItem, Metrics, Recommendation)]
+
+
+def to_jsonable(value: Any) -> Any:
+    """Plain JSON-compatible form of state values (dataclasses become dicts)."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: to_jsonable(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, Mapping):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
 
 
 def validate_ticker(ticker: str) -> str:
+    """``ticker`` upper-cased if Yahoo knows it, else ``""``.
+
+    Provider outages (open breaker, deadlines, 5xx) are raised rather than
+    reported as an unknown ticker.
+    """
     try:
-        data = yf.Ticker(ticker).info
+        data = get_info(ticker)
         if data and "symbol" in data:
             return ticker.upper()
-    except Exception:
-        pass
+    except Exception as exc:
+        if is_unavailable(exc):
+            raise
     return ""
 
 
+__all__ = [
+    "CHECKPOINT_TYPES",
+    "Metrics",
+    "NewsItem",
+    "Recommendation",
+    "StockState",
+    "to_jsonable",
+    "validate_ticker",
+]
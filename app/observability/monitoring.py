@@ -1,13 +1,73 @@
 import time
+from contextlib import contextmanager
 from functools import wraps
-from typing import Callable
+from typing import Callable, Dict, Iterator, Tuple
 
-from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from config import LLM_PRICES
+from .tracing import span
+from ..utils.errors import is_rate_limited
 
 
 NODE_CALLS = Counter("node_calls_total", "Total node calls", ["node"]) 
 NODE_ERRORS = Counter("node_errors_total", "Total node errors", ["node"]) 
 NODE_LATENCY = Histogram("node_latency_seconds", "Latency per node (s)", ["node"]) 
+SOURCE_CALLS = Counter("source_calls_total", "Data source calls by outcome", ["source", "outcome"])
+SOURCE_LATENCY = Histogram("source_latency_seconds", "Latency per data source (s)", ["source"])
+LLM_TTFT = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from request to first token (s); for mode=invoke the whole answer arrives at once",
+    ["node", "provider", "model", "mode"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+LLM_REQUESTS = Counter("llm_requests_total", "LLM calls by outcome (ok, error, rate_limited)", ["provider", "model", "outcome"])
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "LLM calls currently waiting on the provider", ["provider", "model"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the provider", ["provider", "model", "kind"])
+LLM_CACHE_HITS = Counter("llm_cache_hits_total", "LLM calls answered from the response cache", ["provider", "model"])
+LLM_RATE_LIMITED = Counter("llm_rate_limited_total", "429 / quota-exhausted responses", ["provider", "model"])
+LLM_COST = Counter("llm_cost_usd_total", "Estimated spend from LLM_PRICES (USD)", ["provider", "model"])
+PROVIDER_LIMIT = Gauge("provider_concurrency_limit", "Current adaptive concurrency cap", ["provider"])
+PROVIDER_QUEUE_WAIT = Histogram(
+    "provider_queue_wait_seconds",
+    "Time spent waiting for a provider slot and rate token (s)",
+    ["provider", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+BREAKER_STATE = Gauge("circuit_breaker_state", "Breaker state: 0 closed, 1 half-open, 2 open", ["provider"])
+BREAKER_TRANSITIONS = Counter("circuit_breaker_transitions_total", "Breaker state changes", ["provider", "state"])
+PROVIDER_RETRIES = Counter("provider_retries_total", "Retried outbound calls", ["provider"])
+PROVIDER_HEDGES = Counter("provider_hedged_requests_total", "Duplicate requests sent after p95", ["provider"])
+PROVIDER_FALLBACKS = Counter("provider_fallbacks_total", "Calls answered with the last good result", ["provider"])
+API_QUEUE_DEPTH = Gauge("api_queue_depth", "API jobs waiting for a worker")
+API_JOBS = Counter("api_jobs_total", "API jobs by outcome (ok, error, rejected)", ["outcome"])
+COALESCED_CALLS = Counter("coalesced_calls_total", "Single-flight calls by role (leader runs, follower attaches)", ["name", "role"])
+PROMPT_TOKENS = Counter("prompt_tokens_total", "Prompt tokens before and after budgeting", ["node", "stage"])
+PROMPT_COMPRESSION = Histogram(
+    "prompt_compression_ratio",
+    "Tokens sent / tokens of the unbudgeted prompt, per node",
+    ["node"],
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result", ["cache", "result"])
+RECOMMENDATION_PARSES = Counter(
+    "recommendation_parses_total", "Recommendations by parse path (json, partial, fallback)", ["path"]
+)
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse ``"model=0.10/0.40,..."`` (USD per 1M prompt/completion tokens)."""
+    prices: Dict[str, Tuple[float, float]] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        model, _, value = item.partition("=")
+        prompt_price, _, completion_price = value.partition("/")
+        prices[model.strip()] = (float(prompt_price), float(completion_price or prompt_price))
+    return prices
+
+
+PRICES = parse_prices(LLM_PRICES)
 
 
 def instrument(node_name: str) -> Callable:
@@ -15,9 +75,11 @@ def instrument(node_name: str) -> Callable:
         @wraps(func)
         def wrapped(*args, **kwargs):
             NODE_CALLS.labels(node=node_name).inc()
+            ticker = getattr(args[0], "ticker", None) if args else None
             start_time = time.perf_counter()
             try:
-                return func(*args, **kwargs)
+                with span(f"node.{node_name}", ticker=ticker or None):
+                    return func(*args, **kwargs)
             except Exception:
                 NODE_ERRORS.labels(node=node_name).inc()
                 raise
@@ -28,10 +90,112 @@ def instrument(node_name: str) -> Callable:
     return decorator
 
 
+def record_source(source: str, outcome: str, duration: float) -> None:
+    SOURCE_CALLS.labels(source=source, outcome=outcome).inc()
+    SOURCE_LATENCY.labels(source=source).observe(duration)
+
+
+def record_cache(cache: str, result: str) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result=result).inc()
+
+
+def record_coalesced(name: str, role: str) -> None:
+    COALESCED_CALLS.labels(name=name, role=role).inc()
+
+
+def record_prompt(node: str, given_tokens: int, sent_tokens: int) -> None:
+    PROMPT_TOKENS.labels(node=node, stage="given").inc(given_tokens)
+    PROMPT_TOKENS.labels(node=node, stage="sent").inc(sent_tokens)
+    if given_tokens:
+        PROMPT_COMPRESSION.labels(node=node).observe(sent_tokens / given_tokens)
+
+
+def record_recommendation_parse(path: str) -> None:
+    RECOMMENDATION_PARSES.labels(path=path).inc()
+
+
+def record_llm_cache_hit(provider: str, model: str) -> None:
+    LLM_CACHE_HITS.labels(provider=provider, model=model).inc()
+
+
+def record_ttft(node: str, provider: str, model: str, duration: float, mode: str = "stream") -> None:
+    LLM_TTFT.labels(node=node, provider=provider, model=model, mode=mode).observe(duration)
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str) -> Iterator[None]:
+    """Count an LLM call as in flight for the block and record its outcome."""
+    in_flight = LLM_IN_FLIGHT.labels(provider=provider, model=model)
+    in_flight.inc()
+    try:
+        yield
+    except Exception as exc:
+        if is_rate_limited(exc):
+            LLM_RATE_LIMITED.labels(provider=provider, model=model).inc()
+            LLM_REQUESTS.labels(provider=provider, model=model, outcome="rate_limited").inc()
+        else:
+            LLM_REQUESTS.labels(provider=provider, model=model, outcome="error").inc()
+        raise
+    else:
+        LLM_REQUESTS.labels(provider=provider, model=model, outcome="ok").inc()
+    finally:
+        in_flight.dec()
+
+
+def record_concurrency_limit(provider: str, limit: int) -> None:
+    PROVIDER_LIMIT.labels(provider=provider).set(limit)
+
+
+def record_queue_wait(provider: str, priority: int, duration: float) -> None:
+    label = {0: "interactive", 1: "batch"}.get(priority, str(priority))
+    PROVIDER_QUEUE_WAIT.labels(provider=provider, priority=label).observe(duration)
+
+
+def record_breaker_state(provider: str, state: str) -> None:
+    BREAKER_STATE.labels(provider=provider).set({"closed": 0, "half_open": 1, "open": 2}[state])
+    BREAKER_TRANSITIONS.labels(provider=provider, state=state).inc()
+
+
+def record_retry(provider: str) -> None:
+    PROVIDER_RETRIES.labels(provider=provider).inc()
+
+
+def record_hedge(provider: str) -> None:
+    PROVIDER_HEDGES.labels(provider=provider).inc()
+
+
+def record_fallback(provider: str) -> None:
+    PROVIDER_FALLBACKS.labels(provider=provider).inc()
+
+
+def record_api_job(outcome: str) -> None:
+    API_JOBS.labels(outcome=outcome).inc()
+
+
+def record_api_queue_depth(depth: int) -> None:
+    API_QUEUE_DEPTH.set(depth)
+
+
+def record_llm_usage(provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Record token counts and return the estimated cost in USD."""
+    LLM_TOKENS.labels(provider=provider, model=model, kind="prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(provider=provider, model=model, kind="completion").inc(completion_tokens)
+    prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+    cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    if cost:
+        LLM_COST.labels(provider=provider, model=model).inc(cost)
+    return cost
+
+
 def start_metrics_server(port: int = 9100) -> None:
     start_http_server(port)
 
 
-__all__ = ["instrument", "start_metrics_server"]
+__all__ = [
+    "instrument", "record_source", "record_cache", "record_coalesced", "record_prompt", "record_recommendation_parse",
+    "record_llm_cache_hit", "record_ttft", "track_llm_call", "record_llm_usage", "record_concurrency_limit",
+    "record_queue_wait", "record_breaker_state", "record_retry", "record_hedge", "record_fallback", "record_api_job",
+    "record_api_queue_depth", "parse_prices", "start_metrics_server",
+]
 
 
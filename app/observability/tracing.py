@@ -0,0 +1,224 @@
+"""Lightweight tracing: one trace per query, child spans per node and external call.
+
+Spans are exported in the background either as JSON lines to a local file or as
+OTLP/HTTP JSON to a collector (Jaeger, Tempo, the OpenTelemetry Collector...).
+With no exporter configured, ``span`` is a near no-op.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import TRACE_EXPORTER, TRACE_FILE, OTLP_ENDPOINT, TRACE_SERVICE_NAME
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class FileExporter:
+    """Append finished spans to ``path`` as JSON lines."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for span in spans:
+                fh.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPHttpExporter:
+    """POST spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = TRACE_SERVICE_NAME):
+        import httpx  # only needed when spans are shipped to a collector
+
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=5.0)
+
+    def export(self, spans: List[Span]) -> None:
+        otlp_spans = []
+        for span in spans:
+            item = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                item["parentSpanId"] = span.parent_id
+            otlp_spans.append(item)
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "app.observability.tracing"}, "spans": otlp_spans}],
+            }]
+        }
+        self._client.post(self.url, json=body).raise_for_status()
+
+
+class _BatchProcessor:
+    """Hands finished spans to the exporter from a background thread."""
+
+    def __init__(self, exporter, max_batch: int = 256, interval: float = 1.0):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        threading.Thread(target=self._run, name="trace-export", daemon=True).start()
+
+    def submit(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            flushed: List[threading.Event] = []
+            try:
+                item = self._queue.get(timeout=self.interval)
+                while True:
+                    if isinstance(item, threading.Event):
+                        flushed.append(item)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.max_batch:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as exc:
+                    logger.warning("Dropped %d spans: %s export failed: %s",
+                                   len(batch), type(self.exporter).__name__, exc)
+            for event in flushed:
+                event.set()
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_processor: Optional[_BatchProcessor] = None
+
+
+def configure_tracing(exporter=None) -> None:
+    """Install ``exporter`` (or disable tracing with ``None``)."""
+    global _processor
+    if _processor is not None:
+        _processor.flush()
+    _processor = _BatchProcessor(exporter) if exporter is not None else None
+
+
+def flush() -> None:
+    if _processor is not None:
+        _processor.flush()
+
+
+@contextmanager
+def span(name: str, *, new_trace: bool = False, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record a span around the block, as a child of the current span.
+
+    ``new_trace=True`` starts a fresh trace (one per user query).
+    """
+    if _processor is None:
+        yield None
+        return
+
+    parent = None if new_trace else _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    )
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        _processor.submit(current)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Attach attributes to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+
+def _exporter_from_config():
+    if TRACE_EXPORTER == "file":
+        return FileExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "otlp":
+        return OTLPHttpExporter(OTLP_ENDPOINT)
+    return None
+
+
+configure_tracing(_exporter_from_config())
+atexit.register(flush)
+
+
+__all__ = [
+    "Span", "FileExporter", "OTLPHttpExporter", "configure_tracing", "flush", "span", "set_attributes",
+]
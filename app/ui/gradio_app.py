@@ -1,24 +1,22 @@
-from ..graph.state import StockState
-from ..graph.nodes.infer import infer_ticker_node
-from ..graph.nodes.crawl import crawl_node
-from ..graph.nodes.analyze import analyze_node
-from ..graph.nodes.recommend import recommend_node, highlight_recommendation
-from ..utils.portfolio import (
-    extract_portfolio_allocations,
-    plot_portfolio_pie,
-    extract_portfolio_section,
-    format_portfolio,
-    plot_price_history,
-)
+from ..graph.builder import build_graph
+from ..graph.nodes.recommend import highlight_recommendation
+from ..graph.state import Recommendation
+from ..utils.portfolio import plot_portfolio_pie, format_portfolio, plot_price_history
+from ..utils.charts import png_file
+from ..utils.market_data import request_scope
+from .rendering import IncrementalMarkdown
 from ..observability.monitoring import start_metrics_server
-from langgraph.graph import StateGraph
-import gradio as gr
+from ..observability.tracing import span, set_attributes
 import markdown
+import contextvars
 import os
+import queue
+import threading
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from config import START_LOCAL_MONITORING
+from config import CHART_WORKERS, START_LOCAL_MONITORING
 # try:
 #     from dotenv import load_dotenv  # type: ignore
 #     load_dotenv()
@@ -26,59 +24,165 @@ from config import START_LOCAL_MONITORING
 #     pass
 
 
-def build_graph():
-    graph_builder = StateGraph(StockState)
-    graph_builder.add_node("infer_ticker", infer_ticker_node)
-    graph_builder.add_node("crawl", crawl_node)
-    graph_builder.add_node("analyze", analyze_node)
-    graph_builder.add_node("recommend", recommend_node)
-    graph_builder.set_entry_point("infer_ticker")
-    graph_builder.add_edge("infer_ticker", "crawl")
-    graph_builder.add_edge("crawl", "analyze")
-    graph_builder.add_edge("analyze", "recommend")
-    return graph_builder.compile()
+# Price charts only need the ticker, so they render alongside the LLM stages.
+# These threads load the bars and wait on the render pool in utils.charts (they
+# cannot run on it: a thread pool could deadlock, a process pool cannot take
+# them), so both are sized by CHART_WORKERS.
+_chart_pool = ThreadPoolExecutor(max_workers=CHART_WORKERS, thread_name_prefix="chart")
+
+
+def _section(title: str, body_html: str) -> str:
+    return f"<details open><summary><b>{title}</b></summary>{body_html}</details>"
+
+
+class _View:
+    """Current contents of the UI outputs, in ``iface`` output order."""
+
+    def __init__(self):
+        self.inferred = ""
+        self.summary = ""
+        self.analysis = ""
+        self.recommendations = ""
+        self.price_chart = None
+        self.portfolio_chart = None
+        self.portfolio = ""
+
+    def outputs(self):
+        return (
+            self.inferred, self.summary, self.analysis, self.recommendations,
+            self.price_chart, self.portfolio_chart, self.portfolio,
+        )
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph():
+    """Compile the analysis graph once and share it across sessions."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_graph()
+    return _graph
+
+
+def _pump_graph(graph, state, events):
+    """Stream ``graph`` into ``events`` from a worker thread.
+
+    The request scope and trace live here rather than in the UI generator,
+    whose steps Gradio may run on different threads. The price chart starts
+    as soon as the ticker is known; ``end`` carries it so it is never missed.
+    """
+    chart = None
+    try:
+        with request_scope(), span("query", new_trace=True, user_input=state["user_input"]):
+            for mode, chunk in graph.stream(state, stream_mode=["updates", "custom"]):
+                ticker = (chunk.get("infer_ticker") or {}).get("ticker", "") if mode == "updates" else ""
+                if ticker and ticker != "UNKNOWN":
+                    set_attributes(ticker=ticker)
+                    chart = _chart_pool.submit(contextvars.copy_context().run, plot_price_history, ticker)
+                    chart.add_done_callback(lambda done: events.put(("chart", done)))
+                events.put((mode, chunk))
+        events.put(("end", chart))
+    except BaseException as exc:
+        events.put(("error", exc))
+
+
+def _image(png):
+    # Gradio serves a PNG file as is; a PIL image would be decoded and re-encoded.
+    return png_file(png) if isinstance(png, bytes) else png
+
+
+def _chart_result(chart):
+    try:
+        return _image(chart.result())
+    except Exception:
+        return None
+
+
+def _render_partial(view, node, html):
+    if node == "analyze":
+        view.analysis = _section("Analysis", html)
+    elif node == "recommend":
+        view.recommendations = _section("Recommendations", highlight_recommendation(html))
 
 
 def analyze_query_streaming(user_query: str):
-    state = {"user_input": user_query.strip()}
-    state = infer_ticker_node(state)
-    inferred_ticker = state.get("ticker", "").upper() if state.get("ticker") else ""
-    inferred_html = f"<details open><summary><b>Inferred Ticker</b></summary><p>{inferred_ticker or '—'}</p></details>"
-    yield inferred_html, "", "", None, None, ""
-
-    state = crawl_node(state)
-    summary_html = f"<details open><summary><b>Summary</b></summary>{markdown.markdown(state['summary'])}</details>"
-    yield inferred_html, summary_html, "", None, None, ""
-
-    state = analyze_node(state)
-    analysis_html = f"<details open><summary><b>Analysis</b></summary>{markdown.markdown(state['analysis'])}</details>"
-    yield inferred_html, summary_html, analysis_html, None, None, ""
-
-    state = recommend_node(state)
-    recommendations_html = f"<details open><summary><b>Recommendations</b></summary>{highlight_recommendation(markdown.markdown(state['recommendations']))}</details>"
-
-    portfolio_text = extract_portfolio_section(state['recommendations'])
-    portfolio_html = format_portfolio(portfolio_text)
-    portfolio_chart = plot_portfolio_pie(state['recommendations'])
-    price_chart = plot_price_history(state["ticker"])  # inferred ticker
-
-    yield inferred_html, summary_html, analysis_html, price_chart, portfolio_chart, portfolio_html
-
-
-iface = gr.Interface(
-    fn=analyze_query_streaming,
-    inputs=gr.Textbox(label="Enter Company Name or Ticker", placeholder="e.g. Apple, AAPL, or aaplee"),
-    outputs=[
-        gr.HTML(label="Inferred Ticker"),
-        gr.HTML(label="Summary"),
-        gr.HTML(label="Analysis"),
-        gr.Image(label="Price History"),
-        gr.Image(label="Portfolio Allocation"),
-        gr.HTML(label="Portfolio Details")
-    ],
-    title="Stock Analyzer (Streaming Outputs + Ticker Inference)",
-    description="Type a company name or a misspelled ticker. The app infers the ticker, crawls data, analyzes it, and recommends actions."
-)
+    """Run the compiled graph and yield UI outputs for every streamed event.
+
+    Node updates, token deltas (LangGraph ``custom`` events) and price-chart
+    completion all arrive on one queue, so each is shown as soon as it lands.
+    """
+    view = _View()
+    events = queue.Queue()
+    renderers = {}
+    threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(_pump_graph, get_graph(), {"user_input": user_query.strip()}, events),
+        daemon=True,
+    ).start()
+
+    while True:
+        kind, payload = events.get()
+        if kind == "custom":
+            renderer = renderers.setdefault(payload["node"], IncrementalMarkdown())
+            _render_partial(view, payload["node"], renderer.feed(payload["delta"]))
+        elif kind == "updates":
+            for node, update in payload.items():
+                update = update or {}
+                if node == "infer_ticker":
+                    inferred_ticker = update.get("ticker", "").upper()
+                    view.inferred = f"<details open><summary><b>Inferred Ticker</b></summary><p>{inferred_ticker or '—'}</p></details>"
+                elif node == "crawl":
+                    view.summary = _section("Summary", markdown.markdown(update.get("summary", "")))
+                elif node == "analyze":
+                    _render_partial(view, node, markdown.markdown(update.get("analysis", "")))
+                elif node == "recommend":
+                    recommendation = update.get("recommendation") or Recommendation()
+                    _render_partial(view, node, markdown.markdown(recommendation.text))
+                    view.portfolio = format_portfolio(recommendation.portfolio)
+                    view.portfolio_chart = _image(plot_portfolio_pie(recommendation.allocations))
+        elif kind == "chart":
+            view.price_chart = _chart_result(payload)
+        elif kind == "error":
+            raise payload
+        else:
+            if payload is not None:
+                view.price_chart = _chart_result(payload)
+            yield view.outputs()
+            break
+        yield view.outputs()
+
+
+def build_interface():
+    # Gradio takes seconds to import, so only the launched app pays for it.
+    import gradio as gr
+
+    return gr.Interface(
+        fn=analyze_query_streaming,
+        inputs=gr.Textbox(label="Enter Company Name or Ticker", placeholder="e.g. Apple, AAPL, or aaplee"),
+        outputs=[
+            gr.HTML(label="Inferred Ticker"),
+            gr.HTML(label="Summary"),
+            gr.HTML(label="Analysis"),
+            gr.HTML(label="Recommendations"),
+            gr.Image(label="Price History"),
+            gr.Image(label="Portfolio Allocation"),
+            gr.HTML(label="Portfolio Details")
+        ],
+        title="Stock Analyzer (Streaming Outputs + Ticker Inference)",
+        description="Type a company name or a misspelled ticker. The app infers the ticker, crawls data, analyzes it, and recommends actions."
+    )
+
+
+def __getattr__(name):
+    # ``iface`` is still importable, but built on first access.
+    if name == "iface":
+        globals()["iface"] = build_interface()
+        return globals()["iface"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _maybe_start_local_monitoring():
@@ -110,7 +214,7 @@ def main():
     except Exception:
         pass
     _maybe_start_local_monitoring()
-    iface.launch(server_name="0.0.0.0", server_port=7860)
+    build_interface().launch(server_name="0.0.0.0", server_port=7860)
 
 
 
@@ -0,0 +1,57 @@
+import re
+from typing import List
+
+import markdown
+
+
+# A block starting like this may belong to the list/indent before it.
+_CONTINUATION = re.compile(r"[ \t]|\d+[.)]|[-*+][ \t]")
+
+
+class IncrementalMarkdown:
+    """Render a growing markdown string without re-rendering finished blocks.
+
+    Text is split at blank lines outside fenced code. Blocks before the last
+    safe boundary are rendered once and cached; only the trailing, still
+    growing block is re-rendered on each ``feed``.
+    """
+
+    def __init__(self) -> None:
+        self._done_html: List[str] = []
+        self._pending = ""
+
+    def feed(self, delta: str) -> str:
+        self._pending += delta
+        cut = self._last_boundary()
+        if cut > 0:
+            block, self._pending = self._pending[:cut], self._pending[cut:]
+            self._done_html.append(markdown.markdown(block))
+        return self.html()
+
+    def html(self) -> str:
+        tail = markdown.markdown(self._pending) if self._pending.strip() else ""
+        return "".join(self._done_html) + tail
+
+    def _last_boundary(self) -> int:
+        text = self._pending
+        cut = -1
+        in_fence = False
+        pos = 0
+        while True:
+            boundary = text.find("\n\n", pos)
+            fence = text.find("```", pos)
+            if fence != -1 and (boundary == -1 or fence < boundary):
+                in_fence = not in_fence
+                pos = fence + 3
+                continue
+            if boundary == -1:
+                return cut
+            pos = boundary + 2
+            if in_fence:
+                continue
+            rest = text[pos:].lstrip("\n")
+            if len(rest) < 4 and "\n" not in rest:
+                # Not enough of the next block yet to know whether it continues a list.
+                return cut
+            if not _CONTINUATION.match(rest):
+                cut = pos
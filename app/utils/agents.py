@@ -1,17 +1,54 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from config import GOOGLE_API_KEY, GROQ_API_KEY
+from config import GOOGLE_API_KEY, GROQ_API_KEY, LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL
+from .providers import LazyProvider, get, register
+from .resilience import timeout_for
+
+# Clients are built on first use (see utils.providers), so importing the graph
+# does not pay for the Gemini/Groq SDK imports or client setup.
+
+
+def _with_cache(llm, name: str):
+    # Repeat prompts (same model, params and text) are answered from a local store
+    if not LLM_CACHE_ENABLED:
+        return llm
+    from .llm_cache import CachedChatModel
+    return CachedChatModel(llm, get("llm_response_store"), name=name, ttl=LLM_CACHE_TTL)
+
+
+def _build_response_store():
+    from .llm_cache import SQLiteResponseStore
+    return SQLiteResponseStore(LLM_CACHE_PATH)
+
 
 # Agent A: Gemini 2.0 Flash
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0,
-    google_api_key=GOOGLE_API_KEY
-)
+def _build_gemini():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    llm = ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        temperature=0,
+        google_api_key=GOOGLE_API_KEY,
+        # Retries and deadlines are handled by utils.resilience around every call
+        max_retries=0,
+        timeout=timeout_for("gemini"),
+    )
+    return _with_cache(llm, "gemini")
+
 
 # Agent B: Groq LLaMA 3.1 8B Instant
-llama = ChatGroq(
-    groq_api_key=GROQ_API_KEY,
-    model="llama-3.1-8b-instant",
-    temperature=0.3,
-)
+def _build_llama():
+    from langchain_groq import ChatGroq
+    llm = ChatGroq(
+        groq_api_key=GROQ_API_KEY,
+        model="llama-3.1-8b-instant",
+        temperature=0.3,
+        max_retries=0,
+        request_timeout=timeout_for("groq"),
+    )
+    return _with_cache(llm, "llama")
+
+
+register("llm_response_store", _build_response_store)
+register("gemini", _build_gemini)
+register("llama", _build_llama)
+
+gemini = LazyProvider("gemini")
+llama = LazyProvider("llama")
@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into one bulk call.
+
+    The first request for a ``group`` waits ``window`` seconds while other
+    threads add their items, then issues one ``fetch_many(group, items)`` call
+    and hands each waiter its own slice of the result. A batch is flushed
+    early once it reaches ``max_batch`` items.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[Hashable, List[str]], Dict[str, Any]],
+        window: float = 0.005,
+        max_batch: int = 50,
+    ):
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, Dict[str, Future]] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, group: Hashable, item: str) -> Any:
+        with self._lock:
+            pending = self._pending.setdefault(group, {})
+            future = pending.get(item)
+            leader = not pending
+            if future is None:
+                future = Future()
+                pending[item] = future
+            full = len(pending) >= self.max_batch
+
+        if full:
+            self._flush(group)
+        elif leader:
+            time.sleep(self.window)
+            self._flush(group)
+        return future.result()
+
+    def _flush(self, group: Hashable) -> None:
+        with self._lock:
+            pending = self._pending.pop(group, None)
+        if not pending:
+            return
+
+        try:
+            results = self.fetch_many(group, list(pending))
+        except BaseException as exc:
+            for future in pending.values():
+                future.set_exception(exc)
+            return
+        for item, future in pending.items():
+            future.set_result(results.get(item))
+
+
+__all__ = ["MicroBatcher"]
@@ -0,0 +1,164 @@
+"""Chart rendering: Agg canvases, a render pool and cached PNG bytes.
+
+Figures are drawn with matplotlib's object-oriented API on an Agg canvas, so
+pyplot's global state is never touched and renders are safe from any
+thread. Each render worker keeps one figure per chart kind and redraws it
+instead of building a new one. Renders run on a pool (``CHART_POOL`` =
+``thread`` or ``process``), their PNG bytes are cached by
+``(kind, ticker, period, data hash)``, and concurrent requests for the same
+chart share a single render.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from config import CHART_CACHE_SIZE, CHART_CACHE_TTL, CHART_DIR, CHART_POOL, CHART_WORKERS
+from .cache import TTLCache
+from .singleflight import SingleFlight
+
+
+_png_cache = TTLCache("chart_png", maxsize=CHART_CACHE_SIZE, ttl=CHART_CACHE_TTL)
+_renders = SingleFlight("chart")
+_templates = threading.local()
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if CHART_POOL == "process":
+                    _pool = ProcessPoolExecutor(max_workers=CHART_WORKERS)
+                else:
+                    _pool = ThreadPoolExecutor(max_workers=CHART_WORKERS, thread_name_prefix="render")
+    return _pool
+
+
+def data_hash(*arrays: Any) -> str:
+    """Digest of the raw bytes of ``arrays`` (NumPy arrays or anything array-like)."""
+    import numpy as np
+
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _template(kind: str, figsize: Tuple[float, float]):
+    """This worker's reusable figure for ``kind``, cleared for a new render."""
+    templates: Dict[str, Any] = getattr(_templates, "figures", None)
+    if templates is None:
+        templates = _templates.figures = {}
+    if kind not in templates:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        templates[kind] = (fig, fig.add_subplot())
+    fig, ax = templates[kind]
+    ax.clear()
+    return fig, ax
+
+
+def _to_png(fig) -> bytes:
+    buf = BytesIO()
+    fig.canvas.print_png(buf)
+    return buf.getvalue()
+
+
+PERIOD_LABELS = {
+    "1d": "1 Day", "5d": "5 Days", "1mo": "1 Month", "3mo": "3 Months",
+    "6mo": "6 Months", "1y": "1 Year", "2y": "2 Years", "5y": "5 Years",
+}
+
+
+def draw_price_history(ticker: str, dates: Any, closes: Any, period: str = "1mo") -> bytes:
+    import matplotlib.dates as mdates
+
+    fig, ax = _template("price", (6, 4))
+    ax.plot(dates, closes, label="Close Price", color="blue")
+    ax.set_title(f"{ticker} Price History ({PERIOD_LABELS.get(period, period)})")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Price")
+    ax.grid(True)
+    ax.legend()
+    ax.xaxis.set_major_locator(mdates.DayLocator(interval=3))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d, %Y"))
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return _to_png(fig)
+
+
+def draw_allocation_pie(labels: Sequence[str], sizes: Sequence[float]) -> bytes:
+    fig, ax = _template("pie", (5, 5))
+    ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
+    ax.set_title("Portfolio Allocation")
+    return _to_png(fig)
+
+
+def render(key: Hashable, draw: Callable[..., bytes], *args: Any) -> bytes:
+    """Return cached PNG bytes for ``key``, rendering ``draw(*args)`` on the pool if needed."""
+    png = _png_cache.get(key)
+    if png is None:
+        png = _renders.run(key, lambda emit: _get_pool().submit(draw, *args).result())
+        _png_cache.set(key, png)
+    return png
+
+
+def png_file(png: bytes) -> str:
+    """Write ``png`` once to a content-addressed file and return its path.
+
+    UIs that take file paths (Gradio's ``Image``) can serve the bytes as they
+    are, without decoding and re-encoding them. The directory keeps at most
+    ``CHART_CACHE_SIZE`` files; the least recently used ones are removed.
+    """
+    directory = CHART_DIR or os.path.join(tempfile.gettempdir(), "stock_analyzer_charts")
+    path = os.path.join(directory, hashlib.blake2b(png, digest_size=16).hexdigest() + ".png")
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(png)
+    os.replace(tmp_path, path)
+    _prune_files(directory, CHART_CACHE_SIZE)
+    return path
+
+
+def _prune_files(directory: str, keep: int) -> None:
+    files = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".png"):
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+    for _, path in sorted(files)[:max(0, len(files) - keep)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # another worker got to it first
+
+
+def clear_cache() -> None:
+    _png_cache.clear()
+
+
+__all__ = [
+    "PERIOD_LABELS",
+    "data_hash",
+    "draw_price_history",
+    "draw_allocation_pie",
+    "render",
+    "png_file",
+    "clear_cache",
+]
@@ -0,0 +1,40 @@
+_TRANSIENT_NAMES = ("Timeout", "Connect", "Network", "Unavailable", "ServerError", "InternalServer")
+
+
+def _status(exc: BaseException):
+    response = getattr(exc, "response", None)
+    for status in (getattr(exc, "status_code", None), getattr(exc, "code", None), getattr(response, "status_code", None)):
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True if ``exc`` is a provider 429 / quota-exhausted error."""
+    name = type(exc).__name__
+    if "RateLimit" in name or "ResourceExhausted" in name:
+        return True
+    return _status(exc) == 429 or "RESOURCE_EXHAUSTED" in str(exc)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for failures worth retrying: timeouts, connection errors, 429s and 5xx."""
+    if isinstance(exc, (TimeoutError, ConnectionError)) or is_rate_limited(exc):
+        return True
+    status = _status(exc)
+    if status is not None and status >= 500:
+        return True
+    name = type(exc).__name__
+    return any(part in name for part in _TRANSIENT_NAMES)
+
+
+def is_unavailable(exc: BaseException) -> bool:
+    """True when the provider could not give an answer (outage, open breaker, deadline).
+
+    Unlike a "not found" answer, such a failure says nothing about the request
+    itself, so its outcome must not be cached.
+    """
+    return is_retryable(exc) or "CircuitOpen" in type(exc).__name__
+
+
+__all__ = ["is_rate_limited", "is_retryable", "is_unavailable"]
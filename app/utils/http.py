@@ -0,0 +1,182 @@
+"""One pooled HTTP client shared by every REST data source.
+
+Connections are kept alive between calls (and multiplexed over HTTP/2 when
+the ``h2`` package is installed), so repeat calls to the same API skip the
+TCP and TLS handshakes. Host lookups are cached for ``HTTP_DNS_TTL`` seconds.
+"""
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_DNS_TTL,
+)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class CachingDNSBackend(httpcore.SyncBackend):
+    """Resolve each host at most once per ``ttl`` seconds.
+
+    The TCP connection goes to the cached address. TLS still verifies the
+    original host name, because httpcore passes it separately as the SNI
+    server name.
+    """
+
+    def __init__(self, ttl: float = HTTP_DNS_TTL):
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = self.resolve(host, port)
+        except OSError:
+            addresses = [host]
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return super().connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as exc:
+                last_error = exc
+        with self._lock:
+            self._cache.pop((host, port), None)
+        raise last_error or httpcore.ConnectError(f"could not connect to {host}:{port}")
+
+
+def _httpx_error(exc: Exception) -> Exception:
+    """The httpx exception matching an httpcore one (both libraries use the same class names)."""
+    for cls in type(exc).__mro__:
+        mapped = getattr(httpx, cls.__name__, None)
+        if isinstance(mapped, type) and issubclass(mapped, httpx.TransportError):
+            return mapped(str(exc))
+    return httpx.TransportError(str(exc))
+
+
+@contextmanager
+def _mapped_errors() -> Iterator[None]:
+    try:
+        yield
+    except httpcore.TimeoutException as exc:
+        raise _httpx_error(exc) from exc
+    except (httpcore.NetworkError, httpcore.ProtocolError, httpcore.ProxyError, httpcore.UnsupportedProtocol) as exc:
+        raise _httpx_error(exc) from exc
+
+
+class _ResponseStream(httpx.SyncByteStream):
+    def __init__(self, stream: Iterable[bytes]):
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[bytes]:
+        with _mapped_errors():
+            yield from self._stream
+
+    def close(self) -> None:
+        if hasattr(self._stream, "close"):
+            self._stream.close()
+
+
+class PooledTransport(httpx.BaseTransport):
+    """httpx transport over its own ``httpcore.ConnectionPool`` using :class:`CachingDNSBackend`.
+
+    Proxies configured through the environment are still honoured: the
+    client mounts its own proxy transports in front of this one.
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool, dns_ttl: float = HTTP_DNS_TTL):
+        self._pool = httpcore.ConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=CachingDNSBackend(dns_ttl),
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _mapped_errors():
+            response = self._pool.handle_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def build_client() -> httpx.Client:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.Client(
+        transport=PooledTransport(limits, http2=HTTP2_AVAILABLE),
+        headers={"User-Agent": "lang-graph/1.0"},
+        follow_redirects=True,
+    )
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = build_client()
+    return _client
+
+
+def close() -> None:
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+__all__ = ["HTTP2_AVAILABLE", "CachingDNSBackend", "PooledTransport", "build_client", "get_client", "close"]
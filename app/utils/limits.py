@@ -0,0 +1,219 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .errors import is_rate_limited
+from ..observability.monitoring import record_concurrency_limit, record_queue_wait
+from config import (
+    PROVIDER_CONCURRENCY, PROVIDER_RATES, ADAPTIVE_CONCURRENCY, ADAPTIVE_LATENCY_TOLERANCE, ADAPTIVE_BACKOFF,
+)
+
+
+PROVIDERS = ("gemini", "groq", "yahoo", "finnhub", "tavily", "newsapi")
+
+# Queue priorities: lower runs first.
+INTERACTIVE = 0
+BATCH = 1
+
+# Concurrency cap for providers configured with a rate only.
+_UNCAPPED = 1024
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("provider_priority", default=INTERACTIVE)
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """Parse ``"gemini=4,groq=2"`` into ``{"gemini": 4, "groq": 2}``."""
+    limits: Dict[str, int] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        limits[name.strip().lower()] = int(value)
+    return limits
+
+
+def parse_rates(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse ``"gemini=20/40,finnhub=1"`` into ``{name: (per_second, burst)}``."""
+    rates: Dict[str, Tuple[float, float]] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        rates[name.strip().lower()] = (float(rate), float(burst or rate))
+    return rates
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, up to ``burst`` banked."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class ProviderLimiter:
+    """Concurrency cap, rate limit and priority queue for one provider.
+
+    Waiters are admitted in (priority, arrival) order, so interactive calls
+    overtake queued batch calls. With ``adaptive`` on, the cap follows AIMD:
+    it grows by ``1/limit`` per call that finishes near the best latency seen
+    and is cut by ``backoff`` on a 429 or when latency exceeds ``tolerance``
+    times that baseline (at most once per baseline interval).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        rate: Optional[Tuple[float, float]] = None,
+        adaptive: bool = ADAPTIVE_CONCURRENCY,
+        tolerance: float = ADAPTIVE_LATENCY_TOLERANCE,
+        backoff: float = ADAPTIVE_BACKOFF,
+        min_concurrency: int = 1,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = min(min_concurrency, self.max_concurrency)
+        self.bucket = TokenBucket(*rate) if rate else None
+        self.adaptive = adaptive
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.baseline: Optional[float] = None
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        record_concurrency_limit(name, self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self, priority: int = INTERACTIVE) -> None:
+        start_time = time.perf_counter()
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            while self._waiters[0] != entry or self._in_flight >= self.limit:
+                self._cond.wait()
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            # Reserve the token while still first in line so rate order follows priority.
+            delay = self.bucket.reserve() if self.bucket else 0.0
+            self._cond.notify_all()
+        if delay:
+            time.sleep(delay)
+        record_queue_wait(self.name, priority, time.perf_counter() - start_time)
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if self.adaptive:
+                self._adjust(latency, rate_limited)
+            self._cond.notify_all()
+
+    def _adjust(self, latency: Optional[float], rate_limited: bool) -> None:
+        congested = rate_limited
+        if latency is not None:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                # Drift up slowly so a lasting shift in provider speed becomes the new normal.
+                self.baseline *= 1.01
+            congested = congested or latency > self.baseline * self.tolerance
+
+        if congested:
+            now = time.monotonic()
+            if now - self._last_decrease >= (self.baseline or 0.0):
+                self._limit = max(float(self.min_concurrency), self._limit * self.backoff)
+                self._last_decrease = now
+        else:
+            self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+        record_concurrency_limit(self.name, self.limit)
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_lock = threading.Lock()
+
+
+def configure_limits(
+    limits: Mapping[str, int], rates: Optional[Mapping[str, Tuple[float, float]]] = None
+) -> None:
+    """Replace the concurrency cap (and optionally rate) for the given providers.
+
+    Providers given only in ``limits`` keep their current rate limit.
+    """
+    rates = rates or {}
+    with _lock:
+        for name in set(limits) | set(rates):
+            current = _limiters.get(name)
+            max_concurrency = limits.get(name, current.max_concurrency if current else _UNCAPPED)
+            rate = rates.get(name)
+            if rate is None and current is not None and current.bucket is not None:
+                rate = (current.bucket.rate, current.bucket.burst)
+            _limiters[name] = ProviderLimiter(name, max_concurrency, rate)
+
+
+def get_limiter(provider: str) -> Optional[ProviderLimiter]:
+    return _limiters.get(provider)
+
+
+@contextmanager
+def priority_scope(priority: int) -> Iterator[None]:
+    """Queue provider calls made inside the block at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def provider_slot(provider: str) -> Iterator[None]:
+    """Hold one of ``provider``'s slots for the duration of a call.
+
+    Waits for a concurrency slot and a rate token, in priority order (see
+    :func:`priority_scope`), then feeds the call's latency and any 429 back
+    into the adaptive limit. Providers without a configured limit are not
+    throttled.
+    """
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        yield
+        return
+    limiter.acquire(_priority.get())
+    start_time = time.perf_counter()
+    try:
+        yield
+    except BaseException as exc:
+        limiter.release(latency=time.perf_counter() - start_time, rate_limited=is_rate_limited(exc))
+        raise
+    limiter.release(latency=time.perf_counter() - start_time)
+
+
+configure_limits(parse_limits(PROVIDER_CONCURRENCY), parse_rates(PROVIDER_RATES))
+
+
+__all__ = [
+    "PROVIDERS", "INTERACTIVE", "BATCH", "TokenBucket", "ProviderLimiter", "parse_limits", "parse_rates",
+    "configure_limits", "get_limiter", "priority_scope", "provider_slot", "is_rate_limited",
+]
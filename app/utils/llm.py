@@ -0,0 +1,122 @@
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from . import resilience
+from .errors import is_retryable
+from .llm_cache import CachedChatModel, ticker_scope
+from .providers import resolve
+from ..observability.monitoring import record_llm_cache_hit, record_llm_usage, record_ttft, track_llm_call
+from ..observability.tracing import span, set_attributes
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def _usage(message: Any) -> Tuple[int, int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+
+def model_name(llm: Any) -> str:
+    name = str(getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__)
+    return name[len("models/"):] if name.startswith("models/") else name
+
+
+def run_llm(
+    llm: Any,
+    prompt: str,
+    *,
+    node: str,
+    provider: str,
+    ticker: str = "",
+    writer: Optional[Callable[[Any], None]] = None,
+) -> str:
+    """Call ``llm`` and return its text.
+
+    Without a ``writer`` this is a plain ``invoke``. With one, the response is
+    streamed and every non-empty chunk is passed on as
+    ``{"node": node, "delta": text}`` as soon as it arrives. The time to the
+    first chunk is recorded as ``llm_time_to_first_token_seconds{mode="stream"}``;
+    an ``invoke`` records its full latency under ``mode="invoke"``. ``ticker``
+    tags the call for the response cache (see ``utils.llm_cache``).
+
+    A cached answer is returned (and passed to ``writer`` as one delta)
+    before any limiter, breaker or LLM request metric is touched; it only
+    counts in ``llm_cache_hits_total``.
+
+    Every call also feeds the per-model LLM metrics: in-flight requests,
+    outcome (including 429s), token counts and estimated cost. Deadlines,
+    retries and the circuit breaker come from ``utils.resilience``.
+    """
+    model = model_name(llm)
+    client = resolve(llm)
+    cache = client if isinstance(client, CachedChatModel) else None
+    if cache is not None:
+        llm = cache.llm
+    with span(
+        f"llm.{provider}", node=node, provider=provider, model=model, ticker=ticker or None,
+        streaming=writer is not None,
+    ), ticker_scope(ticker):
+        cached = cache.lookup(prompt) if cache is not None else None
+        if cached is not None:
+            record_llm_cache_hit(provider, model)
+            if writer is not None:
+                writer({"node": node, "delta": cached})
+            return cached
+
+        if writer is None:
+            def invoke() -> Any:
+                start_time = time.perf_counter()
+                with track_llm_call(provider, model):
+                    response = llm.invoke(prompt)
+                ttft = time.perf_counter() - start_time
+                record_ttft(node, provider, model, ttft, mode="invoke")
+                set_attributes(ttft_ms=round(ttft * 1000, 1))
+                return response
+
+            response = resilience.call(provider, invoke, hedge=False)
+            prompt_tokens, completion_tokens = _usage(response)
+            cost = record_llm_usage(provider, model, prompt_tokens, completion_tokens)
+            set_attributes(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+            if cache is not None and isinstance(response.content, str):
+                cache.save(prompt, response.content)
+            return response.content
+
+        parts: List[str] = []
+
+        def stream() -> str:
+            start_time = time.perf_counter()
+            prompt_tokens = completion_tokens = 0
+            with track_llm_call(provider, model):
+                for chunk in llm.stream(prompt):
+                    chunk_prompt, chunk_completion = _usage(chunk)
+                    prompt_tokens += chunk_prompt
+                    completion_tokens += chunk_completion
+                    text = _chunk_text(chunk)
+                    if not text:
+                        continue
+                    if not parts:
+                        ttft = time.perf_counter() - start_time
+                        record_ttft(node, provider, model, ttft)
+                        set_attributes(ttft_ms=round(ttft * 1000, 1))
+                    parts.append(text)
+                    writer({"node": node, "delta": text})
+            cost = record_llm_usage(provider, model, prompt_tokens, completion_tokens)
+            set_attributes(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+            return "".join(parts)
+
+        # Streamed text has already reached the user, so only retry before the first token.
+        text = resilience.call(
+            provider, stream, hedge=False, isolate=False,
+            should_retry=lambda exc: not parts and is_retryable(exc),
+        )
+        if cache is not None:
+            cache.save(prompt, text)
+        return text
+
+
+__all__ = ["run_llm"]
@@ -0,0 +1,166 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from .providers import resolve
+from ..observability.monitoring import record_cache
+from ..observability.tracing import set_attributes
+
+
+_ticker: contextvars.ContextVar[str] = contextvars.ContextVar("llm_cache_ticker", default="")
+
+
+@contextmanager
+def ticker_scope(ticker: str) -> Iterator[None]:
+    """Tag LLM calls made inside the block with ``ticker`` for cache freshness."""
+    token = _ticker.set(ticker or "")
+    try:
+        yield
+    finally:
+        _ticker.reset(token)
+
+
+class ResponseStore(ABC):
+    """Interface for LLM response stores used by :class:`CachedChatModel`."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Stored content for ``key``, or ``None`` when missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, content: str, *, model: str, ticker: str, ttl: float) -> None:
+        """Store ``content`` under ``key`` for ``ttl`` seconds, tagged with ``ticker``."""
+
+    @abstractmethod
+    def invalidate_ticker(self, ticker: str) -> int:
+        """Drop every entry tagged with ``ticker``; returns how many were dropped."""
+
+    @abstractmethod
+    def refresh_ticker(self, ticker: str, digest: str) -> int:
+        """Record ``digest`` as ``ticker``'s source data; invalidate its entries if it changed."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns how many were deleted."""
+
+
+class SQLiteResponseStore(ResponseStore):
+    """Response store in a local SQLite file, so entries survive restarts.
+
+    Expired rows are deleted when the store is opened, so the file does not
+    keep growing across restarts.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, model TEXT, ticker TEXT,"
+                " content TEXT, created_at REAL, expires_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_ticker ON llm_cache (ticker)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS ticker_data (ticker TEXT PRIMARY KEY, digest TEXT)")
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM llm_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, content: str, *, model: str, ticker: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, ticker, content, now, now + ttl),
+            )
+
+    def invalidate_ticker(self, ticker: str) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM llm_cache WHERE ticker = ?", (ticker,)).rowcount
+
+    def refresh_ticker(self, ticker: str, digest: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM ticker_data WHERE ticker = ?", (ticker,)).fetchone()
+            if row is not None and row[0] == digest:
+                return 0
+            self._conn.execute("INSERT OR REPLACE INTO ticker_data VALUES (?, ?)", (ticker, digest))
+        return self.invalidate_ticker(ticker)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class CachedChatModel:
+    """Wrap a chat model so identical prompts are answered from a store.
+
+    Keys hash the model name, its sampling params and the prompt. Entries
+    expire after ``ttl`` seconds and are tagged with the ticker active in
+    :func:`ticker_scope`; :func:`refresh_ticker` drops a ticker's answers once
+    its crawled data changes. Attribute access is delegated to the model.
+
+    The cache is only consulted by ``utils.llm.run_llm``, which calls
+    :meth:`lookup` and :meth:`save` around the wrapped model, so a hit never
+    reaches the rate limiter, the circuit breaker or the LLM request metrics.
+    """
+
+    def __init__(self, llm: Any, store: ResponseStore, name: str, ttl: float):
+        self.llm = llm
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.llm, attr)
+
+    def _key(self, prompt: str) -> str:
+        params = {
+            "model": getattr(self.llm, "model", None) or getattr(self.llm, "model_name", None) or self.name,
+            "temperature": getattr(self.llm, "temperature", None),
+            "max_tokens": getattr(self.llm, "max_tokens", None),
+        }
+        payload = json.dumps({"params": params, "prompt": prompt}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        """Cached answer to ``prompt``, or ``None``; does not call the model."""
+        content = self.store.get(self._key(prompt))
+        record_cache(f"llm_{self.name}", "hit" if content is not None else "miss")
+        set_attributes(cache_hit=content is not None)
+        return content
+
+    def save(self, prompt: str, content: str) -> None:
+        """Store ``content`` as the answer to ``prompt`` (tagged with the active ticker)."""
+        if content:
+            self.store.set(self._key(prompt), content, model=self.name, ticker=_ticker.get(), ttl=self.ttl)
+
+
+def refresh_ticker(llm: Any, ticker: str, digest: str) -> int:
+    """Drop ``llm``'s cached answers for ``ticker`` if its crawled data changed.
+
+    ``digest`` identifies the ticker's current source data; returns how many
+    entries were dropped (0 when ``llm`` is not cached).
+    """
+    cache = resolve(llm)
+    if not isinstance(cache, CachedChatModel) or not ticker:
+        return 0
+    return cache.store.refresh_ticker(ticker, digest)
+
+
+__all__ = ["ResponseStore", "SQLiteResponseStore", "CachedChatModel", "refresh_ticker", "ticker_scope"]
@@ -0,0 +1,222 @@
+import contextvars
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .batching import MicroBatcher
+from .cache import TTLCache
+from . import resilience
+from ..observability.tracing import span, set_attributes
+from config import (
+    MARKET_DATA_HISTORY_TTL,
+    MARKET_DATA_INFO_TTL,
+    MARKET_DATA_CACHE_SIZE,
+    OHLCV_DIR,
+    OHLCV_HISTORY_PERIOD,
+    OHLCV_MAX_AGE,
+    YAHOO_BATCH_WINDOW_MS,
+    YAHOO_BATCH_MAX,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+    from .ohlcv import OHLCVStore
+
+
+BASE_PERIOD = "1mo"
+
+_history_cache = TTLCache("market_history", maxsize=MARKET_DATA_CACHE_SIZE, ttl=MARKET_DATA_HISTORY_TTL)
+_info_cache = TTLCache("market_info", maxsize=MARKET_DATA_CACHE_SIZE, ttl=MARKET_DATA_INFO_TTL)
+
+_request_cache: contextvars.ContextVar[Optional[Dict[Hashable, Any]]] = contextvars.ContextVar(
+    "market_data_request_cache", default=None
+)
+
+def __getattr__(name: str) -> Any:
+    # yfinance (and pandas with it) is imported on first use, not at startup.
+    if name == "yf":
+        import yfinance
+        globals()["yf"] = yfinance
+        return yfinance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _yf() -> Any:
+    return globals().get("yf") or __getattr__("yf")
+
+
+_inflight: Dict[Hashable, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+@contextmanager
+def request_scope() -> Iterator[Dict[Hashable, Any]]:
+    """Pin every market-data lookup made inside the block to one snapshot.
+
+    Values fetched in the scope are reused for its whole duration even if the
+    process-wide cache expires them meanwhile. Nested scopes share the outer one.
+    """
+    current = _request_cache.get()
+    if current is not None:
+        yield current
+        return
+    token = _request_cache.set({})
+    try:
+        yield _request_cache.get()
+    finally:
+        _request_cache.reset(token)
+
+
+def _single_flight(key: Hashable, fetch: Callable[[], Any]) -> Any:
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        return future.result()
+
+    try:
+        value = fetch()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _cached(cache: TTLCache, key: Hashable, fetch: Callable[[], Any]) -> Any:
+    scoped = _request_cache.get()
+    if scoped is not None and key in scoped:
+        return scoped[key]
+
+    with span(f"{cache.name}.get", key=str(key)):
+        value = cache.get(key)
+        set_attributes(cache_hit=value is not None)
+        if value is None:
+            def load() -> Any:
+                result = fetch()
+                cache.set(key, result)
+                return result
+            value = _single_flight((cache.name, key), load)
+
+    if scoped is not None:
+        scoped[key] = value
+    return value
+
+
+def _download_many(group: Tuple[Optional[str], str, Optional[str]], tickers: List[str]) -> Dict[str, "pd.DataFrame"]:
+    import pandas as pd
+
+    period, interval, start = group
+    # Tail updates ask for bars since a date instead of a fixed period.
+    window = {"period": period} if start is None else {"start": start}
+    with span("yahoo.download", tickers=",".join(tickers), period=period or f"since {start}", interval=interval):
+        data = resilience.call(
+            "yahoo",
+            lambda: _yf().download(
+                tickers, interval=interval, group_by="ticker", progress=False,
+                timeout=resilience.timeout_for("yahoo"), **window,
+            ),
+        )
+    if data is None or data.empty:
+        return {}
+
+    frames: Dict[str, "pd.DataFrame"] = {}
+    columns = data.columns
+    for ticker in tickers:
+        if isinstance(columns, pd.MultiIndex) and ticker in columns.get_level_values(0):
+            frames[ticker] = data[ticker].dropna(how="all")
+        elif not isinstance(columns, pd.MultiIndex) and len(tickers) == 1:
+            frames[ticker] = data
+    return frames
+
+
+# Concurrent history requests for different tickers share one multi-ticker download.
+_history_batcher = MicroBatcher(_download_many, window=YAHOO_BATCH_WINDOW_MS / 1000, max_batch=YAHOO_BATCH_MAX)
+
+
+def _download(ticker: str, period: Optional[str], interval: str, start: Optional[str] = None) -> "pd.DataFrame":
+    data = _history_batcher.fetch((period, interval, start), ticker)
+    if data is None:
+        import pandas as pd
+        data = pd.DataFrame()
+    return data
+
+
+def _fetch_bars(ticker: str, start: Optional["pd.Timestamp"]) -> "pd.DataFrame":
+    if start is None:
+        return _download(ticker, OHLCV_HISTORY_PERIOD, "1d")
+    return _download(ticker, None, "1d", start=start.strftime("%Y-%m-%d"))
+
+
+_store: Optional["OHLCVStore"] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> "OHLCVStore":
+    """The process-wide daily-bar store (opened on first use, so NumPy loads lazily)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from .ohlcv import OHLCVStore
+                _store = OHLCVStore(OHLCV_DIR, fetch=_fetch_bars, max_age=OHLCV_MAX_AGE)
+    return _store
+
+
+def _store_period(period: str, interval: str) -> bool:
+    from .ohlcv import PERIOD_BARS, PERIOD_DAYS
+    return interval == "1d" and (period in PERIOD_BARS or period in PERIOD_DAYS)
+
+
+def _fetch_info(ticker: str) -> Dict[str, Any]:
+    with span("yahoo.info", ticker=ticker):
+        return resilience.call("yahoo", lambda: _yf().Ticker(ticker).info or {}, fallback_key=("yahoo.info", ticker))
+
+
+def get_history(ticker: str, period: str = BASE_PERIOD, interval: str = "1d") -> "pd.DataFrame":
+    """Return OHLCV history for ``ticker``; callers must not mutate the frame.
+
+    Daily windows come from the local OHLCV store; other periods and
+    intervals are downloaded (and cached) as they are.
+    """
+    ticker = ticker.upper()
+    if _store_period(period, interval):
+        return _cached(_history_cache, (ticker, period, interval), lambda: get_store().frame(ticker, period))
+    return _cached(_history_cache, (ticker, period, interval),
+                   lambda: _download(ticker, period, interval))
+
+
+def get_bars(ticker: str, period: str = BASE_PERIOD) -> "np.ndarray":
+    """Daily bars for ``period`` as a zero-copy slice of the store's memory map.
+
+    Records have ``ts`` (datetime64[ns]) and ``open``/``high``/``low``/``close``/``volume`` fields.
+    """
+    ticker = ticker.upper()
+    return _cached(_history_cache, (ticker, period, "bars"), lambda: get_store().window(ticker, period))
+
+
+def get_info(ticker: str) -> Dict[str, Any]:
+    """Return the yfinance ``info`` mapping for ``ticker`` (shared, read-only)."""
+    ticker = ticker.upper()
+    return _cached(_info_cache, ticker, lambda: _fetch_info(ticker))
+
+
+def clear_caches() -> None:
+    _history_cache.clear()
+    _info_cache.clear()
+    if _store is not None:
+        _store.forget()
+
+
+__all__ = ["request_scope", "get_history", "get_bars", "get_info", "get_store", "clear_caches"]
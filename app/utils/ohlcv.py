@@ -0,0 +1,185 @@
+"""On-disk OHLCV store: one memory-mapped NumPy file of daily bars per ticker.
+
+The first read of a ticker downloads its initial history (``fetch(ticker,
+None)``); after that only the missing tail since the last stored bar is
+fetched. Reads are
+zero-copy slices of the memory map. Data older than ``max_age`` seconds is
+still served, and a refresh is queued in the background.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+BAR_DTYPE = np.dtype([
+    ("ts", "M8[ns]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+# Windows measured back from the last stored bar, so weekends and holidays do not shrink them.
+PERIOD_BARS = {"1d": 1, "5d": 5}
+PERIOD_DAYS = {"1mo": 30, "3mo": 91, "6mo": 182, "1y": 365, "2y": 730, "5y": 1826}
+
+# fetch(ticker, start) -> DataFrame of daily bars; start=None means the initial download.
+Fetch = Callable[[str, Optional["pd.Timestamp"]], "pd.DataFrame"]
+
+
+def to_bars(frame: "pd.DataFrame") -> np.ndarray:
+    """Convert a yfinance-style frame (DatetimeIndex, Open..Volume) to bar records."""
+    import pandas as pd
+
+    frame = frame.dropna(how="all")
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars["ts"] = index.to_numpy(dtype="datetime64[ns]")
+    for field, column in COLUMNS.items():
+        bars[field] = frame[column].to_numpy(dtype=float) if column in frame.columns else np.nan
+    return bars
+
+
+def to_frame(bars: np.ndarray) -> "pd.DataFrame":
+    import pandas as pd
+
+    return pd.DataFrame(
+        {column: bars[field] for field, column in COLUMNS.items()},
+        index=pd.DatetimeIndex(bars["ts"], name="Date"),
+    )
+
+
+def merge_tail(stored: np.ndarray, tail: np.ndarray) -> np.ndarray:
+    """Replace stored bars from the tail's first timestamp on (the last bar may have been partial)."""
+    if not len(tail):
+        return stored
+    keep = np.searchsorted(stored["ts"], tail["ts"][0], side="left")
+    return np.concatenate([stored[:keep], tail])
+
+
+def window(bars: np.ndarray, period: str) -> np.ndarray:
+    """Zero-copy slice of ``bars`` covering ``period`` back from the last bar."""
+    if not len(bars):
+        return bars
+    if period in PERIOD_BARS:
+        return bars[-PERIOD_BARS[period]:]
+    start = bars["ts"][-1] - np.timedelta64(PERIOD_DAYS[period], "D")
+    return bars[np.searchsorted(bars["ts"], start, side="left"):]
+
+
+class OHLCVStore:
+    """Per-ticker daily bars in ``root`` as ``<TICKER>.npy``, read through memory maps."""
+
+    def __init__(self, root: str, fetch: Fetch, max_age: float = 300.0, background_workers: int = 2):
+        self.root = root
+        self.fetch = fetch
+        self.max_age = max_age
+        self._maps: Dict[str, Tuple[float, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._updates = SingleFlight("ohlcv")
+        self._refreshing: Set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=background_workers, thread_name_prefix="ohlcv")
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.npy")
+
+    def _load(self, ticker: str) -> Tuple[Optional[float], np.ndarray]:
+        """Return ``(updated_at, bars)``; reopens the map only when the file was replaced."""
+        path = self._path(ticker)
+        try:
+            updated_at = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None, np.empty(0, dtype=BAR_DTYPE)
+        with self._lock:
+            cached = self._maps.get(ticker)
+            if cached is not None and cached[0] == updated_at:
+                return cached
+        bars = np.load(path, mmap_mode="r")
+        with self._lock:
+            self._maps[ticker] = (updated_at, bars)
+        return updated_at, bars
+
+    def _save(self, ticker: str, bars: np.ndarray) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(ticker)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(bars, dtype=BAR_DTYPE))
+        # Readers keep their old map; the next read sees the new file.
+        os.replace(tmp_path, path)
+
+    def update(self, ticker: str) -> int:
+        """Fetch bars missing since the last stored one; returns how many bars came back."""
+        ticker = ticker.upper()
+        return self._updates.run(ticker, lambda emit: self._update(ticker))
+
+    def _update(self, ticker: str) -> int:
+        import pandas as pd
+
+        _, stored = self._load(ticker)
+        start = pd.Timestamp(stored["ts"][-1]) if len(stored) else None
+        tail = to_bars(self.fetch(ticker, start))
+        if not len(tail) and not len(stored):
+            return 0
+        if len(tail):
+            self._save(ticker, merge_tail(np.asarray(stored), tail))
+        else:
+            os.utime(self._path(ticker))
+        return len(tail)
+
+    def _refresh_in_background(self, ticker: str) -> None:
+        with self._lock:
+            if ticker in self._refreshing:
+                return
+            self._refreshing.add(ticker)
+
+        def run() -> None:
+            try:
+                self.update(ticker)
+            except Exception as exc:
+                logger.warning("Background refresh of %s failed: %s", ticker, exc)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(ticker)
+
+        self._executor.submit(run)
+
+    def bars(self, ticker: str) -> np.ndarray:
+        """All stored bars for ``ticker`` (read-only memory map), fetching on first use."""
+        ticker = ticker.upper()
+        updated_at, bars = self._load(ticker)
+        if updated_at is None:
+            self.update(ticker)
+            updated_at, bars = self._load(ticker)
+        elif time.time() - updated_at > self.max_age:
+            self._refresh_in_background(ticker)
+        return bars
+
+    def window(self, ticker: str, period: str) -> np.ndarray:
+        return window(self.bars(ticker), period)
+
+    def frame(self, ticker: str, period: str) -> "pd.DataFrame":
+        return to_frame(self.window(ticker, period))
+
+    def forget(self) -> None:
+        """Drop open memory maps; files on disk are kept."""
+        with self._lock:
+            self._maps.clear()
+
+
+__all__ = ["BAR_DTYPE", "OHLCVStore", "PERIOD_BARS", "PERIOD_DAYS", "merge_tail", "to_bars", "to_frame", "window"]
@@ -1,43 +1,39 @@
 import re
-from io import BytesIO
-from typing import Dict
-
-import matplotlib.pyplot as plt
-from PIL import Image
-import yfinance as yf
-import pandas as pd
-import matplotlib.dates as mdates
+from typing import Dict, Mapping, Optional
+
 import markdown
 
+from . import charts
+from .market_data import get_bars
+
+
+# "5-10% allocation of AAPL", "7% to TSLA", "3% of the portfolio in MSFT": a "%", at most
+# 40 characters on the same line, then of/to/in and an upper-case ticker. Starting at the
+# "%" lets the regex engine skip straight to candidates, the bounded gap keeps every
+# attempt short, and requiring a ticker-shaped word skips "of the", "to your" and the like.
+_ALLOCATION = re.compile(r"%[^%\n]{0,40}?\b(?i:of|to|in)\s+(?:the\s+)?\$?([A-Z]{1,5}(?:\.[A-Z]{1,2})?)\b")
+# The percentage (or range) right before that "%".
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)(?:\s*[-\u2013]\s*(\d+(?:\.\d+)?))?\s*\Z")
+
 
 def extract_portfolio_allocations(text: str) -> Dict[str, float]:
     allocations: Dict[str, float] = {}
-    pattern = r"(\d+\.?\d*)(?:-(\d+\.?\d*))?%.*?(?:of|to)\s+(\w+)"
-    matches = re.findall(pattern, text, flags=re.IGNORECASE)
-    for low, high, ticker in matches:
-        if high:
-            amount = (float(low) + float(high)) / 2
-        else:
-            amount = float(low)
-        allocations[ticker.upper()] = amount
+    for match in _ALLOCATION.finditer(text):
+        amount = _PERCENT.search(text, max(0, match.start() - 24), match.start())
+        if amount:
+            low, high = amount.groups()
+            allocations[match.group(1)] = (float(low) + float(high)) / 2 if high else float(low)
     return allocations
 
 
-def plot_portfolio_pie(recommendations_text: str):
-    allocations = extract_portfolio_allocations(recommendations_text)
+def plot_portfolio_pie(allocations: Mapping[str, float]) -> Optional[bytes]:
+    """PNG bytes of the allocation pie (ticker -> percent), or ``None`` when there is none."""
     if not allocations:
         return None
-    labels = list(allocations.keys())
-    sizes = list(allocations.values())
-
-    plt.figure(figsize=(5, 5))
-    plt.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
-    plt.title("Portfolio Allocation")
-    buf = BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    return Image.open(buf)
+    labels = tuple(allocations.keys())
+    sizes = tuple(allocations.values())
+    key = ("pie", "", "", charts.data_hash(repr((labels, sizes)).encode("utf-8")))
+    return charts.render(key, charts.draw_allocation_pie, labels, sizes)
 
 
 def extract_portfolio_section(text: str) -> str:
@@ -56,31 +52,15 @@ def format_portfolio(portfolio_text: str) -> str:
     )
 
 
-def plot_price_history(ticker: str):
-    data = yf.download(ticker, period="1mo", interval="1d")
-    if data is None or getattr(data, "empty", True):
+def plot_price_history(ticker: str, period: str = "1mo") -> Optional[bytes]:
+    """PNG bytes of the close-price chart, or ``None`` when there is no data."""
+    bars = get_bars(ticker, period=period)
+    if not len(bars):
         return None
-
-    data.index = pd.to_datetime(data.index)
-
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.plot(data.index, data["Close"], label="Close Price", color="blue")
-    ax.set_title(f"{ticker} Price History (1 Month)")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Price")
-    ax.grid(True)
-    ax.legend()
-
-    ax.xaxis.set_major_locator(mdates.DayLocator(interval=3))
-    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d, %Y"))
-    fig.autofmt_xdate()
-    plt.tight_layout()
-
-    buf = BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close(fig)
-    buf.seek(0)
-    return Image.open(buf)
+    # Field views of the store's memory map; no DataFrame is built for a chart.
+    dates, closes = bars["ts"], bars["close"]
+    key = ("price", ticker.upper(), period, charts.data_hash(dates, closes))
+    return charts.render(key, charts.draw_price_history, ticker, dates, closes, period)
 
 
 __all__ = [
@@ -0,0 +1,265 @@
+"""Token-budgeted prompt assembly.
+
+Each node has a prompt budget (``PROMPT_BUDGETS``, in tokens of its target
+model). :func:`build_prompt` fills a template with fixed sections as given,
+then fits the flexible ones (news, summaries, analyses) into whatever is
+left of the budget:
+
+1. a section given as a list of items (the crawl stage's news from Tavily,
+   Finnhub and NewsAPI) loses near-duplicate items, keeping the most
+   detailed copy of each story;
+2. if it is still too long, its sentences are ranked by relevance (query
+   keywords, figures, position) and the best ones are kept, in their
+   original order, until the section's share of the budget is used up.
+
+Tokens are counted per model: Llama 3's vocabulary extends ``cl100k_base``,
+so it is counted with ``tiktoken`` when that is installed. Gemini's
+SentencePiece tokenizer has no local equivalent, so its count is estimated
+from the text length at Google's documented ~4 characters per token. Both
+only approximate the providers' own counts; the budgets leave headroom for
+the difference. The tokens sent, as a fraction of the tokens
+the unbudgeted prompt would have had, are recorded as ``prompt_compression_ratio``.
+"""
+import hashlib
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union
+
+from config import PROMPT_BUDGETS, PROMPT_DEDUP_THRESHOLD
+from .limits import parse_limits
+from ..observability.monitoring import record_prompt
+from ..observability.tracing import set_attributes
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# tiktoken encoding closest to each model's tokenizer; models in MODEL_CHARS_PER_TOKEN
+# are estimated from length instead, and any other model uses DEFAULT_ENCODING.
+MODEL_ENCODINGS = {
+    "llama-3.1-8b-instant": "cl100k_base",  # Llama 3 = cl100k_base + 28k extra tokens
+}
+MODEL_CHARS_PER_TOKEN = {
+    "gemini-2.0-flash": 4.0,
+}
+DEFAULT_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+_budgets = parse_limits(PROMPT_BUDGETS)
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[*])")
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_DIGIT = re.compile(r"\d")
+# Source tags and date/time prefixes before headlines ("[newsapi] 2024-06-28T10:00:00Z - ", "1719568800 - ").
+_STAMP = re.compile(r"^\s*(?:\[[^\]]*\]\s*)?(?:(?:\d{4}-\d{2}-\d{2}[T\d:.Z+-]*|\d{9,})\s*-\s*)?")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def _encoding(model: str) -> Any:
+    if model in MODEL_CHARS_PER_TOKEN:
+        return None
+    return _load_encoding(MODEL_ENCODINGS.get(model, DEFAULT_ENCODING))
+
+
+def _chars_per_token(model: str) -> float:
+    return MODEL_CHARS_PER_TOKEN.get(model, CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str) -> Any:
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as exc:  # not installed, or the BPE file cannot be downloaded
+        logger.warning("tiktoken encoding %s unavailable (%s); estimating tokens from length", name, exc)
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Number of tokens ``text`` takes for ``model``."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / _chars_per_token(model))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate(text: str, budget: int, model: str = "") -> str:
+    """The start of ``text`` that fits in ``budget`` tokens, cut back to a word boundary."""
+    if count_tokens(text, model) <= budget:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        head = text[:int(budget * _chars_per_token(model))]
+    else:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+    while head and count_tokens(head, model) > budget:
+        head = head[:-1]
+    cut = head.rsplit(" ", 1)[0] if " " in head else head
+    return cut.rstrip()
+
+
+def budget_for(node: str) -> Optional[int]:
+    """Prompt budget for ``node`` in tokens, or ``None`` when it is unlimited."""
+    return _budgets.get(node)
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(w for w in _WORD.findall(_STAMP.sub("", text).lower()) if w not in _STOPWORDS)
+
+
+def fingerprint(text: str) -> str:
+    """Stable ID of a text's wording: equal for copies that differ only in case, punctuation or timestamps."""
+    return hashlib.blake2b(" ".join(sorted(_words(text))).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def dedupe(
+    items: Iterable[T],
+    threshold: float = PROMPT_DEDUP_THRESHOLD,
+    text: Callable[[T], str] = str,
+) -> List[T]:
+    """Drop near-duplicate items, keeping the copy with more words at the first one's position.
+
+    Two items are near-duplicates when most of the words of the shorter one
+    (``threshold``, as a fraction) also appear in the other. ``text`` gets
+    the wording of an item.
+    """
+    kept: List[Tuple[T, frozenset]] = []
+    for item in items:
+        words = _words(text(item))
+        if not words:
+            continue
+        for i, (other, other_words) in enumerate(kept):
+            overlap = len(words & other_words) / min(len(words), len(other_words))
+            if overlap >= threshold:
+                if len(words) > len(other_words):
+                    kept[i] = (item, words)
+                break
+        else:
+            kept.append((item, words))
+    return [item for item, _ in kept]
+
+
+def split_items(text: str, tag: str = "") -> List[str]:
+    """Split source output into items, one per non-empty line, prefixed with ``[tag]``."""
+    prefix = f"[{tag}] " if tag else ""
+    return [prefix + line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _units(text: str) -> List[Tuple[int, str]]:
+    """``(line number, sentence)`` for every sentence of ``text``."""
+    units = []
+    for line_no, line in enumerate(text.splitlines()):
+        for sentence in _SENTENCE.split(line.strip()):
+            if sentence:
+                units.append((line_no, sentence))
+    return units
+
+
+def _score(sentence: str, position: int, keywords: frozenset) -> float:
+    words = _words(sentence)
+    hits = len(words & keywords)
+    # Keywords matter most; figures are the next most useful thing for the
+    # analysis; earlier sentences win ties (sources and summaries lead with
+    # the key points).
+    score = 3.0 * hits + 1.0 / (1.0 + 0.1 * position)
+    if _DIGIT.search(sentence):
+        score += 1.0
+    if sentence.startswith("#"):
+        score += 1.0
+    return score
+
+
+def compress(text: str, budget: int, model: str = "", keywords: Iterable[str] = ()) -> str:
+    """The most relevant sentences of ``text`` that fit in ``budget`` tokens, in original order."""
+    if count_tokens(text, model) <= budget:
+        return text
+    units = _units(text)
+    keys = frozenset(w for keyword in keywords for w in _WORD.findall(keyword.lower()))
+    ranked = sorted(range(len(units)), key=lambda i: -_score(units[i][1], i, keys))
+    chosen, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(units[i][1], model) + 1
+        if used + cost <= budget:
+            chosen.add(i)
+            used += cost
+    if not chosen and ranked:
+        # Even the best sentence is over the share: send what fits of it rather than nothing.
+        return truncate(units[ranked[0]][1], budget, model)
+    lines: Dict[int, List[str]] = {}
+    for i in sorted(chosen):
+        line_no, sentence = units[i]
+        lines.setdefault(line_no, []).append(sentence)
+    return "\n".join(" ".join(sentences) for _, sentences in sorted(lines.items()))
+
+
+def _shares(sizes: Mapping[str, int], available: int) -> Dict[str, int]:
+    """Split ``available`` tokens evenly across sections.
+
+    Sections smaller than their share keep their size, and what they leave
+    unused goes to the larger ones.
+    """
+    shares: Dict[str, int] = {}
+    ordered = sorted(sizes.items(), key=lambda item: item[1])
+    for i, (name, size) in enumerate(ordered):
+        shares[name] = min(size, available // (len(ordered) - i))
+        available -= shares[name]
+    return shares
+
+
+def build_prompt(
+    node: str,
+    model: str,
+    template: str,
+    fixed: Optional[Mapping[str, str]] = None,
+    flexible: Optional[Mapping[str, Union[str, Sequence[str]]]] = None,
+    keywords: Sequence[str] = (),
+    budget: Optional[int] = None,
+) -> str:
+    """Fill ``template`` so the prompt fits ``node``'s budget for ``model``.
+
+    ``fixed`` sections are inserted as they are. ``flexible`` sections share
+    the tokens left after the template and the fixed sections, and are
+    compressed to their share by relevance to ``keywords``. A flexible
+    section may be a list of items (one per line), which is deduplicated
+    first.
+    """
+    fixed = dict(fixed or {})
+    given = {name: value if isinstance(value, str) else "\n".join(value) for name, value in (flexible or {}).items()}
+    sections = {
+        name: value if isinstance(value, str) else "\n".join(dedupe(value))
+        for name, value in (flexible or {}).items()
+    }
+    budget = budget_for(node) if budget is None else budget
+
+    before = count_tokens(template.format(**fixed, **given), model)
+    prompt = template.format(**fixed, **sections)
+    after = before if sections == given else count_tokens(prompt, model)
+    if budget is not None and after > budget:
+        overhead = count_tokens(template.format(**fixed, **{name: "" for name in sections}), model)
+        sizes = {name: count_tokens(text, model) for name, text in sections.items()}
+        shares = _shares(sizes, max(0, budget - overhead))
+        fitted = {name: compress(text, shares[name], model, keywords) for name, text in sections.items()}
+        prompt = template.format(**fixed, **fitted)
+        after = count_tokens(prompt, model)
+    record_prompt(node, before, after)
+    set_attributes(prompt_budget=budget, prompt_tokens_given=before, prompt_tokens_sent=after)
+    return prompt
+
+
+__all__ = [
+    "build_prompt",
+    "budget_for",
+    "compress",
+    "count_tokens",
+    "dedupe",
+    "fingerprint",
+    "split_items",
+    "truncate",
+]
@@ -0,0 +1,79 @@
+"""Registry of expensive clients (LLMs, stores) built on first use.
+
+Modules register a factory and export a :class:`LazyProvider` in place of
+the client, so importing them costs nothing until a call is actually made::
+
+    register("gemini", _build_gemini)
+    gemini = LazyProvider("gemini")
+"""
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def register(name: str, factory: Callable[[], Any]) -> None:
+    """Register (or replace) the factory for ``name``; drops any built instance."""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get(name: str) -> Any:
+    """Return the client for ``name``, building it on first use."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _lock:
+        if name not in _instances:
+            try:
+                factory = _factories[name]
+            except KeyError:
+                raise KeyError(f"no provider registered as {name!r}") from None
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def is_built(name: str) -> bool:
+    return name in _instances
+
+
+def reset(name: Optional[str] = None) -> None:
+    """Forget built instances (all, or just ``name``) so they are rebuilt on next use."""
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
+
+
+def resolve(client: Any) -> Any:
+    """The built client behind a :class:`LazyProvider`; other objects are returned as is."""
+    if isinstance(client, LazyProvider):
+        return get(client._name)
+    return client
+
+
+class LazyProvider:
+    """Stand-in that builds the registered client on first attribute access."""
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        # Introspection (hasattr(x, "__self__"), copy, pickle...) must not build the client.
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+        return getattr(get(self._name), attr)
+
+    def __repr__(self) -> str:
+        state = "built" if is_built(self._name) else "not built"
+        return f"<LazyProvider {self._name!r} ({state})>"
+
+
+__all__ = ["register", "get", "is_built", "reset", "resolve", "LazyProvider"]
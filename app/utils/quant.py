@@ -0,0 +1,274 @@
+"""Vectorized quantitative metrics over stored daily bars.
+
+Closes for all requested tickers (plus the benchmark index) are aligned on
+one date grid and stacked into a ``(tickers, days)`` matrix, so every metric
+below is a single NumPy expression over the whole batch:
+
+- price, returns over ``1mo``/``3mo``/``6mo``/``1y``;
+- annualized volatility of daily log returns and maximum drawdown;
+- beta against ``METRICS_BENCHMARK``;
+- 50/200-day simple moving averages and 14-day RSI (Wilder smoothing).
+
+Valuation ratios come from the yfinance ``info`` mapping; the crawl node adds
+a few of Finnhub's basic financials (52-week range, EPS growth, current
+ratio). :func:`format_block` renders everything as a compact text block for
+LLM prompts.
+"""
+import contextvars
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from config import METRICS_BENCHMARK
+from .market_data import get_bars, get_info
+from .ohlcv import PERIOD_DAYS
+
+
+TRADING_DAYS = 252
+HORIZONS = ("1mo", "3mo", "6mo", "1y")
+SMA_WINDOWS = (50, 200)
+RSI_PERIOD = 14
+
+# (info key, label, kind, scale): kind "$" is an amount, "x" a ratio, "%" a percentage.
+# ``scale`` converts Yahoo's unit to the shown one: margins, ROE and growth come as
+# fractions (x100), dividendYield already in percent, debtToEquity as a percentage (/100).
+VALUATION_FIELDS = (
+    ("marketCap", "mcap", "$", 1.0),
+    ("trailingPE", "P/E", "x", 1.0),
+    ("forwardPE", "fwd P/E", "x", 1.0),
+    ("pegRatio", "PEG", "x", 1.0),
+    ("priceToBook", "P/B", "x", 1.0),
+    ("priceToSalesTrailing12Months", "P/S", "x", 1.0),
+    ("enterpriseToEbitda", "EV/EBITDA", "x", 1.0),
+    ("dividendYield", "div yield", "%", 1.0),
+    ("profitMargins", "net margin", "%", 100.0),
+    ("returnOnEquity", "ROE", "%", 100.0),
+    ("debtToEquity", "D/E", "x", 0.01),
+    ("revenueGrowth", "rev growth", "%", 100.0),
+)
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="quant")
+
+
+def close_matrix(bars: Sequence[np.ndarray]) -> "tuple[np.ndarray, np.ndarray]":
+    """Align closes of several bar arrays on their union of dates.
+
+    Returns ``(grid, closes)`` where ``closes[i, j]`` is series ``i``'s close
+    on ``grid[j]``, carried forward over gaps and NaN before its first bar.
+    """
+    series = [b for b in bars if len(b)]
+    if not series:
+        return np.empty(0, dtype="M8[ns]"), np.full((len(bars), 0), np.nan)
+    grid = np.unique(np.concatenate([b["ts"] for b in series]))
+    closes = np.full((len(bars), len(grid)), np.nan)
+    for row, b in enumerate(bars):
+        if len(b):
+            closes[row, np.searchsorted(grid, b["ts"])] = b["close"]
+    # Forward fill: index of the last valid column at or before each column.
+    valid = ~np.isnan(closes)
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(grid)), 0), axis=1)
+    return grid, np.take_along_axis(closes, last_valid, axis=1)
+
+
+def _nanmean(values: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Row means ignoring NaN (optionally weighted); NaN for rows with no values."""
+    valid = ~np.isnan(values)
+    w = valid if weights is None else valid * weights
+    total = w.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, (np.where(valid, values, 0.0) * w).sum(axis=1) / total, np.nan)
+
+
+def _rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    # Wilder's recursive smoothing is an EMA with alpha = 1/period; over a
+    # long window it equals this weighted mean, which needs no Python loop.
+    changes = np.diff(closes, axis=1)
+    if not changes.shape[1]:
+        return np.full(len(closes), np.nan)
+    weights = (1 - 1 / period) ** np.arange(changes.shape[1])[::-1]
+    gain = _nanmean(np.clip(changes, 0.0, None), weights)
+    loss = _nanmean(np.clip(-changes, 0.0, None), weights)
+    counts = (~np.isnan(changes)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+    return np.where(counts >= period, rsi, np.nan)
+
+
+def compute_metrics(bars: Mapping[str, np.ndarray], benchmark: Optional[np.ndarray] = None) -> Dict[str, Dict[str, float]]:
+    """Price metrics for every ticker in ``bars`` at once; missing values are NaN."""
+    tickers = list(bars)
+    series = [bars[t] for t in tickers]
+    if benchmark is not None:
+        series.append(benchmark)
+    grid, closes = close_matrix(series)
+    n = len(tickers)
+    out: Dict[str, np.ndarray] = {}
+    if not len(grid):
+        return {t: {} for t in tickers}
+
+    last = closes[:, -1]
+    out["price"] = last[:n]
+    for horizon in HORIZONS:
+        start = np.searchsorted(grid, grid[-1] - np.timedelta64(PERIOD_DAYS[horizon], "D"))
+        out[f"return_{horizon}"] = (last / closes[:, start] - 1)[:n]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_returns = np.diff(np.log(closes), axis=1)
+    counts = (~np.isnan(log_returns)).sum(axis=1)
+    deviations = log_returns - _nanmean(log_returns)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.nansum(deviations ** 2, axis=1) / (counts - 1)
+    out["volatility"] = np.where(counts > 1, np.sqrt(variance) * math.sqrt(TRADING_DAYS), np.nan)[:n]
+
+    # fmax/fmin skip NaN, so rows only start counting at their first bar.
+    peaks = np.fmax.accumulate(closes, axis=1)
+    with np.errstate(invalid="ignore"):
+        out["max_drawdown"] = np.fmin.reduce(closes / peaks - 1, axis=1)[:n]
+
+    if benchmark is not None and log_returns.shape[1]:
+        stock, index = log_returns[:n], np.broadcast_to(log_returns[n], (n, log_returns.shape[1]))
+        paired = ~np.isnan(stock) & ~np.isnan(index)
+        stock, index = np.where(paired, stock, np.nan), np.where(paired, index, np.nan)
+        pairs = paired.sum(axis=1)
+        stock_dev = stock - _nanmean(stock)[:, None]
+        index_dev = index - _nanmean(index)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = np.nansum(stock_dev * index_dev, axis=1) / np.nansum(index_dev ** 2, axis=1)
+        out["beta"] = np.where(pairs > 2, beta, np.nan)
+    else:
+        out["beta"] = np.full(n, np.nan)
+
+    for size in SMA_WINDOWS:
+        window = closes[:n, -size:]
+        out[f"sma_{size}"] = window.mean(axis=1) if window.shape[1] == size else np.full(n, np.nan)
+    out["rsi_14"] = _rsi(closes[:n])
+
+    as_of = str(np.datetime_as_string(grid[-1], unit="D"))
+    return {
+        ticker: {"as_of": as_of, **{name: float(values[i]) for name, values in out.items()}}
+        for i, ticker in enumerate(tickers)
+    }
+
+
+def valuation(info: Mapping[str, Any]) -> Dict[str, float]:
+    """The numeric valuation and quality ratios in a yfinance ``info`` mapping, in shown units.
+
+    Percentages are in percent and ratios are plain ratios (see ``VALUATION_FIELDS``).
+    """
+    ratios = {}
+    for key, _, _, scale in VALUATION_FIELDS:
+        value = info.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            ratios[key] = float(value) * scale
+    return ratios
+
+
+def _in_pool(fn, *args):
+    # Run in a copy of the caller's context so request-scoped caches are shared.
+    return _executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def compute_many(
+    tickers: Sequence[str],
+    benchmark: Optional[str] = METRICS_BENCHMARK,
+    period: str = "1y",
+) -> Dict[str, Dict[str, Any]]:
+    """Price metrics and valuation ratios for ``tickers`` from the local OHLCV store.
+
+    Bars and ``info`` are loaded concurrently, so tickers missing from the
+    store arrive in one batched download; the metrics are then computed in one
+    vectorized pass.
+    """
+    tickers = [t.upper() for t in tickers]
+    symbols = list(dict.fromkeys(tickers + ([benchmark.upper()] if benchmark else [])))
+    bar_futures = {t: _in_pool(get_bars, t, period) for t in symbols}
+    info_futures = {t: _in_pool(get_info, t) for t in tickers}
+    bars = {t: bar_futures[t].result() for t in tickers}
+    index = bar_futures[benchmark.upper()].result() if benchmark else None
+    metrics = compute_metrics(bars, index)
+    for ticker in tickers:
+        try:
+            metrics[ticker]["valuation"] = valuation(info_futures[ticker].result())
+        except Exception:
+            metrics[ticker]["valuation"] = {}
+    return metrics
+
+
+def _pct(value: float) -> str:
+    return f"{value * 100:+.1f}%"
+
+
+def _money(value: float) -> str:
+    for unit, scale in (("T", 1e12), ("B", 1e9), ("M", 1e6)):
+        if abs(value) >= scale:
+            return f"{value / scale:.2f}{unit}"
+    return f"{value:,.0f}"
+
+
+def _join(parts: List[str]) -> str:
+    return " | ".join(parts)
+
+
+def format_block(ticker: str, metrics: Mapping[str, Any], benchmark: Optional[str] = METRICS_BENCHMARK) -> str:
+    """Render one ticker's metrics as a few compact lines; NaN values are left out."""
+    def has(name: str) -> bool:
+        value = metrics.get(name)
+        return isinstance(value, float) and math.isfinite(value)
+
+    lines = [f"{ticker} metrics (as of {metrics.get('as_of', 'n/a')})"]
+    price = [f"price {metrics['price']:.2f}"] if has("price") else []
+    returns = [f"{h} {_pct(metrics[f'return_{h}'])}" for h in HORIZONS if has(f"return_{h}")]
+    if returns:
+        price.append("return " + " ".join(returns))
+    if has("low_52w") and has("high_52w"):
+        price.append(f"52w range {metrics['low_52w']:.2f}-{metrics['high_52w']:.2f}")
+    risk = []
+    if has("volatility"):
+        risk.append(f"volatility {metrics['volatility'] * 100:.1f}%")
+    if has("max_drawdown"):
+        risk.append(f"max drawdown {metrics['max_drawdown'] * 100:.1f}%")
+    if has("beta"):
+        risk.append(f"beta vs {benchmark} {metrics['beta']:.2f}")
+    trend = []
+    for size in SMA_WINDOWS:
+        if has(f"sma_{size}"):
+            sma = metrics[f"sma_{size}"]
+            gap = f" (price {_pct(metrics['price'] / sma - 1)})" if has("price") else ""
+            trend.append(f"SMA{size} {sma:.2f}{gap}")
+    if has("rsi_14"):
+        trend.append(f"RSI14 {metrics['rsi_14']:.0f}")
+    ratios = metrics.get("valuation") or {}
+    value = []
+    for key, label, kind, _ in VALUATION_FIELDS:
+        if key in ratios:
+            number = ratios[key]
+            value.append(f"{label} {_money(number) if kind == '$' else f'{number:.1f}%' if kind == '%' else f'{number:.2f}'}")
+    if has("eps_growth"):
+        value.append(f"EPS growth {metrics['eps_growth']:.1f}%")
+    if has("current_ratio"):
+        value.append(f"current ratio {metrics['current_ratio']:.2f}")
+    for part in (price, risk, trend, value):
+        if part:
+            lines.append(_join(part))
+    if len(lines) == 1:
+        lines.append("no market data available")
+    return "\n".join(lines)
+
+
+def metrics_block(ticker: str) -> str:
+    """Compute and format the metrics block for one ticker."""
+    ticker = ticker.upper()
+    return format_block(ticker, compute_many([ticker])[ticker])
+
+
+__all__ = [
+    "HORIZONS",
+    "close_matrix",
+    "compute_metrics",
+    "valuation",
+    "compute_many",
+    "format_block",
+    "metrics_block",
+]
@@ -0,0 +1,282 @@
+"""Deadlines, retries, hedging and circuit breakers for outbound calls.
+
+Every external call goes through :func:`call`, which bounds its total time,
+retries transient failures with jittered backoff, optionally races a second
+copy once the first is slower than the provider's recent p95, and fails fast
+(or falls back to the last good value) while the provider's breaker is open.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+from .cache import TTLCache
+from .errors import is_retryable
+from .limits import provider_slot
+from ..observability.monitoring import record_breaker_state, record_fallback, record_hedge, record_retry
+from ..observability.tracing import set_attributes
+from config import (
+    PROVIDER_TIMEOUTS,
+    PROVIDER_RETRIES,
+    RETRY_BACKOFF,
+    HEDGE_PROVIDERS,
+    HEDGE_MIN_SAMPLES,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    STALE_FALLBACK_TTL,
+    RESILIENCE_WORKERS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call did not finish within its deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's breaker is open; the call was not attempted."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker.
+
+    After ``failure_threshold`` transient failures in a row the breaker opens
+    and rejects calls for ``reset_timeout`` seconds, then lets one trial call
+    through (half-open): success closes it, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        record_breaker_state(name, CLOSED)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            if self.state != CLOSED:
+                self._set(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set(OPEN)
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        record_breaker_state(self.name, state)
+
+
+class LatencyWindow:
+    """Recent successful-call latencies, for the hedging threshold."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    """Parse ``"gemini=45,newsapi=6"`` into ``{"gemini": 45.0, "newsapi": 6.0}``."""
+    timeouts: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        timeouts[name.strip().lower()] = float(value)
+    return timeouts
+
+
+_timeouts = parse_timeouts(PROVIDER_TIMEOUTS)
+_hedged = {name.strip().lower() for name in HEDGE_PROVIDERS.split(",") if name.strip()}
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyWindow] = {}
+_registry_lock = threading.Lock()
+_last_good = TTLCache("last_good", maxsize=2048, ttl=STALE_FALLBACK_TTL)
+# Attempts run here so the caller can stop waiting at the deadline.
+_executor = ThreadPoolExecutor(max_workers=RESILIENCE_WORKERS, thread_name_prefix="resilience")
+
+
+def timeout_for(provider: str) -> float:
+    """Deadline for one call to ``provider``; also the right client/socket timeout."""
+    return float(_timeouts.get(provider, DEFAULT_TIMEOUT))
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _registry_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def _latency_window(provider: str) -> LatencyWindow:
+    with _registry_lock:
+        return _latencies.setdefault(provider, LatencyWindow())
+
+
+def reset() -> None:
+    """Close every breaker and forget latency history and fallbacks."""
+    with _registry_lock:
+        _breakers.clear()
+        _latencies.clear()
+    _last_good.clear()
+
+
+def _attempt(provider: str, fn: Callable[[], Any]) -> Any:
+    with provider_slot(provider):
+        return fn()
+
+
+def _run_isolated(provider: str, fn: Callable[[], Any], budget: float, hedge_after: Optional[float]) -> Any:
+    """Run ``fn`` off-thread, give up after ``budget`` s, hedge after ``hedge_after`` s."""
+    start_time = time.monotonic()
+
+    def submit() -> Future:
+        return _executor.submit(contextvars.copy_context().run, _attempt, provider, fn)
+
+    futures: List[Future] = [submit()]
+    errors: List[BaseException] = []
+    while True:
+        elapsed = time.monotonic() - start_time
+        if elapsed >= budget:
+            raise DeadlineExceeded(f"{provider} call exceeded {budget:.1f}s")
+        wait_for = budget - elapsed
+        if hedge_after is not None and len(futures) == 1:
+            wait_for = min(wait_for, max(0.0, hedge_after - elapsed))
+
+        done, _ = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            futures.remove(future)
+            if future.exception() is None:
+                return future.result()
+            errors.append(future.exception())
+        if not futures:
+            raise errors[0]
+        if not done and hedge_after is not None and not errors and len(futures) == 1 \
+                and time.monotonic() - start_time >= hedge_after:
+            record_hedge(provider)
+            set_attributes(hedged=True)
+            futures.append(submit())
+            hedge_after = None
+
+
+def call(
+    provider: str,
+    fn: Callable[[], Any],
+    *,
+    timeout: Optional[float] = None,
+    retries: int = PROVIDER_RETRIES,
+    hedge: Optional[bool] = None,
+    isolate: bool = True,
+    fallback_key: Optional[Hashable] = None,
+    should_retry: Callable[[BaseException], bool] = is_retryable,
+) -> Any:
+    """Call ``fn()`` against ``provider`` under its deadline, retry and breaker policy.
+
+    ``timeout`` (default from ``PROVIDER_TIMEOUTS``) bounds the whole call,
+    retries and backoff included. ``hedge`` (default: provider listed in
+    ``HEDGE_PROVIDERS``) starts a duplicate attempt once the first one is
+    slower than the provider's recent p95. ``isolate=False`` runs ``fn`` on
+    the calling thread (for streaming), which disables the hard deadline and
+    hedging. With a ``fallback_key``, the last good result is returned when
+    the breaker is open or every attempt fails.
+    """
+    budget = timeout if timeout is not None else timeout_for(provider)
+    hedge = (provider in _hedged) if hedge is None else hedge
+    breaker = get_breaker(provider)
+    latencies = _latency_window(provider)
+    deadline = time.monotonic() + budget
+
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            set_attributes(breaker=OPEN)
+            return _fallback(provider, fallback_key, CircuitOpenError(f"{provider} circuit is open"))
+
+        start_time = time.monotonic()
+        try:
+            if isolate:
+                hedge_after = latencies.percentile(0.95) if hedge else None
+                result = _run_isolated(provider, fn, deadline - start_time, hedge_after)
+            else:
+                result = _attempt(provider, fn)
+        except Exception as exc:
+            transient = should_retry(exc)
+            if transient:
+                breaker.record_failure()
+            else:
+                # Not the provider's fault (bad input, parse error): don't trip the breaker.
+                breaker.record_success()
+            backoff = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+            if not transient or attempt >= retries or time.monotonic() + backoff >= deadline:
+                set_attributes(retries=attempt)
+                return _fallback(provider, fallback_key, exc)
+            attempt += 1
+            record_retry(provider)
+            time.sleep(backoff)
+            continue
+
+        breaker.record_success()
+        latencies.add(time.monotonic() - start_time)
+        set_attributes(retries=attempt)
+        if fallback_key is not None:
+            _last_good.set(fallback_key, result)
+        return result
+
+
+def _fallback(provider: str, key: Optional[Hashable], exc: BaseException) -> Any:
+    if key is not None:
+        value = _last_good.get(key)
+        if value is not None:
+            logger.warning("%s unavailable (%s); serving last good result", provider, exc)
+            record_fallback(provider)
+            set_attributes(degraded=True)
+            return value
+    raise exc
+
+
+__all__ = [
+    "CircuitBreaker", "CircuitOpenError", "DeadlineExceeded", "LatencyWindow", "call", "get_breaker", "parse_timeouts",
+    "reset", "timeout_for",
+]
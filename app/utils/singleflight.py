@@ -0,0 +1,114 @@
+"""Single-flight: concurrent callers with the same key share one execution.
+
+The first caller (the leader) does the work. Callers that arrive while it is
+in flight attach to it: they receive every event the leader has emitted so
+far and all later ones, then its result, or its exception re-raised.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from ..observability.monitoring import record_coalesced
+
+
+class Flight:
+    """One execution in progress, with the events it has streamed so far."""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started_at = time.monotonic()
+        self._cond = threading.Condition()
+
+    def emit(self, event: Any) -> None:
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self.result, self.error, self.done = result, error, True
+            self._cond.notify_all()
+
+    def follow(self) -> Iterator[Any]:
+        """Yield every event, past and future, until the flight finishes."""
+        index = 0
+        while True:
+            with self._cond:
+                while index == len(self.events) and not self.done:
+                    self._cond.wait()
+                pending = self.events[index:]
+                finished = self.done
+            index += len(pending)
+            yield from pending
+            if finished:
+                return
+
+    def outcome(self) -> Any:
+        """Wait for the flight and return its result (or raise its error)."""
+        with self._cond:
+            while not self.done:
+                self._cond.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls per key; nothing is kept once a call ends."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, Flight] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: Hashable) -> Tuple[Flight, bool]:
+        """Return the flight for ``key`` and whether the caller leads it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                record_coalesced(self.name, "follower")
+                return flight, False
+            flight = self._flights[key] = Flight()
+        record_coalesced(self.name, "leader")
+        return flight, True
+
+    def run(
+        self,
+        key: Hashable,
+        fn: Callable[[Callable[[Any], None]], Any],
+        on_event: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Run ``fn(emit)`` once per key at a time; followers get its events via ``on_event``."""
+        flight, leader = self.join(key)
+        if not leader:
+            for event in flight.follow():
+                if on_event is not None:
+                    on_event(event)
+            return flight.outcome()
+
+        def emit(event: Any) -> None:
+            flight.emit(event)
+            if on_event is not None:
+                on_event(event)
+
+        try:
+            result = fn(emit)
+        except BaseException as exc:
+            flight.finish(error=exc)
+            raise
+        else:
+            flight.finish(result=result)
+            return result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+__all__ = ["Flight", "SingleFlight"]
@@ -0,0 +1,142 @@
+import bisect
+import csv
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import SYMBOL_INDEX_PATH, SYMBOL_ALIASES_PATH
+
+
+_NAME_STOPWORDS = {
+    "the", "inc", "incorporated", "corp", "corporation", "company", "co",
+    "ltd", "limited", "plc", "holdings", "holding", "group", "nv", "sa", "se",
+}
+_FUZZY_CANDIDATES = 8
+
+
+@dataclass(frozen=True)
+class SymbolMatch:
+    symbol: str
+    confidence: float
+    kind: str
+
+
+def normalize_name(text: str) -> str:
+    text = text.lower().replace("&", " and ")
+    words = re.sub(r"[^a-z0-9]+", " ", text).split()
+    kept = [w for w in words if w not in _NAME_STOPWORDS]
+    return " ".join(kept or words)
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """In-memory symbol/company-name index with exact, prefix and fuzzy lookup."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]], aliases: Optional[Dict[str, str]] = None):
+        self.symbols: Set[str] = set()
+        self.names: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {k.upper(): v.upper() for k, v in (aliases or {}).items()}
+        for symbol, name in entries:
+            symbol = symbol.strip().upper()
+            self.symbols.add(symbol)
+            key = normalize_name(name)
+            if key:
+                self.names.setdefault(key, symbol)
+
+        self._sorted_names = sorted(self.names)
+        # Keys for fuzzy matching: lower-cased symbols and normalized names.
+        self._fuzzy_keys: Dict[str, str] = {s.lower(): s for s in self.symbols}
+        for key, symbol in self.names.items():
+            self._fuzzy_keys.setdefault(key, symbol)
+        self._trigram_index: Dict[str, List[str]] = defaultdict(list)
+        for key in self._fuzzy_keys:
+            for gram in _trigrams(key):
+                self._trigram_index[gram].append(key)
+
+    @classmethod
+    def from_files(cls, symbols_path: Path, aliases_path: Optional[Path] = None) -> "SymbolIndex":
+        with open(symbols_path, newline="", encoding="utf-8") as fh:
+            entries = [(row["symbol"], row["name"]) for row in csv.DictReader(fh)]
+        aliases: Dict[str, str] = {}
+        if aliases_path is not None and Path(aliases_path).exists():
+            with open(aliases_path, newline="", encoding="utf-8") as fh:
+                aliases = {row["old_symbol"]: row["symbol"] for row in csv.DictReader(fh)}
+        return cls(entries, aliases)
+
+    def lookup(self, query: str) -> Optional[SymbolMatch]:
+        raw = query.strip().upper()
+        if not raw:
+            return None
+        if raw in self.aliases:
+            return SymbolMatch(self.aliases[raw], 1.0, "alias")
+        if raw in self.symbols:
+            return SymbolMatch(raw, 1.0, "symbol")
+
+        key = normalize_name(query)
+        if not key:
+            return None
+        if key in self.names:
+            return SymbolMatch(self.names[key], 1.0, "name")
+
+        prefix = self._prefix_match(key)
+        if prefix is not None:
+            return prefix
+        return self._fuzzy_match(key)
+
+    def _prefix_match(self, key: str) -> Optional[SymbolMatch]:
+        if len(key) < 3:
+            return None
+        start = bisect.bisect_left(self._sorted_names, key)
+        found: Set[str] = set()
+        for name in self._sorted_names[start:]:
+            if not name.startswith(key):
+                break
+            found.add(self.names[name])
+        if not found:
+            return None
+        # A prefix shared by several companies is only a weak signal.
+        confidence = 0.9 if len(found) == 1 else 0.5
+        return SymbolMatch(sorted(found)[0], confidence, "prefix")
+
+    def _fuzzy_match(self, key: str) -> Optional[SymbolMatch]:
+        counts: Dict[str, int] = defaultdict(int)
+        for gram in _trigrams(key):
+            for candidate in self._trigram_index.get(gram, ()):
+                counts[candidate] += 1
+        if not counts:
+            return None
+
+        shortlist = sorted(counts, key=counts.__getitem__, reverse=True)[:_FUZZY_CANDIDATES]
+        best_key, best_score = "", 0.0
+        for candidate in shortlist:
+            score = SequenceMatcher(None, key, candidate, autojunk=False).ratio()
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if not best_key:
+            return None
+        return SymbolMatch(self._fuzzy_keys[best_key], round(best_score, 3), "fuzzy")
+
+
+_index: Optional[SymbolIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    """Return the process-wide index, loading it from disk on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SymbolIndex.from_files(Path(SYMBOL_INDEX_PATH), Path(SYMBOL_ALIASES_PATH))
+    return _index
+
+
+__all__ = ["SymbolIndex", "SymbolMatch", "get_symbol_index", "normalize_name"]
@@ -1,18 +1,43 @@
-import yfinance as yf
-import finnhub
-from tavily import TavilyClient
-from langchain.tools import tool
-from config import TAVILY_API_KEY, FINNHUB_API_KEY
+import math
+from typing import Any, Dict
+
+from langchain_core.tools import tool
+from config import TAVILY_API_KEY, FINNHUB_API_KEY, NEWS_API_KEY
+from . import resilience
+from ..observability.tracing import span, set_attributes
+
+# ----------------------
+# Shared REST plumbing
+# ----------------------
+# Tavily, Finnhub and NewsAPI are plain JSON APIs, so they are called over the
+# shared pooled client (utils.http) instead of each SDK's own session.
+
+def _request_json(provider: str, method: str, url: str, fallback_key: Any, **kwargs: Any) -> Any:
+    def fetch() -> Any:
+        from . import http  # httpcore is only imported once a source is actually called
+
+        response = http.get_client().request(method, url, timeout=resilience.timeout_for(provider), **kwargs)
+        set_attributes(status=response.status_code)
+        response.raise_for_status()
+        return response.json()
+
+    # One span per request; resilience.call adds retries/hedged/degraded to it.
+    with span(f"http.{provider}", method=method, url=url):
+        return resilience.call(provider, fetch, fallback_key=fallback_key)
 
 # ----------------------
 # Tavily tool
 # ----------------------
-tavily = TavilyClient(api_key=TAVILY_API_KEY)
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 
 @tool
 def tavily_tool(ticker: str) -> str:
     """Fetch latest stock news from Tavily for the given ticker symbol."""
-    results = tavily.search(f"{ticker} stock news", max_results=5)
+    results = _request_json(
+        "tavily", "POST", TAVILY_SEARCH_URL, ("tavily", ticker),
+        json={"query": f"{ticker} stock news", "max_results": 5},
+        headers={"Authorization": f"Bearer {TAVILY_API_KEY}"},
+    )
     return "\n".join([r["content"] for r in results["results"]])
 
 # ----------------------
@@ -20,39 +45,46 @@ def tavily_tool(ticker: str) -> str:
 # ----------------------
 @tool
 def yahoo_finance_tool(ticker: str) -> str:
-    """Fetch stock fundamental metrics from Yahoo Finance for the given ticker."""
-    stock = yf.Ticker(ticker)
-    info = stock.info
-    summary = {
-        "currentPrice": info.get("currentPrice"),
-        "marketCap": info.get("marketCap"),
-        "trailingPE": info.get("trailingPE"),
-        "forwardPE": info.get("forwardPE"),
-        "dividendYield": info.get("dividendYield"),
-        "sector": info.get("sector"),
-    }
-    return str(summary)
+    """Fetch price metrics and valuation ratios for the given ticker from Yahoo Finance data."""
+    from .quant import metrics_block  # NumPy is only imported once metrics are requested
+
+    return metrics_block(ticker)
 
 # ----------------------
 # Finnhub tool
 # ----------------------
-finnhub_client = finnhub.Client(api_key=FINNHUB_API_KEY)
+FINNHUB_API_URL = "https://finnhub.io/api/v1"
 
-@tool
-def finnhub_tool(ticker: str) -> str:
-    """Fetch company news and financial metrics from Finnhub for the given ticker."""
-    # Latest company news
-    news = finnhub_client.company_news(ticker, _from="2024-01-01", to="2024-12-31")
-    news_text = [f"{n['datetime']} - {n['headline']}: {n['summary']}" for n in news[:5]]
+def _finnhub(path: str, fallback_key: Any, params: Dict[str, Any]) -> Any:
+    return _request_json(
+        "finnhub", "GET", f"{FINNHUB_API_URL}{path}", fallback_key,
+        params=params, headers={"X-Finnhub-Token": FINNHUB_API_KEY or ""},
+    )
 
-    # Company metrics
-    metrics = finnhub_client.company_basic_financials(ticker, "all")
+# Basic financials that Yahoo's data does not cover: (Finnhub key, ``Metrics.values`` name).
+FINNHUB_METRICS = (
+    ("52WeekHigh", "high_52w"),
+    ("52WeekLow", "low_52w"),
+    ("epsGrowthTTMYoy", "eps_growth"),
+    ("currentRatioQuarterly", "current_ratio"),
+)
 
-    return f"News: {news_text}\nMetrics: {metrics.get('metric', {})}"
+@tool
+def finnhub_tool(ticker: str) -> str:
+    """Fetch the latest company news from Finnhub for the given ticker."""
+    news = _finnhub("/company-news", ("finnhub.news", ticker),
+                    {"symbol": ticker, "from": "2024-01-01", "to": "2024-12-31"})
+    # One headline per line so the prompt builder can deduplicate them against other sources
+    return "\n".join(f"{n['datetime']} - {n['headline']}: {n['summary']}" for n in news[:5])
 
-import requests
-from langchain.tools import tool
-from config import NEWS_API_KEY
+def finnhub_metrics(ticker: str) -> Dict[str, float]:
+    """The ``FINNHUB_METRICS`` subset of Finnhub's basic financials, keyed by ``Metrics.values`` name."""
+    data = _finnhub("/stock/metric", ("finnhub.metrics", ticker), {"symbol": ticker, "metric": "all"})
+    metric = data.get("metric") or {}
+    return {
+        name: float(metric[key]) for key, name in FINNHUB_METRICS
+        if isinstance(metric.get(key), (int, float)) and math.isfinite(metric[key])
+    }
 
 # ----------------------
 # NewsAPI tool
@@ -68,8 +100,7 @@ def newsapi_tool(ticker: str) -> str:
         "sortBy": "publishedAt",
         "language": "en"
     }
-    response = requests.get(url, params=params)
-    data = response.json()
+    data = _request_json("newsapi", "GET", url, ("newsapi", ticker), params=params)
     
     articles = data.get("articles", [])
     news_text = [f"{a['publishedAt']} - {a['title']}: {a['description']}" for a in articles]
@@ -0,0 +1,221 @@
+"""Offline latency/throughput benchmark for the analysis graph and streaming UI.
+
+Every external provider is replaced by a local fake (see ``benchmarks.fakes``)
+with a seeded latency/error distribution, so results are comparable between
+commits without network access::
+
+    python -m benchmarks.bench_graph --sessions 8 --queries 64 -o bench_graph.json
+    python -m benchmarks.bench_graph --sessions 8 --queries 64 --compare bench_graph.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .fakes import PROVIDER_NAMES, LatencyProfile, install_fakes
+
+
+QUERIES = [
+    "AAPL", "Microsoft", "tesle", "NVDA", "Amazon", "meta", "Alphabet", "Netflix",
+    "JPM", "coca cola", "aaplee", "Goldman", "Pfizer", "Intel", "Disney", "Boeing",
+]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    arr = np.asarray(values)
+    return {
+        "count": int(arr.size),
+        "mean": round(float(arr.mean()), 4),
+        "p50": round(float(np.percentile(arr, 50)), 4),
+        "p95": round(float(np.percentile(arr, 95)), 4),
+        "p99": round(float(np.percentile(arr, 99)), 4),
+        "max": round(float(arr.max()), 4),
+    }
+
+
+def _graph_query(graph, query: str, node_times: Dict[str, List[float]]) -> float:
+    start = last = time.perf_counter()
+    for update in graph.stream({"user_input": query}, stream_mode="updates"):
+        now = time.perf_counter()
+        for node in update:
+            node_times[node].append(now - last)
+        last = now
+    return time.perf_counter() - start
+
+
+def _ui_query(analyze_query_streaming, query: str, first_output: List[float]) -> float:
+    start = time.perf_counter()
+    for i, _ in enumerate(analyze_query_streaming(query)):
+        if i == 0:
+            first_output.append(time.perf_counter() - start)
+    return time.perf_counter() - start
+
+
+def _run_sessions(run: Callable[[str], float], queries: List[str], sessions: int) -> Tuple[List[float], float]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        latencies = list(pool.map(run, queries))
+    return latencies, time.perf_counter() - start
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(
+    sessions: int = 8,
+    queries: int = 64,
+    llm_latency: float = 0.2,
+    data_latency: float = 0.05,
+    sigma: float = 0.25,
+    error_rate: float = 0.0,
+    seed: int = 0,
+    cold: bool = False,
+    trace_memory: bool = False,
+) -> Dict[str, object]:
+    profiles = {
+        name: LatencyProfile(
+            median_s=llm_latency if name in ("gemini", "groq") else data_latency,
+            sigma=sigma,
+            error_rate=error_rate,
+        )
+        for name in PROVIDER_NAMES
+    }
+    workload = [QUERIES[i % len(QUERIES)] for i in range(queries)]
+
+    if trace_memory:
+        tracemalloc.start()
+    with install_fakes(profiles, seed=seed) as providers:
+        from app.graph.builder import build_graph
+        from app.graph.nodes import infer
+        from app.ui import gradio_app
+        from app.utils import market_data
+
+        def reset_caches():
+            if cold:
+                market_data.clear_caches()
+                infer.ticker_cache.clear()
+
+        graph = build_graph()
+        node_times: Dict[str, List[float]] = defaultdict(list)
+
+        def graph_run(query: str) -> float:
+            reset_caches()
+            return _graph_query(graph, query, node_times)
+
+        graph_latencies, graph_wall = _run_sessions(graph_run, workload, sessions)
+
+        market_data.clear_caches()
+        infer.ticker_cache.clear()
+        first_output: List[float] = []
+
+        def ui_run(query: str) -> float:
+            reset_caches()
+            return _ui_query(gradio_app.analyze_query_streaming, query, first_output)
+
+        ui_latencies, ui_wall = _run_sessions(ui_run, workload, sessions)
+        provider_calls = {name: p.calls for name, p in providers.items()}
+
+    memory = {"peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    if trace_memory:
+        memory["python_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        tracemalloc.stop()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": {
+                "sessions": sessions, "queries": queries, "llm_latency": llm_latency,
+                "data_latency": data_latency, "sigma": sigma, "error_rate": error_rate,
+                "seed": seed, "cold": cold,
+            },
+        },
+        "graph": {
+            "end_to_end_s": summarize(graph_latencies),
+            "nodes_s": {node: summarize(times) for node, times in node_times.items()},
+            "throughput_qps": round(len(workload) / graph_wall, 3),
+        },
+        "ui": {
+            "end_to_end_s": summarize(ui_latencies),
+            "first_output_s": summarize(first_output),
+            "throughput_qps": round(len(workload) / ui_wall, 3),
+        },
+        "provider_calls": provider_calls,
+        "memory": memory,
+    }
+
+
+def compare(current: Dict, baseline: Dict, max_regression: float) -> bool:
+    """Print p50/p95/p99 changes vs ``baseline``; return False on a p95 regression."""
+    rows = [("graph", current["graph"]["end_to_end_s"], baseline["graph"]["end_to_end_s"]),
+            ("ui", current["ui"]["end_to_end_s"], baseline["ui"]["end_to_end_s"])]
+    for node, stats in current["graph"]["nodes_s"].items():
+        rows.append((f"node:{node}", stats, baseline["graph"]["nodes_s"].get(node, {})))
+
+    ok = True
+    print(f"{'metric':<22}{'p50':>18}{'p95':>18}{'p99':>18}")
+    for name, cur, base in rows:
+        cells = []
+        for q in ("p50", "p95", "p99"):
+            if q not in base or not base[q]:
+                cells.append(f"{cur.get(q, 0):>18.4f}")
+                continue
+            change = (cur[q] - base[q]) / base[q]
+            cells.append(f"{cur[q]:>10.4f} ({change:+.0%})")
+            if q == "p95" and change > max_regression:
+                ok = False
+        print(f"{name:<22}" + "".join(cells))
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--queries", type=int, default=64, help="queries per phase")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="median fake LLM latency (s)")
+    parser.add_argument("--data-latency", type=float, default=0.05, help="median fake data-source latency (s)")
+    parser.add_argument("--sigma", type=float, default=0.25, help="log-normal spread of latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability a provider call fails")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true", help="clear caches before every query")
+    parser.add_argument("--trace-memory", action="store_true", help="also report Python heap peak (slower)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_graph.json"))
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed p95 slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        sessions=args.sessions, queries=args.queries, llm_latency=args.llm_latency,
+        data_latency=args.data_latency, sigma=args.sigma, error_rate=args.error_rate,
+        seed=args.seed, cold=args.cold, trace_memory=args.trace_memory,
+    )
+    print(json.dumps(result, indent=2))
+
+    ok = True
+    if args.compare:
+        ok = compare(result, json.loads(args.compare.read_text()), args.max_regression)
+    args.output.write_text(json.dumps(result, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
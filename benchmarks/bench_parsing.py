@@ -0,0 +1,133 @@
+"""Parsing benchmark: recommendation parsing and highlighting on large model answers.
+
+Synthetic answers of growing size (long paragraphs full of percentages,
+a portfolio section and a trailing JSON block), plus one long line of
+figures with no "of"/"to" after them (where the old lazy ``.*?`` rescanned
+the rest of the line for every "%"), are run through
+``parse_recommendation``, ``extract_portfolio_allocations`` (next to the
+regex it replaced) and ``highlight_recommendation``::
+
+    python -m benchmarks.bench_parsing -o bench_parsing.json
+    python -m benchmarks.bench_parsing --compare bench_parsing.json
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .bench_graph import _git_commit
+from app.graph.nodes.recommend import highlight_recommendation, parse_recommendation
+from app.utils.portfolio import extract_portfolio_allocations
+
+
+SIZES_KB = (4, 64, 256)
+ONE_LINE_KB = 16
+
+_SENTENCES = (
+    "Revenue grew 12.5% year over year while margins expanded by 40 basis points.",
+    "Services now make up 22% of sales, up from 18% a year ago, and remain a STRONG driver.",
+    "The stock trades 15% below its five-year average multiple, a POSITIVE setup.",
+    "Guidance implies 3-5% growth next quarter; a WEAK consumer is the main risk.",
+    "Buybacks retired 2.1% of the share count, and net cash fell 8% as a result.",
+    "A NEGATIVE surprise on gross margin would likely cost 10% or more on the day.",
+)
+
+
+def legacy_allocations(text: str) -> Dict[str, float]:
+    allocations: Dict[str, float] = {}
+    for low, high, ticker in re.findall(r"(\d+\.?\d*)(?:-(\d+\.?\d*))?%.*?(?:of|to)\s+(\w+)", text, flags=re.IGNORECASE):
+        allocations[ticker.upper()] = (float(low) + float(high)) / 2 if high else float(low)
+    return allocations
+
+
+def make_answer(size_kb: int, seed: int = 7) -> str:
+    """A recommendation-shaped answer of about ``size_kb`` KiB."""
+    rng = random.Random(seed)
+    paragraphs: List[str] = ["**Recommendation: BUY** with a 12-month target price of $250."]
+    size = len(paragraphs[0])
+    while size < size_kb * 1024:
+        paragraph = " ".join(rng.choice(_SENTENCES) for _ in range(40))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    paragraphs.append("Suggested Portfolio Allocation: 5-10% allocation of AAPL, 3% allocation to MSFT.")
+    paragraphs.append('```json\n{"action": "BUY", "target_price": 250, "allocations": {"AAPL": 7.5, "MSFT": 3}}\n```')
+    return "\n\n".join(paragraphs)
+
+
+def make_one_line(size_kb: int) -> str:
+    """One paragraph of ``size_kb`` KiB quoting figures, with no allocation in it."""
+    figure = "margin +1.5%, growth 12%, yield 0.8%; "
+    return "**HOLD**: " + figure * (size_kb * 1024 // len(figure))
+
+
+CASES: Dict[str, Callable[[str], object]] = {
+    "parse_recommendation": parse_recommendation,
+    "allocations": extract_portfolio_allocations,
+    "allocations_legacy": legacy_allocations,
+    "highlight": highlight_recommendation,
+}
+
+
+def _time(fn: Callable[[str], object], text: str, budget_s: float = 0.5) -> float:
+    """Best per-call time in seconds over a few rounds of about ``budget_s`` each."""
+    once = timeit.timeit(lambda: fn(text), number=1)
+    number = max(1, int(budget_s / max(once, 1e-6) / 5))
+    return min(timeit.repeat(lambda: fn(text), number=number, repeat=5)) / number
+
+
+def run_benchmark(sizes_kb=SIZES_KB, one_line_kb: int = ONE_LINE_KB) -> Dict[str, object]:
+    answers = {f"{size_kb}kb": make_answer(size_kb) for size_kb in sizes_kb}
+    if one_line_kb:
+        answers[f"{one_line_kb}kb_one_line"] = make_one_line(one_line_kb)
+    results: Dict[str, Dict[str, float]] = {}
+    for label, text in answers.items():
+        results[label] = {name: round(_time(fn, text) * 1e6, 1) for name, fn in CASES.items()}
+    return {
+        "meta": {"commit": _git_commit(), "python": sys.version.split()[0], "unit": "us_per_call"},
+        "sizes": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, max_regression: float) -> bool:
+    """Print per-case changes vs ``baseline``; return False on a regression."""
+    ok = True
+    print(f"{'case':<34}{'us':>12}{'baseline':>12}{'change':>10}")
+    for size, cases in current["sizes"].items():
+        for name, us in cases.items():
+            label = f"{size} {name}"
+            base = baseline.get("sizes", {}).get(size, {}).get(name)
+            if not base:
+                print(f"{label:<34}{us:>12.1f}")
+                continue
+            change = (us - base) / base
+            print(f"{label:<34}{us:>12.1f}{base:>12.1f}{change:>+10.0%}")
+            if change > max_regression and not name.endswith("_legacy"):
+                ok = False
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES_KB), help="answer sizes in KiB")
+    parser.add_argument("--one-line", type=int, default=ONE_LINE_KB, help="size of the one-line answer in KiB (0 to skip)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_parsing.json"))
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.20, help="allowed slowdown per case")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.sizes, args.one_line)
+    print(json.dumps(result, indent=2))
+
+    ok = True
+    if args.compare:
+        ok = compare(result, json.loads(args.compare.read_text()), args.max_regression)
+    args.output.write_text(json.dumps(result, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Startup benchmark: how long importing the graph, the UI and batch mode takes.
+
+Each target is imported in a fresh interpreter under ``python -X importtime``
+(repeated, median reported), together with the slowest modules it pulls in::
+
+    python -m benchmarks.bench_startup -o bench_startup.json
+    python -m benchmarks.bench_startup --compare bench_startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .bench_graph import _git_commit
+
+
+TARGETS = {
+    "graph": "import app.graph.builder",
+    "ui": "import app.ui.gradio_app",
+    "batch": "import app.batch",
+    "graph_built": "import app.graph.builder as b; b.build_graph()",
+}
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` rows from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(code: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    total_s = sum(self_us for _, self_us, _ in rows) / 1e6
+    return total_s, rows
+
+
+def run_benchmark(repeat: int = 5, top: int = 10) -> Dict[str, object]:
+    results: Dict[str, object] = {}
+    for name, code in TARGETS.items():
+        totals = []
+        rows: List[Tuple[str, int, int]] = []
+        for _ in range(repeat):
+            total_s, rows = measure(code)
+            totals.append(total_s)
+        heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+        results[name] = {
+            "import_s": round(statistics.median(totals), 4),
+            "min_s": round(min(totals), 4),
+            "modules": len(rows),
+            "slowest_self_ms": {module: round(self_us / 1000, 1) for module, self_us, _ in heaviest},
+            "loaded": sorted({module.split(".")[0] for module, _, _ in rows}),
+        }
+    return {
+        "meta": {"commit": _git_commit(), "python": sys.version.split()[0], "repeat": repeat},
+        "targets": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, max_regression: float) -> bool:
+    """Print import-time changes vs ``baseline``; return False on a regression."""
+    ok = True
+    print(f"{'target':<14}{'import_s':>12}{'baseline':>12}{'change':>10}")
+    for name, stats in current["targets"].items():
+        base = baseline.get("targets", {}).get(name)
+        if not base:
+            print(f"{name:<14}{stats['import_s']:>12.3f}")
+            continue
+        change = (stats["import_s"] - base["import_s"]) / base["import_s"]
+        print(f"{name:<14}{stats['import_s']:>12.3f}{base['import_s']:>12.3f}{change:>+10.0%}")
+        if change > max_regression:
+            ok = False
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list per target")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_startup.json"))
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.20, help="allowed import-time slowdown")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(repeat=args.repeat, top=args.top)
+    print(json.dumps(result, indent=2))
+
+    ok = True
+    if args.compare:
+        ok = compare(result, json.loads(args.compare.read_text()), args.max_regression)
+    args.output.write_text(json.dumps(result, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Local stand-ins for every external provider used by the graph.
+
+Each fake sleeps for a latency drawn from a seeded log-normal distribution and
+fails with a configurable probability, so runs are repeatable and offline.
+"""
+import math
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class LatencyProfile:
+    median_s: float = 0.05
+    sigma: float = 0.25
+    error_rate: float = 0.0
+
+
+class ProviderFault(ConnectionError):
+    """Injected transient failure, retried like a real network error."""
+
+
+class FakeProvider:
+    def __init__(self, name: str, profile: LatencyProfile, seed: int):
+        self.name = name
+        self.profile = profile
+        self._rng = random.Random(f"{seed}-{name}")
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def wait(self) -> None:
+        with self._lock:
+            self.calls += 1
+            delay = self.profile.median_s * math.exp(self._rng.gauss(0.0, self.profile.sigma))
+            failed = self._rng.random() < self.profile.error_rate
+        time.sleep(delay)
+        if failed:
+            raise ProviderFault(f"{self.name}: injected failure")
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    """Answers the node prompts with canned text after a simulated delay."""
+
+    def __init__(self, provider: FakeProvider, token_delay_s: float = 0.002):
+        self.provider = provider
+        self.token_delay_s = token_delay_s
+
+    def _reply(self, prompt: str) -> str:
+        lowered = prompt.lower()
+        if "infer the correct stock ticker" in lowered:
+            return "AAPL"
+        if "investment recommendations" in lowered:
+            return (
+                "**Recommendation: BUY** with a 12-month target of $250.\n\n"
+                "Suggested Portfolio Allocation: 5-10% allocation of AAPL, 3% allocation to MSFT.\n\n"
+                "Risk management: use a trailing stop; monitor margins and guidance.\n\n"
+                '```json\n{"action": "BUY", "target_price": 250, "allocations": {"AAPL": 7.5, "MSFT": 3}}\n```'
+            )
+        if "financial analysis" in lowered:
+            return "## Analysis\n\n" + "Revenue growth is STRONG and margins are stable. " * 20
+        return "## Summary\n\n" + "The company reported solid results and positive news flow. " * 20
+
+    def invoke(self, prompt: str) -> FakeMessage:
+        self.provider.wait()
+        return FakeMessage(self._reply(prompt))
+
+    def stream(self, prompt: str) -> Iterator[FakeMessage]:
+        self.provider.wait()
+        for token in self._reply(prompt).split(" "):
+            time.sleep(self.token_delay_s)
+            yield FakeMessage(token + " ")
+
+
+class FakeYFinance:
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+
+    @staticmethod
+    def _history(ticker: str) -> pd.DataFrame:
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        index = pd.bdate_range(end=pd.Timestamp("2024-06-28"), periods=21)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame(
+            {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1_000_000},
+            index=index,
+        )
+
+    def download(self, tickers, period="1mo", interval="1d", group_by=None, progress=True, **_):
+        self.provider.wait()
+        tickers: List[str] = [tickers] if isinstance(tickers, str) else list(tickers)
+        return pd.concat({t: self._history(t) for t in tickers}, axis=1)
+
+    def Ticker(self, ticker: str):
+        provider = self.provider
+
+        class _Ticker:
+            @property
+            def info(self) -> Dict[str, object]:
+                provider.wait()
+                return {"symbol": ticker, "currentPrice": 200.0, "marketCap": 3e12, "trailingPE": 30.1,
+                        "forwardPE": 27.4, "dividendYield": 0.005, "sector": "Technology"}
+
+        return _Ticker()
+
+
+def _fake_tool(provider: FakeProvider, text: str):
+    def tool(ticker: str) -> str:
+        provider.wait()
+        return f"{ticker}: {text}"
+    return tool
+
+
+def _fake_metrics(provider: FakeProvider, values: Dict[str, float]):
+    def metrics(ticker: str) -> Dict[str, float]:
+        provider.wait()
+        return dict(values)
+    return metrics
+
+
+PROVIDER_NAMES = ("gemini", "groq", "yahoo", "finnhub", "tavily", "newsapi")
+
+
+@contextmanager
+def install_fakes(profiles: Dict[str, LatencyProfile], seed: int = 0):
+    """Swap agents, tools and yfinance for fakes; yields the provider objects.
+
+    Graph modules imported inside the block bind to the fakes, so import (or
+    re-import) them only after entering it.
+    """
+    providers = {name: FakeProvider(name, profiles.get(name, LatencyProfile()), seed) for name in PROVIDER_NAMES}
+
+    agents = types.ModuleType("app.utils.agents")
+    agents.gemini = FakeChatModel(providers["gemini"])
+    agents.llama = FakeChatModel(providers["groq"])
+
+    tools = types.ModuleType("app.utils.tools")
+    tools.tavily_tool = _fake_tool(providers["tavily"], "Analysts raise price targets after earnings beat.")
+    tools.yahoo_finance_tool = _fake_tool(providers["yahoo"], "metrics\nprice 200.00 | return 1mo +2.1%\nmcap 3.00T | P/E 30.10")
+    tools.finnhub_tool = _fake_tool(providers["finnhub"], "Company unveils new product line")
+    tools.finnhub_metrics = _fake_metrics(providers["finnhub"], {"high_52w": 210.0, "low_52w": 160.0})
+    tools.newsapi_tool = _fake_tool(providers["newsapi"], "2024-06-28 - Shares rise on upbeat guidance")
+
+    graph_modules = [name for name in sys.modules if name.startswith("app.graph") or name.startswith("app.ui")]
+    saved = {name: sys.modules.get(name) for name in ["app.utils.agents", "app.utils.tools", *graph_modules]}
+    for name in graph_modules:
+        del sys.modules[name]
+    sys.modules["app.utils.agents"] = agents
+    sys.modules["app.utils.tools"] = tools
+
+    import app.utils.market_data as market_data
+    from app.utils.ohlcv import OHLCVStore
+
+    real_yf, real_store = market_data.yf, market_data._store
+    market_data.yf = FakeYFinance(providers["yahoo"])
+    # Fake bars go to a throwaway store, never into the real one on disk.
+    store_dir = tempfile.TemporaryDirectory()
+    market_data._store = OHLCVStore(store_dir.name, fetch=market_data._fetch_bars)
+    try:
+        yield providers
+    finally:
+        market_data.yf, market_data._store = real_yf, real_store
+        store_dir.cleanup()
+        for name in [n for n in sys.modules if n.startswith("app.graph") or n.startswith("app.ui")]:
+            del sys.modules[name]
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
@@ -10,3 +10,120 @@ FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 START_LOCAL_MONITORING=os.getenv("START_LOCAL_MONITORING")
 
+# Crawl stage: per-source timeout (s) and size of the shared fetch pool
+CRAWL_SOURCE_TIMEOUT = float(os.getenv("CRAWL_SOURCE_TIMEOUT", "8"))
+CRAWL_MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", "16"))
+
+# Ticker resolution cache: positive/negative TTLs (s) and max entries
+TICKER_CACHE_TTL = float(os.getenv("TICKER_CACHE_TTL", "86400"))
+TICKER_CACHE_NEGATIVE_TTL = float(os.getenv("TICKER_CACHE_NEGATIVE_TTL", "600"))
+TICKER_CACHE_SIZE = int(os.getenv("TICKER_CACHE_SIZE", "2048"))
+
+# Offline symbol index used before falling back to the LLM for ticker inference
+SYMBOL_INDEX_PATH = os.getenv("SYMBOL_INDEX_PATH", os.path.join(os.path.dirname(__file__), "app", "data", "symbols.csv"))
+SYMBOL_ALIASES_PATH = os.getenv("SYMBOL_ALIASES_PATH", os.path.join(os.path.dirname(__file__), "app", "data", "ticker_aliases.csv"))
+SYMBOL_INDEX_MIN_CONFIDENCE = float(os.getenv("SYMBOL_INDEX_MIN_CONFIDENCE", "0.8"))
+
+# Shared yfinance layer: process-wide cache TTLs (s) and max entries per cache
+MARKET_DATA_HISTORY_TTL = float(os.getenv("MARKET_DATA_HISTORY_TTL", "300"))
+MARKET_DATA_INFO_TTL = float(os.getenv("MARKET_DATA_INFO_TTL", "900"))
+MARKET_DATA_CACHE_SIZE = int(os.getenv("MARKET_DATA_CACHE_SIZE", "512"))
+
+# Local OHLCV store (memory-mapped .npy per ticker): initial download, age (s) after which a background tail refresh runs
+OHLCV_DIR = os.getenv("OHLCV_DIR", os.path.join(os.path.dirname(__file__), ".cache", "ohlcv"))
+OHLCV_HISTORY_PERIOD = os.getenv("OHLCV_HISTORY_PERIOD", "1y")
+OHLCV_MAX_AGE = float(os.getenv("OHLCV_MAX_AGE", "300"))
+# Index (or index ETF) that quantitative metrics measure beta against
+METRICS_BENCHMARK = os.getenv("METRICS_BENCHMARK", "SPY")
+
+# Max concurrent in-flight calls per external provider, e.g. "gemini=4,groq=2"
+PROVIDER_CONCURRENCY = os.getenv(
+    "PROVIDER_CONCURRENCY",
+    "gemini=8,groq=8,yahoo=8,finnhub=4,tavily=4,newsapi=4",
+)
+# Token buckets per provider: "name=requests_per_second/burst"
+PROVIDER_RATES = os.getenv(
+    "PROVIDER_RATES",
+    "gemini=20/40,groq=10/30,yahoo=10/20,finnhub=1/30,tavily=5/10,newsapi=2/10",
+)
+# AIMD adaptive concurrency: halve the cap on 429s or when latency exceeds
+# tolerance x the best seen; grow it back by one slot per round of healthy calls
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "1") == "1"
+ADAPTIVE_LATENCY_TOLERANCE = float(os.getenv("ADAPTIVE_LATENCY_TOLERANCE", "3.0"))
+ADAPTIVE_BACKOFF = float(os.getenv("ADAPTIVE_BACKOFF", "0.5"))
+# Resilience: total deadline per call (s, retries included), retries with
+# jittered exponential backoff, hedged duplicates after the provider's p95,
+# and circuit breakers that open after consecutive transient failures
+PROVIDER_TIMEOUTS = os.getenv(
+    "PROVIDER_TIMEOUTS",
+    "gemini=45,groq=30,yahoo=10,finnhub=8,tavily=8,newsapi=6",
+)
+PROVIDER_RETRIES = int(os.getenv("PROVIDER_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", "0.25"))
+HEDGE_PROVIDERS = os.getenv("HEDGE_PROVIDERS", "yahoo,finnhub,tavily,newsapi")
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+STALE_FALLBACK_TTL = float(os.getenv("STALE_FALLBACK_TTL", "86400"))
+RESILIENCE_WORKERS = int(os.getenv("RESILIENCE_WORKERS", "64"))
+# Shared HTTP client for REST data sources: pool sizes, keep-alive (s), DNS cache TTL (s)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "32"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_DNS_TTL = float(os.getenv("HTTP_DNS_TTL", "300"))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "16"))
+
+# Prompt budgets in tokens of each node's model ("node=tokens"; unlisted nodes are unlimited), and
+# the word overlap (0-1) above which two news items count as the same story
+PROMPT_BUDGETS = os.getenv("PROMPT_BUDGETS", "crawl=6000,analyze=3000,recommend=2500")
+PROMPT_DEDUP_THRESHOLD = float(os.getenv("PROMPT_DEDUP_THRESHOLD", "0.8"))
+
+# Single-flight: concurrent runs for one ticker share each node's execution for up to COALESCE_WINDOW (s)
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "1") == "1"
+COALESCE_WINDOW = float(os.getenv("COALESCE_WINDOW", "120"))
+
+# Chart rendering: "thread" or "process" pool, PNG cache size/TTL (s), directory for PNG files served to the UI
+CHART_POOL = os.getenv("CHART_POOL", "thread").lower()
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "4"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))
+CHART_CACHE_TTL = float(os.getenv("CHART_CACHE_TTL", "3600"))
+CHART_DIR = os.getenv("CHART_DIR", "")
+
+# HTTP API (run_api.py): graph worker threads, queued jobs before 429, finished-job retention (s),
+# most finished jobs kept, most events (node updates and tokens) kept per job for late followers
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "8"))
+API_QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", "32"))
+API_JOB_TTL = float(os.getenv("API_JOB_TTL", "3600"))
+API_MAX_JOBS = int(os.getenv("API_MAX_JOBS", "1000"))
+API_MAX_JOB_EVENTS = int(os.getenv("API_MAX_JOB_EVENTS", "2000"))
+API_SYNC_TIMEOUT = float(os.getenv("API_SYNC_TIMEOUT", "120"))
+
+# Yahoo micro-batching: how long (ms) to collect concurrent history requests
+YAHOO_BATCH_WINDOW_MS = float(os.getenv("YAHOO_BATCH_WINDOW_MS", "5"))
+YAHOO_BATCH_MAX = int(os.getenv("YAHOO_BATCH_MAX", "50"))
+
+# LLM response cache (SQLite, survives restarts); TTL is the freshness window (s)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "llm_cache.sqlite"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "900"))
+
+# Graph checkpoints (SQLite): runs resume by run ID; TTL is how long saved node outputs stay reusable (s)
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "1") == "1"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(os.path.dirname(__file__), ".cache", "checkpoints.sqlite"))
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "900"))
+# Runs not updated for this long are deleted from the checkpoint file (s); checked at startup and by the API
+CHECKPOINT_RETENTION = float(os.getenv("CHECKPOINT_RETENTION", "604800"))
+
+# LLM price table for the cost metric: USD per 1M prompt/completion tokens, by model
+LLM_PRICES = os.getenv(
+    "LLM_PRICES",
+    "gemini-2.0-flash=0.10/0.40,llama-3.1-8b-instant=0.05/0.08",
+)
+
+# Tracing: "none", "file" (JSON lines at TRACE_FILE) or "otlp" (OTLP/HTTP JSON to OTLP_ENDPOINT)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(os.path.dirname(__file__), ".cache", "traces.jsonl"))
+OTLP_ENDPOINT = os.getenv("OTLP_ENDPOINT", "http://localhost:4318")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "lang_graph")
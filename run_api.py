@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+HTTP API entry point for the Stock Analyzer.
+Serves the analysis graph to programmatic clients (sync, SSE streaming and job polling).
+"""
+
+from app.api import main
+
+if __name__ == "__main__":
+    main()
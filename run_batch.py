@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Batch entry point for the Stock Analyzer.
+Runs a watchlist file through the analysis graph and streams results to JSONL.
+"""
+
+from app.batch import main
+
+if __name__ == "__main__":
+    main()
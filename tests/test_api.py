@@ -0,0 +1,182 @@
+import asyncio
+import json
+import threading
+import time
+import types
+
+from fastapi.testclient import TestClient
+
+from app.api import Job, JobQueue, create_app
+from app.graph.state import Recommendation
+
+
+class FakeGraph:
+    checkpointer = None
+
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+
+    def stream(self, state, stream_mode=None):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if state["user_input"] == "boom":
+            raise RuntimeError("groq down")
+        ticker = state["user_input"].upper()
+        yield "updates", {"infer_ticker": {"ticker": ticker}}
+        yield "custom", {"node": "analyze", "delta": "Strong "}
+        yield "updates", {"analyze": {"ticker": ticker, "analysis": "Strong quarter."}}
+        yield "updates", {"recommend": {"recommendation": Recommendation(action="BUY", text="Buy it.")}}
+
+
+def client_for(graph, **kwargs):
+    return TestClient(create_app(JobQueue(graph=graph, **kwargs)))
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_sync_analyze_returns_final_state():
+    with client_for(FakeGraph()) as client:
+        response = client.post("/v1/analyze", json={"query": "aapl"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "succeeded"
+        assert body["result"]["ticker"] == "AAPL"
+        assert body["result"]["recommendation"]["action"] == "BUY"
+
+        failed = client.post("/v1/analyze", json={"query": "boom"})
+        assert failed.status_code == 502
+        assert "groq down" in failed.json()["error"]
+
+
+def test_stream_sends_updates_and_tokens_as_sse():
+    with client_for(FakeGraph()) as client:
+        response = client.post("/v1/analyze/stream", json={"query": "msft"})
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        kinds = [name for name, _ in events]
+        assert kinds[0] == "job" and kinds[-1] == "done"
+        assert ("token", {"node": "analyze", "delta": "Strong "}) in events
+        updates = [d for n, d in events if n == "update"]
+        assert updates[-1]["node"] == "recommend"
+        assert updates[-1]["recommendation"]["allocations"] == {} and updates[-1]["recommendation"]["text"] == "Buy it."
+
+
+def test_submit_and_poll_job():
+    with client_for(FakeGraph()) as client:
+        submitted = client.post("/v1/jobs", json={"query": "tsla"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+        assert submitted.headers["location"] == f"/v1/jobs/{job_id}"
+
+        for _ in range(100):
+            job = client.get(f"/v1/jobs/{job_id}").json()
+            if job["status"] == "succeeded":
+                break
+            time.sleep(0.02)
+        assert job["result"]["ticker"] == "TSLA"
+        assert client.get("/v1/jobs/missing").status_code == 404
+
+
+def test_saturated_queue_returns_429_and_not_ready():
+    gate = threading.Event()
+    with client_for(FakeGraph(gate), workers=1, maxsize=1) as client:
+        try:
+            assert client.get("/readyz").status_code == 200
+            first = client.post("/v1/jobs", json={"query": "a"}).json()["job_id"]
+            while client.get(f"/v1/jobs/{first}").json()["status"] != "running":
+                time.sleep(0.01)
+            assert client.post("/v1/jobs", json={"query": "b"}).status_code == 202
+
+            rejected = client.post("/v1/jobs", json={"query": "c"})
+            assert rejected.status_code == 429
+            assert rejected.headers["retry-after"] == "1"
+            ready = client.get("/readyz")
+            assert ready.status_code == 503
+            assert ready.json()["running"] == 1 and ready.json()["queued"] == 1
+            assert client.get("/healthz").json() == {"status": "ok"}
+        finally:
+            gate.set()
+
+
+class FakeCheckpointedGraph(FakeGraph):
+    checkpointer = object()
+
+    def __init__(self):
+        super().__init__()
+        self.run_ids = []
+        self.saved = {}
+
+    def get_state(self, config):
+        values = self.saved.get(config["configurable"]["thread_id"], {})
+        return types.SimpleNamespace(values=values, next=(), created_at=None)
+
+    def stream(self, state, config=None, stream_mode=None):
+        run_id = config["configurable"]["thread_id"]
+        self.run_ids.append(run_id)
+        saved = self.saved.setdefault(run_id, {})
+        for mode, chunk in super().stream(state, stream_mode=stream_mode):
+            if mode == "updates":
+                for update in chunk.values():
+                    saved.update(update)
+            yield mode, chunk
+
+
+def test_only_jobs_with_a_run_id_are_checkpointed():
+    plain, checkpointed = FakeGraph(), FakeCheckpointedGraph()
+    with client_for(plain, checkpointed_graph=checkpointed) as client:
+        anonymous = client.post("/v1/analyze", json={"query": "aapl"}).json()
+        named = client.post("/v1/analyze", json={"query": "msft", "run_id": "nightly-msft"}).json()
+    assert anonymous["run_id"] is None and anonymous["result"]["ticker"] == "AAPL"
+    assert named["result"]["ticker"] == "MSFT"
+    assert checkpointed.run_ids == ["nightly-msft"]
+
+
+def test_job_pruning_purges_old_checkpoints_once_per_ttl():
+    purged = []
+    checkpointed = FakeCheckpointedGraph()
+    checkpointed.checkpointer = types.SimpleNamespace(purge_older_than=purged.append)
+    with client_for(FakeGraph(), checkpointed_graph=checkpointed) as client:
+        client.post("/v1/analyze", json={"query": "aapl"})
+        client.post("/v1/analyze", json={"query": "msft"})
+    assert len(purged) == 1
+
+
+def test_sync_runs_are_not_kept_and_run_id_needs_checkpointing():
+    with client_for(FakeGraph()) as client:
+        body = client.post("/v1/analyze", json={"query": "aapl", "run_id": "nightly-aapl"}).json()
+        assert body["run_id"] is None
+        assert client.get(f"/v1/jobs/{body['job_id']}").status_code == 404
+        assert client.app.state.jobs._jobs == {}
+
+
+def test_finished_jobs_drop_their_events_and_are_capped():
+    with client_for(FakeGraph(), max_jobs=2) as client:
+        jobs = client.app.state.jobs
+        job_ids = []
+        for query in ("a", "b", "c"):
+            job_ids.append(client.post("/v1/jobs", json={"query": query}).json()["job_id"])
+            while client.get(f"/v1/jobs/{job_ids[-1]}").json()["status"] != "succeeded":
+                time.sleep(0.01)
+            assert not jobs.get(job_ids[-1]).events
+        assert jobs.get(job_ids[0]) is None
+        assert [job_id for job_id in job_ids if jobs.get(job_id)] == job_ids[1:]
+
+
+def test_late_followers_get_the_most_recent_events():
+    async def scenario():
+        job = Job("aapl", max_events=2)
+        job.attach()
+        for n in range(4):
+            job.publish("token", n)
+        job.finish({}, None)
+        followed = [payload async for _, payload in job.follow()]
+        job.detach()
+        return followed, list(job.events)
+
+    assert asyncio.run(scenario()) == ([2, 3], [])
@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+
+from app import batch
+from app.graph.state import Recommendation
+from app.utils import limits
+
+
+class FakeGraph:
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+
+    def invoke(self, state):
+        if state["user_input"] == "boom":
+            raise RuntimeError("provider down")
+        time.sleep(self.delay)
+        ticker = state["user_input"].upper()
+        return {**state, "ticker": ticker, "summary": "S", "analysis": "A", "recommendation": Recommendation(action="HOLD", text="R")}
+
+
+def test_run_batch_streams_jsonl_and_reports(tmp_path):
+    out = tmp_path / "results.jsonl"
+    report = batch.run_batch(["aapl", "msft", "boom", "tsla"], out, workers=4, graph=FakeGraph())
+
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(records) == 4
+    assert {r["ticker"] for r in records if r["error"] is None} == {"AAPL", "MSFT", "TSLA"}
+    assert all(r["recommendation"]["action"] == "HOLD" for r in records if r["error"] is None)
+    assert report.succeeded == 3 and report.failed == 1
+    assert report.throughput > 0
+
+
+def test_run_batch_runs_queries_concurrently(tmp_path):
+    start = time.perf_counter()
+    batch.run_batch([f"t{i}" for i in range(8)], tmp_path / "r.jsonl", workers=8, graph=FakeGraph(0.2))
+    assert time.perf_counter() - start < 0.8
+
+
+def test_load_queries_accepts_plain_and_jsonl(tmp_path):
+    path = tmp_path / "watchlist.txt"
+    path.write_text('# comment\nAAPL\n\n{"query": "Microsoft"}\n')
+    assert batch.load_queries(path) == ["AAPL", "Microsoft"]
+
+
+def test_provider_slot_caps_concurrency():
+    limits.configure_limits({"test-provider": 2})
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with limits.provider_slot("test-provider"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+def test_parse_limits():
+    assert limits.parse_limits("gemini=4, groq=2") == {"gemini": 4, "groq": 2}
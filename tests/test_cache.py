@@ -0,0 +1,29 @@
+import time
+
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache("test", maxsize=4, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_per_entry_ttl_overrides_default():
+    cache = TTLCache("test", maxsize=4, ttl=60)
+    cache.set("neg", "UNKNOWN", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("neg") is None
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from app.utils import charts, ohlcv, portfolio
+
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _history(closes):
+    index = pd.date_range("2024-05-01", periods=len(closes), freq="D")
+    return pd.DataFrame({"Close": closes}, index=index)
+
+
+def test_price_chart_is_png_bytes_cached_by_data(monkeypatch):
+    charts.clear_cache()
+    frames = {"AAPL": _history([1.0, 2.0, 3.0])}
+    monkeypatch.setattr(portfolio, "get_bars", lambda ticker, period: ohlcv.to_bars(frames[ticker]))
+    draws = []
+    real_draw = charts.draw_price_history
+    monkeypatch.setattr(charts, "draw_price_history", lambda *a: draws.append(1) or real_draw(*a))
+
+    png = portfolio.plot_price_history("AAPL")
+    assert png.startswith(PNG_MAGIC)
+    assert portfolio.plot_price_history("AAPL") == png
+    assert len(draws) == 1
+
+    frames["AAPL"] = _history([1.0, 2.0, 4.0])
+    assert portfolio.plot_price_history("AAPL") != png
+    assert len(draws) == 2
+    assert "matplotlib.pyplot" not in sys.modules
+
+
+def test_concurrent_renders_of_one_chart_share_a_render():
+    charts.clear_cache()
+    gate = threading.Event()
+    draws = []
+
+    def slow_draw(labels, sizes):
+        draws.append(1)
+        gate.wait(2)
+        return charts.draw_allocation_pie(labels, sizes)
+
+    key = ("pie", "", "", "same")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(charts.render(key, slow_draw, ("AAPL", "MSFT"), (60.0, 40.0))))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(draws) == 1
+    assert len(set(results)) == 1 and results[0].startswith(PNG_MAGIC)
+
+
+def test_portfolio_pie_and_png_file(tmp_path, monkeypatch):
+    charts.clear_cache()
+    png = portfolio.plot_portfolio_pie({"AAPL": 60.0, "MSFT": 40.0})
+    assert png.startswith(PNG_MAGIC)
+    assert portfolio.plot_portfolio_pie({}) is None
+
+    monkeypatch.setattr(charts, "CHART_DIR", str(tmp_path))
+    path = charts.png_file(png)
+    assert path == charts.png_file(png)
+    assert open(path, "rb").read() == png
+
+
+def test_png_file_keeps_only_the_most_recent_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, "CHART_DIR", str(tmp_path))
+    monkeypatch.setattr(charts, "CHART_CACHE_SIZE", 2)
+    first, second = charts.png_file(b"first"), charts.png_file(b"second")
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+    assert charts.png_file(b"first") == first  # reused, and now the most recent
+    third = charts.png_file(b"third")
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(os.path.basename(p) for p in (first, third))
+
+
+def test_price_chart_title_names_the_period(monkeypatch):
+    charts.clear_cache()
+    monkeypatch.setattr(portfolio, "get_bars", lambda ticker, period: ohlcv.to_bars(_history([1.0, 2.0, 3.0])))
+    titles = []
+    real_to_png = charts._to_png
+    monkeypatch.setattr(charts, "_to_png", lambda fig: titles.append(fig.axes[0].get_title()) or real_to_png(fig))
+
+    portfolio.plot_price_history("AAPL", period="3mo")
+    assert titles == ["AAPL Price History (3 Months)"]
@@ -0,0 +1,77 @@
+import pytest
+
+from app import batch
+from app.graph import builder
+from app.graph.checkpoint import SQLiteCheckpointSaver, invoke_resumable, run_config, run_id_for
+from app.graph.state import Recommendation
+
+
+@pytest.fixture
+def fake_nodes(monkeypatch):
+    calls = []
+    failures = {"recommend": 1}
+
+    def node(name, field, wrap=str):
+        def run(state):
+            calls.append(name)
+            if failures.get(name):
+                failures[name] -= 1
+                raise RuntimeError("groq down")
+            return {field: wrap(f"{name}:{state.user_input}")}
+        return run
+
+    monkeypatch.setattr(builder, "infer_ticker_node", node("infer", "ticker"))
+    monkeypatch.setattr(builder, "crawl_node", node("crawl", "summary"))
+    monkeypatch.setattr(builder, "analyze_node", node("analyze", "analysis"))
+    monkeypatch.setattr(builder, "recommend_node", node("recommend", "recommendation", lambda text: Recommendation(action="BUY", text=text)))
+    return calls
+
+
+def test_failed_run_resumes_from_last_completed_node(tmp_path, fake_nodes):
+    path = str(tmp_path / "checkpoints.sqlite")
+    graph = builder.build_graph(checkpointer=SQLiteCheckpointSaver(path))
+    with pytest.raises(RuntimeError):
+        invoke_resumable(graph, {"user_input": "AAPL"}, "run-1")
+    assert fake_nodes == ["infer", "crawl", "analyze", "recommend"]
+
+    # A new process (fresh saver on the same file) only re-runs the failed node.
+    graph = builder.build_graph(checkpointer=SQLiteCheckpointSaver(path))
+    state = invoke_resumable(graph, {"user_input": "AAPL"}, "run-1")
+    assert fake_nodes[4:] == ["recommend"]
+    assert state["recommendation"] == Recommendation(action="BUY", text="recommend:AAPL")
+    assert state["summary"] == "crawl:AAPL"
+
+    # Finished and fresh: nothing runs again.
+    assert invoke_resumable(graph, {"user_input": "AAPL"}, "run-1") == state
+    assert len(fake_nodes) == 5
+
+
+def test_stale_checkpoints_are_not_reused(tmp_path, fake_nodes):
+    graph = builder.build_graph(checkpointer=SQLiteCheckpointSaver(str(tmp_path / "c.sqlite")))
+    with pytest.raises(RuntimeError):
+        invoke_resumable(graph, {"user_input": "MSFT"}, "run-2")
+    invoke_resumable(graph, {"user_input": "MSFT"}, "run-2", max_age=0)
+    assert fake_nodes == ["infer", "crawl", "analyze", "recommend"] * 2
+
+
+def test_batch_skips_nodes_saved_by_an_earlier_run(tmp_path, fake_nodes):
+    graph = builder.build_graph(checkpointer=SQLiteCheckpointSaver(str(tmp_path / "c.sqlite")))
+    first = batch.run_batch(["tsla"], tmp_path / "a.jsonl", workers=1, graph=graph)
+    second = batch.run_batch(["tsla"], tmp_path / "b.jsonl", workers=1, graph=graph)
+    assert (first.failed, second.succeeded) == (1, 1)
+    assert fake_nodes == ["infer", "crawl", "analyze", "recommend", "recommend"]
+    assert run_id_for("TSLA ", prefix="batch") in (tmp_path / "b.jsonl").read_text()
+
+
+def test_purge_drops_only_runs_past_retention(tmp_path, fake_nodes):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "c.sqlite"))
+    graph = builder.build_graph(checkpointer=saver)
+    with pytest.raises(RuntimeError):
+        invoke_resumable(graph, {"user_input": "old"}, "old")
+    invoke_resumable(graph, {"user_input": "new"}, "new")
+    saver._conn.execute("UPDATE checkpoints SET created_at = created_at - 3600 WHERE thread_id = 'old'")
+
+    assert saver.purge_older_than(600) == 1
+    assert not graph.get_state(run_config("old")).values
+    assert saver._conn.execute("SELECT COUNT(*) FROM writes WHERE thread_id = 'old'").fetchone() == (0,)
+    assert graph.get_state(run_config("new")).values["summary"] == "crawl:new"
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from app.graph import builder, coalesce
+from app.graph.state import Recommendation
+from app.utils.singleflight import SingleFlight
+
+
+def test_single_flight_runs_once_and_shares_events():
+    flights = SingleFlight("test")
+    calls = []
+    received = [[] for _ in range(6)]
+    gate = threading.Event()
+
+    def work(emit):
+        calls.append(1)
+        emit("a")
+        gate.wait(2)
+        emit("b")
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(flights.run("k", work, on_event=received[i].append)))
+        for i in range(6)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == [42] * 6
+    assert all(events == ["a", "b"] for events in received)
+    assert len(flights) == 0
+
+
+@pytest.fixture
+def fake_llm_nodes(monkeypatch):
+    coalesce.reset()
+    calls = Counter()
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            calls[name] += 1
+
+    def infer(state):
+        count("infer")
+        # Long enough for every thread to reach the flight even on a loaded machine.
+        time.sleep(0.3)
+        return {"ticker": state.user_input.strip().upper()}
+
+    def crawl(state):
+        count("crawl")
+        time.sleep(0.1)
+        return {"summary": f"summary of {state.ticker}"}
+
+    def analyze(state, writer=None):
+        count("analyze")
+        for token in ["Solid ", "growth."]:
+            time.sleep(0.05)
+            writer({"node": "analyze", "delta": token})
+        return {"analysis": "Solid growth."}
+
+    def recommend(state, writer=None):
+        count("recommend")
+        if state.ticker == "FAIL":
+            raise RuntimeError("groq down")
+        time.sleep(0.05)
+        return {"recommendation": Recommendation(action="BUY")}
+
+    monkeypatch.setattr(builder, "infer_ticker_node", infer)
+    monkeypatch.setattr(builder, "crawl_node", crawl)
+    monkeypatch.setattr(builder, "analyze_node", analyze)
+    monkeypatch.setattr(builder, "recommend_node", recommend)
+    return calls
+
+
+def _stream_all(graph, queries):
+    outputs = {}
+
+    def run(i, query):
+        tokens, final = [], {}
+        for mode, chunk in graph.stream({"user_input": query}, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                tokens.append(chunk["delta"])
+            else:
+                for update in chunk.values():
+                    final.update(update or {})
+        outputs[i] = (tokens, final)
+
+    threads = [threading.Thread(target=run, args=(i, q)) for i, q in enumerate(queries)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outputs
+
+
+def test_llm_calls_scale_with_tickers_not_requests(fake_llm_nodes):
+    graph = builder.build_graph()
+    outputs = _stream_all(graph, ["aapl"] * 6 + ["AAPL "] * 2 + ["msft"] * 4)
+
+    assert fake_llm_nodes == {"infer": 2, "crawl": 2, "analyze": 2, "recommend": 2}
+    for tokens, final in outputs.values():
+        assert tokens == ["Solid ", "growth."]
+        assert final["recommendation"].action == "BUY"
+        assert final["summary"] == f"summary of {final['ticker']}"
+
+
+def test_failed_pipeline_is_not_reused(fake_llm_nodes):
+    graph = builder.build_graph()
+    with pytest.raises(RuntimeError):
+        graph.invoke({"user_input": "fail"})
+    with pytest.raises(RuntimeError):
+        graph.invoke({"user_input": "fail"})
+    assert fake_llm_nodes["crawl"] == 2
+
+    graph.invoke({"user_input": "tsla"})
+    graph.invoke({"user_input": "tsla"})
+    assert fake_llm_nodes["analyze"] == 4
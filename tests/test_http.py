@@ -0,0 +1,93 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.utils import http, resilience, tools
+
+
+def test_dns_lookups_are_cached(monkeypatch):
+    lookups = []
+
+    def fake_getaddrinfo(host, port, **_):
+        lookups.append(host)
+        return [(None, None, None, "", ("10.0.0.1", port))]
+
+    monkeypatch.setattr(http.socket, "getaddrinfo", fake_getaddrinfo)
+    backend = http.CachingDNSBackend(ttl=60)
+    assert backend.resolve("api.example.com", 443) == ["10.0.0.1"]
+    assert backend.resolve("api.example.com", 443) == ["10.0.0.1"]
+    assert lookups == ["api.example.com"]
+
+
+def test_client_is_shared():
+    http.close()
+    try:
+        assert http.get_client() is http.get_client()
+    finally:
+        http.close()
+
+
+def test_tools_go_through_the_shared_client(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.host == "newsapi.org":
+            return httpx.Response(200, json={"articles": [
+                {"publishedAt": "2024-05-01", "title": "AAPL up", "description": "Strong quarter"},
+            ]})
+        if request.url.host == "api.tavily.com":
+            assert json.loads(request.content)["query"] == "AAPL stock news"
+            return httpx.Response(200, json={"results": [{"content": "Tavily says hi"}]})
+        if request.url.path.endswith("/company-news"):
+            return httpx.Response(200, json=[{"datetime": 1, "headline": "H", "summary": "S"}])
+        return httpx.Response(200, json={"metric": {"peTTM": 30.1, "52WeekHigh": 199.6, "52WeekLow": 164.1}})
+
+    resilience.reset()
+    monkeypatch.setattr(http, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+
+    assert tools.newsapi_tool.invoke("AAPL") == "2024-05-01 - AAPL up: Strong quarter"
+    assert tools.tavily_tool.invoke("AAPL") == "Tavily says hi"
+    assert tools.finnhub_tool.invoke("AAPL") == "1 - H: S"
+    assert tools.finnhub_metrics("AAPL") == {"high_52w": 199.6, "low_52w": 164.1}
+    assert {r.url.host for r in requests} == {"newsapi.org", "api.tavily.com", "finnhub.io"}
+    assert "X-Finnhub-Token" in requests[-1].headers
+
+
+def test_pooled_transport_serves_requests_and_maps_errors(monkeypatch):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = json.dumps({"path": self.path}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    lookups = []
+    real_resolve = http.CachingDNSBackend.resolve
+    monkeypatch.setattr(http.CachingDNSBackend, "resolve", lambda self, h, p: lookups.append(h) or real_resolve(self, h, p))
+    port = server.server_address[1]
+    client = httpx.Client(transport=http.PooledTransport(httpx.Limits(max_connections=2), http2=False), trust_env=False)
+    try:
+        assert client.get(f"http://localhost:{port}/a?b=1").json() == {"path": "/a?b=1"}
+        assert client.get(f"http://localhost:{port}/c").json() == {"path": "/c"}
+        assert lookups == ["localhost"]  # one connection, kept alive
+
+        server.shutdown()
+        server.server_close()
+        with pytest.raises(httpx.ConnectError):
+            client.get(f"http://127.0.0.1:{port}/gone")
+    finally:
+        client.close()
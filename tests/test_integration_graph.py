@@ -2,6 +2,8 @@ import sys
 import types
 import pandas as pd
 
+from app.graph.state import Metrics
+
 import app.graph.nodes.infer as infer_mod
 import app.graph.nodes.crawl as crawl_mod
 import app.graph.nodes.analyze as analyze_mod
@@ -38,6 +40,9 @@ def test_full_graph_flow(monkeypatch):
                 return DummyResponse("ANALYSIS")
             else:
                 return DummyResponse("DEFAULT")
+
+        def stream(self, prompt):
+            yield self.invoke(prompt)
     fake_agents.llama = DummyLlama()
     
     # Inject fake agents BEFORE importing modules
@@ -60,14 +65,21 @@ def test_full_graph_flow(monkeypatch):
     analyze_mod = importlib.import_module("app.graph.nodes.analyze")
     recommend_mod = importlib.import_module("app.graph.nodes.recommend")
     
+    if "app.graph.builder" in sys.modules:
+        del sys.modules["app.graph.builder"]
+
     # Re-import app.ui.gradio_app to use the new modules
     if "app.ui.gradio_app" in sys.modules:
         del sys.modules["app.ui.gradio_app"]
     app = importlib.import_module("app.ui.gradio_app")
     
     # Mock yfinance and validation
-    monkeypatch.setattr(infer_mod.yf, "download", lambda *_, **__: pd.DataFrame({"Close": [1.0]}), raising=True)
+    monkeypatch.setattr(infer_mod, "get_history", lambda *_, **__: pd.DataFrame({"Close": [1.0]}), raising=True)
     monkeypatch.setattr(infer_mod, "validate_ticker", lambda t: t if t.upper() == "AAPL" else "", raising=True)
+    monkeypatch.setattr(crawl_mod, "CRAWL_SOURCES", {
+        "yahoo_finance": lambda t: Metrics(t, "2024-06-28", {"price": 190.0}),
+        "tavily": lambda t: f"{t} beats estimates\n{t.lower()} beats estimates!",
+    }, raising=True)
 
     graph = app.build_graph()
     result = graph.invoke({"user_input": "Apple"})
@@ -75,6 +87,71 @@ def test_full_graph_flow(monkeypatch):
     assert result["ticker"] == "AAPL"
     assert result["summary"] == "SUMMARY"
     assert result["analysis"] == "ANALYSIS"
-    assert result["recommendations"] == "RECOMMENDATIONS"
+    assert result["recommendation"].text == "RECOMMENDATIONS"
+    assert result["metrics"].values == {"price": 190.0}
+    assert [item.text for item in result["news"]] == ["AAPL beats estimates"]
+
+
+def import_ui_with_fakes(gemini, llama):
+    import importlib
+
+    fake_agents = types.ModuleType("agents")
+    fake_agents.gemini = gemini
+    fake_agents.llama = llama
+    sys.modules["app.utils.agents"] = fake_agents
+    for name in [
+        "app.graph.nodes.infer", "app.graph.nodes.crawl", "app.graph.nodes.analyze",
+        "app.graph.nodes.recommend", "app.graph.builder", "app.ui.gradio_app",
+    ]:
+        sys.modules.pop(name, None)
+    crawl_mod = importlib.import_module("app.graph.nodes.crawl")
+    app = importlib.import_module("app.ui.gradio_app")
+    return crawl_mod, app
+
+
+def test_streaming_ui_shows_price_chart_before_recommendations(monkeypatch):
+    import time
+
+    class DummyGemini:
+        def invoke(self, prompt):
+            return DummyResponse("SUMMARY")
+
+    class SlowLlama:
+        def invoke(self, prompt):
+            return DummyResponse("DEFAULT")
+
+        def stream(self, prompt):
+            for token in ["HOLD ", "for ", "now."]:
+                time.sleep(0.05)
+                yield DummyResponse(token)
+
+    crawl_mod, app = import_ui_with_fakes(DummyGemini(), SlowLlama())
+
+    monkeypatch.setattr(crawl_mod, "CRAWL_SOURCES", {}, raising=True)
+    monkeypatch.setattr(app, "plot_price_history", lambda ticker: f"chart:{ticker}", raising=True)
+
+    outputs = list(app.analyze_query_streaming("AAPL"))
+    first_chart = next(i for i, out in enumerate(outputs) if out[4] == "chart:AAPL")
+    first_recommendation = next(i for i, out in enumerate(outputs) if out[3])
+    assert first_chart < first_recommendation
+    assert outputs[-1][4] == "chart:AAPL"
+
+
+def test_streaming_ui_renders_tokens_from_graph_stream(monkeypatch):
+    class DummyGemini:
+        def invoke(self, prompt):
+            return DummyResponse("SUMMARY")
+
+    class TokenLlama:
+        def stream(self, prompt):
+            for token in ["Partial ", "answer."]:
+                yield DummyResponse(token)
+
+    crawl_mod, app = import_ui_with_fakes(DummyGemini(), TokenLlama())
 
+    monkeypatch.setattr(crawl_mod, "CRAWL_SOURCES", {}, raising=True)
+    monkeypatch.setattr(app, "plot_price_history", lambda ticker: None, raising=True)
 
+    analyses = [out[2] for out in app.analyze_query_streaming("AAPL")]
+    assert any("Partial" in html and "answer." not in html for html in analyses)
+    assert "Partial answer." in analyses[-1]
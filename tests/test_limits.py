@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from app.utils import limits
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_token_bucket_delays_past_burst():
+    bucket = limits.TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_parse_rates():
+    assert limits.parse_rates("gemini=20/40, finnhub=1") == {"gemini": (20.0, 40.0), "finnhub": (1.0, 1.0)}
+
+
+def test_limiter_backs_off_on_429_and_recovers():
+    limiter = limits.ProviderLimiter("test-aimd", max_concurrency=8, tolerance=3.0, backoff=0.5)
+    limiter.acquire()
+    limiter.release(latency=0.01, rate_limited=True)
+    assert limiter.limit == 4
+
+    for _ in range(40):
+        limiter.acquire()
+        limiter.release(latency=0.01)
+    assert limiter.limit == 8
+
+
+def test_limiter_backs_off_on_latency_growth():
+    limiter = limits.ProviderLimiter("test-latency", max_concurrency=8, tolerance=2.0, backoff=0.5)
+    limiter.acquire()
+    limiter.release(latency=0.01)
+    limiter.acquire()
+    limiter.release(latency=0.5)
+    assert limiter.limit == 4
+
+
+def test_interactive_calls_overtake_queued_batch_calls():
+    limits.configure_limits({"test-priority": 1})
+    order = []
+    blocker = threading.Event()
+
+    def call(priority, name):
+        with limits.priority_scope(priority), limits.provider_slot("test-priority"):
+            order.append(name)
+            if name == "first":
+                blocker.wait()
+
+    first = threading.Thread(target=call, args=(limits.INTERACTIVE, "first"))
+    first.start()
+    time.sleep(0.02)
+    waiting = [threading.Thread(target=call, args=(limits.BATCH, f"batch{i}")) for i in range(3)]
+    for t in waiting:
+        t.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=call, args=(limits.INTERACTIVE, "interactive"))
+    interactive.start()
+    time.sleep(0.02)
+    blocker.set()
+    for t in [first, interactive, *waiting]:
+        t.join()
+
+    assert order == ["first", "interactive", "batch0", "batch1", "batch2"]
+
+
+def test_provider_slot_reports_429_to_limiter():
+    limits.configure_limits({"test-429": 4})
+    with pytest.raises(RateLimitError):
+        with limits.provider_slot("test-429"):
+            raise RateLimitError()
+    assert limits.get_limiter("test-429").limit == 2
@@ -0,0 +1,78 @@
+import time
+import types
+
+from app.utils.llm import run_llm
+from app.utils.llm_cache import CachedChatModel, SQLiteResponseStore, refresh_ticker, ticker_scope
+
+
+class CountingLLM:
+    model = "fake-model"
+    temperature = 0
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return types.SimpleNamespace(content=f"answer to {prompt}")
+
+    def stream(self, prompt):
+        self.calls += 1
+        for token in ["answer ", "to ", prompt]:
+            yield types.SimpleNamespace(content=token)
+
+
+def test_invoke_is_served_from_cache_after_first_call(tmp_path):
+    llm = CountingLLM()
+    cached = CachedChatModel(llm, SQLiteResponseStore(str(tmp_path / "c.sqlite")), name="fake", ttl=60)
+    assert run_llm(cached, "AAPL?", node="test", provider="fake") == "answer to AAPL?"
+    assert run_llm(cached, "AAPL?", node="test", provider="fake") == "answer to AAPL?"
+    assert llm.calls == 1
+
+
+def test_stream_results_are_cached_and_replayed(tmp_path):
+    llm = CountingLLM()
+    cached = CachedChatModel(llm, SQLiteResponseStore(str(tmp_path / "c.sqlite")), name="fake", ttl=60)
+    first, second = [], []
+    run_llm(cached, "TSLA", node="test", provider="fake", writer=lambda event: first.append(event["delta"]))
+    run_llm(cached, "TSLA", node="test", provider="fake", writer=lambda event: second.append(event["delta"]))
+    assert "".join(first) == "".join(second) == "answer to TSLA"
+    assert llm.calls == 1
+
+
+def test_entries_survive_restart_and_expire(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    CachedChatModel(CountingLLM(), SQLiteResponseStore(path), name="fake", ttl=0.05).save("MSFT", "answer to MSFT")
+
+    reopened = CachedChatModel(CountingLLM(), SQLiteResponseStore(path), name="fake", ttl=0.05)
+    assert reopened.lookup("MSFT") == "answer to MSFT"
+    time.sleep(0.06)
+    assert reopened.lookup("MSFT") is None
+
+
+def test_new_crawl_data_drops_only_that_tickers_entries(tmp_path):
+    store = SQLiteResponseStore(str(tmp_path / "c.sqlite"))
+    cached = CachedChatModel(CountingLLM(), store, name="fake", ttl=60)
+    assert refresh_ticker(cached, "AAPL", "day1") == 0
+    with ticker_scope("AAPL"):
+        cached.save("apple prompt", "apple answer")
+    with ticker_scope("MSFT"):
+        cached.save("msft prompt", "msft answer")
+
+    assert refresh_ticker(cached, "AAPL", "day1") == 0
+    assert cached.lookup("apple prompt") == "apple answer"
+    assert refresh_ticker(cached, "AAPL", "day2") == 1
+    assert cached.lookup("apple prompt") is None
+    assert cached.lookup("msft prompt") == "msft answer"
+    assert refresh_ticker(CountingLLM(), "AAPL", "day3") == 0
+
+
+def test_expired_rows_are_purged_when_the_store_is_opened(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    store = SQLiteResponseStore(path)
+    store.set("old", "x", model="fake", ticker="AAPL", ttl=-1)
+    store.set("new", "y", model="fake", ticker="AAPL", ttl=60)
+
+    reopened = SQLiteResponseStore(path)
+    rows = reopened._conn.execute("SELECT key FROM llm_cache").fetchall()
+    assert rows == [("new",)]
@@ -0,0 +1,121 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from app.observability.monitoring import parse_prices
+from app.utils import resilience
+from app.utils.limits import is_rate_limited
+from app.utils.llm import run_llm
+from app.utils.llm_cache import CachedChatModel, SQLiteResponseStore
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeMessage:
+    def __init__(self, content, usage=None):
+        self.content = content
+        self.usage_metadata = usage
+
+
+class FakeLLM:
+    model = "models/gemini-2.0-flash"
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def invoke(self, prompt):
+        if self.error:
+            raise self.error
+        return FakeMessage("ok", {"input_tokens": 1000, "output_tokens": 500})
+
+    def stream(self, prompt):
+        yield FakeMessage("o")
+        yield FakeMessage("k", {"input_tokens": 1000, "output_tokens": 500})
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_parse_prices():
+    assert parse_prices("a=0.1/0.4, b=2") == {"a": (0.1, 0.4), "b": (2.0, 2.0)}
+
+
+def test_run_llm_records_tokens_cost_and_outcome():
+    labels = {"provider": "gemini", "model": "gemini-2.0-flash"}
+    before_prompt = sample("llm_tokens_total", kind="prompt", **labels)
+    before_completion = sample("llm_tokens_total", kind="completion", **labels)
+    before_cost = sample("llm_cost_usd_total", **labels)
+    before_ok = sample("llm_requests_total", outcome="ok", **labels)
+
+    run_llm(FakeLLM(), "p", node="crawl", provider="gemini")
+    run_llm(FakeLLM(), "p", node="crawl", provider="gemini", writer=lambda event: None)
+
+    assert sample("llm_tokens_total", kind="prompt", **labels) - before_prompt == 2000
+    assert sample("llm_tokens_total", kind="completion", **labels) - before_completion == 1000
+    # 2 x (1000 * 0.10 + 500 * 0.40) / 1M
+    assert sample("llm_cost_usd_total", **labels) - before_cost == pytest.approx(0.0006)
+    assert sample("llm_requests_total", outcome="ok", **labels) - before_ok == 2
+    assert sample("llm_requests_in_flight", **labels) == 0
+
+
+def test_run_llm_counts_rate_limited_responses(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BACKOFF", 0.0)
+    resilience.reset()
+    labels = {"provider": "groq", "model": "gemini-2.0-flash"}
+    before = sample("llm_rate_limited_total", **labels)
+
+    with pytest.raises(RateLimitError):
+        run_llm(FakeLLM(RateLimitError("quota")), "p", node="analyze", provider="groq")
+    with pytest.raises(ValueError):
+        run_llm(FakeLLM(ValueError("bad")), "p", node="analyze", provider="groq")
+
+    # Every attempt (first try plus retries) hit the 429.
+    assert sample("llm_rate_limited_total", **labels) - before == 1 + resilience.PROVIDER_RETRIES
+    assert sample("llm_requests_total", outcome="error", **labels) >= 1
+    assert sample("llm_requests_in_flight", **labels) == 0
+    resilience.reset()
+
+
+def test_cache_hits_skip_limiter_and_request_metrics(tmp_path, monkeypatch):
+    labels = {"provider": "gemini", "model": "gemini-2.0-flash"}
+    calls, slots = [], []
+    real_attempt = resilience._attempt
+    monkeypatch.setattr(resilience, "_attempt", lambda provider, fn: slots.append(provider) or real_attempt(provider, fn))
+
+    class CountingLLM(FakeLLM):
+        def invoke(self, prompt):
+            calls.append(prompt)
+            return super().invoke(prompt)
+
+    cached = CachedChatModel(CountingLLM(), SQLiteResponseStore(str(tmp_path / "c.sqlite")), name="gemini", ttl=60)
+    before_ok = sample("llm_requests_total", outcome="ok", **labels)
+    before_hits = sample("llm_cache_hits_total", **labels)
+
+    deltas = []
+    assert [run_llm(cached, "same", node="crawl", provider="gemini") for _ in range(2)] == ["ok", "ok"]
+    assert run_llm(cached, "same", node="crawl", provider="gemini", writer=deltas.append) == "ok"
+
+    assert len(calls) == 1 and len(slots) == 1
+    assert sample("llm_requests_total", outcome="ok", **labels) - before_ok == 1
+    assert sample("llm_cache_hits_total", **labels) - before_hits == 2
+    assert deltas == [{"node": "crawl", "delta": "ok"}]
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(RateLimitError())
+    assert is_rate_limited(Exception("429 RESOURCE_EXHAUSTED: quota exceeded"))
+    assert not is_rate_limited(TimeoutError())
+
+
+def test_run_llm_records_ttft_for_streamed_and_invoked_calls():
+    labels = {"node": "analyze", "provider": "gemini", "model": "gemini-2.0-flash"}
+    before_stream = sample("llm_time_to_first_token_seconds_count", mode="stream", **labels)
+    before_invoke = sample("llm_time_to_first_token_seconds_count", mode="invoke", **labels)
+
+    run_llm(FakeLLM(), "p", node="analyze", provider="gemini")
+    run_llm(FakeLLM(), "p", node="analyze", provider="gemini", writer=lambda event: None)
+
+    assert sample("llm_time_to_first_token_seconds_count", mode="stream", **labels) - before_stream == 1
+    assert sample("llm_time_to_first_token_seconds_count", mode="invoke", **labels) - before_invoke == 1
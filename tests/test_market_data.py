@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import app.utils.market_data as md
+from app.utils.ohlcv import OHLCVStore
+
+
+@pytest.fixture(autouse=True)
+def tmp_store(tmp_path, monkeypatch):
+    store = OHLCVStore(str(tmp_path), fetch=md._fetch_bars, max_age=300)
+    monkeypatch.setattr(md, "_store", store)
+    return store
+
+
+def make_history(rows: int = 21) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=rows, freq="B")
+    return pd.DataFrame({"Close": range(rows)}, index=index)
+
+
+def make_download(tickers) -> pd.DataFrame:
+    tickers = [tickers] if isinstance(tickers, str) else tickers
+    return pd.concat({t: make_history() for t in tickers}, axis=1)
+
+
+def test_daily_windows_are_served_from_one_stored_download(monkeypatch):
+    md.clear_caches()
+    calls = []
+
+    def fake_download(tickers, period=None, interval="1d", **_):
+        calls.append((tuple(tickers), period))
+        return make_download(tickers)
+
+    monkeypatch.setattr(md.yf, "download", fake_download, raising=True)
+
+    month = md.get_history("aapl", period="1mo")
+    week = md.get_history("AAPL", period="5d")
+    assert calls == [(("AAPL",), md.OHLCV_HISTORY_PERIOD)]
+    assert len(month) == 21 and len(week) == 5
+    assert week.index[-1] == month.index[-1]
+
+
+def test_request_scope_pins_values_after_process_cache_clears(monkeypatch):
+    md.clear_caches()
+    calls = []
+    monkeypatch.setattr(md.yf, "download", lambda t, **k: calls.append(t) or make_download(t), raising=True)
+
+    with md.request_scope():
+        md.get_history("MSFT")
+        md.clear_caches()
+        md.get_history("MSFT")
+    assert len(calls) == 1
+
+
+def test_concurrent_callers_share_one_inflight_fetch(monkeypatch):
+    md.clear_caches()
+    calls = []
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            calls.append(ticker)
+            time.sleep(0.1)
+            self.info = {"symbol": ticker}
+
+    monkeypatch.setattr(md.yf, "Ticker", FakeTicker, raising=True)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(md.get_info("TSLA"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["TSLA"]
+    assert all(r == {"symbol": "TSLA"} for r in results) and len(results) == 8
+
+
+def test_concurrent_history_requests_are_batched_into_one_download(monkeypatch):
+    md.clear_caches()
+    calls = []
+
+    def fake_download(tickers, period=None, interval="1d", **_):
+        calls.append(sorted(tickers))
+        return make_download(tickers)
+
+    monkeypatch.setattr(md.yf, "download", fake_download, raising=True)
+    monkeypatch.setattr(md._history_batcher, "window", 0.05, raising=True)
+
+    results = {}
+    tickers = ["AAPL", "MSFT", "TSLA", "NVDA"]
+    threads = [threading.Thread(target=lambda t=t: results.update({t: md.get_history(t)})) for t in tickers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [sorted(tickers)]
+    assert all(len(results[t]) == 21 and "Close" in results[t].columns for t in tickers)
@@ -2,6 +2,8 @@ import sys
 import types
 import importlib
 
+from app.graph.state import Metrics, StockState
+
 
 def import_analyze_with_fake_llmchain(reply_text: str):
     # Create a fake llama object with invoke method
@@ -25,8 +27,36 @@ def import_analyze_with_fake_llmchain(reply_text: str):
 
 def test_analyze_node_sets_analysis_text():
     analyze_mod = import_analyze_with_fake_llmchain("analysis-ok")
-    state = {"ticker": "AAPL", "summary": "sum"}
-    out = analyze_mod.analyze_node(state)
-    assert out["analysis"] == "analysis-ok"
+    out = analyze_mod.analyze_node(StockState(ticker="AAPL", summary="sum"))
+    assert out == {"analysis": "analysis-ok"}
+
+
+def test_analyze_node_streams_tokens_to_writer():
+    analyze_mod = import_analyze_with_fake_llmchain("unused")
+
+    class StreamingLlama:
+        def stream(self, prompt):
+            for token in ["Strong ", "fundamentals", "."]:
+                yield types.SimpleNamespace(content=token)
 
+    analyze_mod.llama = StreamingLlama()
+    events = []
+    out = analyze_mod.analyze_node(StockState(ticker="AAPL", summary="sum"), writer=events.append)
+    assert [e["delta"] for e in events] == ["Strong ", "fundamentals", "."]
+    assert all(e["node"] == "analyze" for e in events)
+    assert out["analysis"] == "Strong fundamentals."
+
+
+def test_analyze_prompt_carries_metrics_block():
+    analyze_mod = import_analyze_with_fake_llmchain("unused")
+    prompts = []
+
+    class RecordingLlama:
+        def invoke(self, prompt):
+            prompts.append(prompt)
+            return types.SimpleNamespace(content="ok")
 
+    analyze_mod.llama = RecordingLlama()
+    metrics = Metrics("AAPL", "2024-06-28", {"price": 190.0, "beta": 1.2}, {"trailingPE": 29.5})
+    analyze_mod.analyze_node(StockState(ticker="AAPL", summary="sum", metrics=metrics))
+    assert "price 190.00" in prompts[0] and "P/E 29.50" in prompts[0]
@@ -1,7 +1,10 @@
 import sys
+import time
 import types
 import importlib
 
+from app.graph.state import Metrics, StockState
+
 
 def import_crawl_with_fake_gemini(summary_text: str):
     fake_agents = types.ModuleType("agents")
@@ -15,10 +18,73 @@ def import_crawl_with_fake_gemini(summary_text: str):
     return importlib.import_module("app.graph.nodes.crawl")
 
 
-def test_crawl_node_sets_summary():
+def test_crawl_node_sets_summary(monkeypatch):
     crawl_mod = import_crawl_with_fake_gemini("This is a summary")
-    state = {"ticker": "AAPL"}
-    out = crawl_mod.crawl_node(state)
-    assert "summary" in out and out["summary"] == "This is a summary"
+    metrics = Metrics("AAPL", "2024-06-28", {"price": 190.0}, {"trailingPE": 29.5})
+    monkeypatch.setattr(crawl_mod, "CRAWL_SOURCES", {
+        "yahoo_finance": lambda t: metrics,
+        "tavily": lambda t: "Apple beats estimates on iPhone sales\nRates on hold",
+        "newsapi": lambda t: "2024-06-28T10:00:00Z - Apple Beats Estimates on iPhone Sales",
+    }, raising=True)
+    out = crawl_mod.crawl_node(StockState(ticker="AAPL"))
+    assert set(out) == {"metrics", "news", "summary"}
+    assert out["summary"] == "This is a summary"
+    assert out["metrics"] is metrics
+    assert [(item.source, item.text) for item in out["news"]] == [
+        ("tavily", "Apple beats estimates on iPhone sales"),
+        ("tavily", "Rates on hold"),
+    ]
+    assert len({item.id for item in out["news"]}) == 2
+
+
+def test_crawl_node_merges_finnhub_metrics_into_metrics_not_news(monkeypatch):
+    crawl_mod = import_crawl_with_fake_gemini("summary")
+    monkeypatch.setattr(crawl_mod, "CRAWL_SOURCES", {
+        "yahoo_finance": lambda t: Metrics("AAPL", "2024-06-28", {"price": 190.0}),
+        "finnhub": lambda t: "1719568800 - Apple unveils new product line: details",
+        "finnhub_metrics": lambda t: {"high_52w": 199.6, "low_52w": 164.1},
+    }, raising=True)
+    out = crawl_mod.crawl_node(StockState(ticker="AAPL"))
+    assert out["metrics"].values == {"price": 190.0, "high_52w": 199.6, "low_52w": 164.1}
+    assert "52w range 164.10-199.60" in out["metrics"].block()
+    assert [item.source for item in out["news"]] == ["finnhub"]
+
+
+def test_data_digest_changes_only_with_new_bars_or_headlines():
+    crawl_mod = import_crawl_with_fake_gemini("unused")
+    metrics = Metrics("AAPL", "2024-06-28", {"price": 190.0})
+    items = crawl_mod.news_items({"tavily": "Apple beats estimates\nRates on hold"})
+    digest = crawl_mod.data_digest(metrics, items)
+    assert crawl_mod.data_digest(Metrics("AAPL", "2024-06-28", {"price": 191.0}), items[::-1]) == digest
+    assert crawl_mod.data_digest(Metrics("AAPL", "2024-07-01", {"price": 190.0}), items) != digest
+    assert crawl_mod.data_digest(metrics, items[:1]) != digest
+
+
+def test_gather_sources_returns_partial_results():
+    crawl_mod = import_crawl_with_fake_gemini("unused")
+
+    def slow(_):
+        time.sleep(1.0)
+        return "late"
+
+    def broken(_):
+        raise Exception("down")
+
+    sources = {"fast": lambda t: f"{t} fast", "slow": slow, "broken": broken}
+    out = crawl_mod.gather_sources("AAPL", sources=sources, timeout=0.2)
+    assert out == {"fast": "AAPL fast"}
+
+
+def test_gather_sources_runs_concurrently():
+    crawl_mod = import_crawl_with_fake_gemini("unused")
 
+    def sleeper(_):
+        time.sleep(0.2)
+        return "ok"
 
+    sources = {name: sleeper for name in ("a", "b", "c", "d")}
+    start = time.perf_counter()
+    out = crawl_mod.gather_sources("AAPL", sources=sources, timeout=2)
+    elapsed = time.perf_counter() - start
+    assert len(out) == 4
+    assert elapsed < 0.6
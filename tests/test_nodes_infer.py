@@ -3,6 +3,8 @@ import types
 import importlib
 import pandas as pd
 
+from app.graph.state import StockState
+
 
 class DummyResponse:
     def __init__(self, content: str):
@@ -27,13 +29,12 @@ def test_infer_ticker_node_happy_path(monkeypatch):
 
     # Mock yfinance.download → non-empty dataframe
     df = pd.DataFrame({"Close": [100.0]})
-    monkeypatch.setattr(infer_mod.yf, "download", lambda *a, **k: df, raising=True)
+    monkeypatch.setattr(infer_mod, "get_history", lambda *a, **k: df, raising=True)
 
     # Mock validate_ticker → valid for AAPL, invalid for others
     monkeypatch.setattr(infer_mod, "validate_ticker", lambda t: t if t.upper() == "AAPL" else "", raising=True)
 
-    state = {"user_input": "Apple"}
-    out = infer_mod.infer_ticker_node(state)
+    out = infer_mod.infer_ticker_node(StockState(user_input="Apple"))
     assert out["ticker"] == "AAPL"
 
 
@@ -44,17 +45,68 @@ def test_infer_ticker_node_invalid_then_unknown(monkeypatch):
     class Empty:
         empty = True
 
-    monkeypatch.setattr(infer_mod.yf, "download", lambda *a, **k: Empty(), raising=True)
+    monkeypatch.setattr(infer_mod, "get_history", lambda *a, **k: Empty(), raising=True)
     # tavily_tool raises (simulating HTTP error)
     def raise_err(*_args, **_kwargs):
         raise Exception("net")
 
-    monkeypatch.setattr(infer_mod, "tavily_tool", raise_err, raising=True)
+    monkeypatch.setattr(infer_mod, "tavily_tool", types.SimpleNamespace(invoke=raise_err), raising=True)
     # validator says invalid
     monkeypatch.setattr(infer_mod, "validate_ticker", lambda *_: "", raising=True)
 
-    state = {"user_input": "Some Co"}
-    out = infer_mod.infer_ticker_node(state)
+    out = infer_mod.infer_ticker_node(StockState(user_input="Some Co"))
     assert out["ticker"] == "UNKNOWN"
 
 
+def test_infer_ticker_node_caches_resolution(monkeypatch):
+    infer_mod = import_infer_with_fakes("AAPL")
+    calls = []
+
+    monkeypatch.setattr(infer_mod, "get_history", lambda *a, **k: pd.DataFrame({"Close": [100.0]}), raising=True)
+
+    def validate(t):
+        calls.append(t)
+        return t if t.upper() == "AAPL" else ""
+
+    monkeypatch.setattr(infer_mod, "validate_ticker", validate, raising=True)
+
+    assert infer_mod.infer_ticker_node(StockState(user_input="Apple"))["ticker"] == "AAPL"
+    first_calls = len(calls)
+    assert infer_mod.infer_ticker_node(StockState(user_input="  apple "))["ticker"] == "AAPL"
+    assert len(calls) == first_calls
+
+def test_infer_ticker_node_uses_symbol_index_before_llm(monkeypatch):
+    infer_mod = import_infer_with_fakes("SHOULD-NOT-BE-USED")
+    monkeypatch.setattr(infer_mod, "validate_ticker", lambda *_: "", raising=True)
+
+    out = infer_mod.infer_ticker_node(StockState(user_input="aaplee"))
+    assert out["ticker"] == "AAPL"
+
+
+def test_infer_ticker_node_does_not_cache_outages(monkeypatch):
+    import pytest
+    from app.graph import state as state_mod
+    from app.utils.resilience import CircuitOpenError
+
+    infer_mod = import_infer_with_fakes("PATH")
+
+    class Empty:
+        empty = True
+
+    def breaker_open(*_args, **_kwargs):
+        raise CircuitOpenError("yahoo")
+
+    monkeypatch.setattr(infer_mod, "get_history", lambda *a, **k: Empty(), raising=True)
+    monkeypatch.setattr(infer_mod, "tavily_tool", types.SimpleNamespace(invoke=breaker_open), raising=True)
+    monkeypatch.setattr(state_mod, "get_info", breaker_open, raising=True)
+    monkeypatch.setattr(infer_mod, "validate_ticker", state_mod.validate_ticker, raising=True)
+
+    with pytest.raises(CircuitOpenError):
+        infer_mod.infer_ticker_node(StockState(user_input="UiPath"))
+    assert infer_mod.ticker_cache.get("uipath") is None
+
+    # Once Yahoo answers again, a real "not found" is cached as before.
+    monkeypatch.setattr(state_mod, "get_info", lambda ticker: {}, raising=True)
+    monkeypatch.setattr(infer_mod, "tavily_tool", types.SimpleNamespace(invoke=lambda _: "no symbol"), raising=True)
+    assert infer_mod.infer_ticker_node(StockState(user_input="UiPath"))["ticker"] == "UNKNOWN"
+    assert infer_mod.ticker_cache.get("uipath") == "UNKNOWN"
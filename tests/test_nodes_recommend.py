@@ -16,3 +16,54 @@ def test_highlight_recommendation_sell():
     assert "SELL" in html and "background-color:red" in html
 
 
+def test_parse_recommendation_reads_structure_once():
+    text = (
+        "Given the buy/hold/sell options, our call is **HOLD** with a 12-month target price of $1,250.50.\n\n"
+        "Suggested Portfolio Allocation: 5-10% allocation of AAPL, 3% allocation to MSFT.\n\n"
+        "Risks: supply chain."
+    )
+    out = rec.parse_recommendation(text)
+    assert out.action == "HOLD"
+    assert out.target_price == 1250.5
+    assert out.allocations == {"AAPL": 7.5, "MSFT": 3.0}
+    assert out.portfolio.startswith("Suggested Portfolio Allocation") and "Risks" not in out.portfolio
+    assert out.text == text
+
+
+def test_parse_recommendation_prefers_valid_json_block():
+    text = (
+        "We rate it a hold for now, target price $150.\n\n"
+        "Suggested Portfolio Allocation: 5% allocation of AAPL.\n\n"
+        '```json\n{"action": "buy", "target_price": 210.5, "allocations": {"aapl": 6, "MSFT": 4}}\n```'
+    )
+    out = rec.parse_recommendation(text)
+    assert out.action == "BUY"
+    assert out.target_price == 210.5
+    assert out.allocations == {"AAPL": 6.0, "MSFT": 4.0}
+    assert "```" not in out.text and out.text.endswith("5% allocation of AAPL.")
+    assert out.portfolio.startswith("Suggested Portfolio Allocation")
+
+
+def test_parse_recommendation_falls_back_per_invalid_field():
+    text = (
+        "Our call is SELL with a target price of $90.\n\n"
+        "Suggested Portfolio Allocation: 2% allocation to TSLA.\n\n"
+        '```json\n{"action": "SHORT", "target_price": -5, "allocations": {"TSLA": 80, "the portfolio": 40}}\n```'
+    )
+    out = rec.parse_recommendation(text)
+    assert out.action == "SELL"
+    assert out.target_price == 90.0
+    assert out.allocations == {"TSLA": 2.0}
+
+
+def test_parse_recommendation_survives_broken_json():
+    text = 'HOLD, target $12.\n```json\n{"action": "HOLD", "target_price": '
+    out = rec.parse_recommendation(text)
+    assert out.action == "HOLD" and out.target_price == 12.0
+    assert out.text == "HOLD, target $12."
+
+
+def test_highlight_recommendation_marks_every_keyword():
+    html = rec.highlight_recommendation("STRONG BUY, not SELL or HOLD; WEAK, POSITIVE and NEGATIVE signals. Buy low.")
+    assert html.count("<span") == 7
+    assert html.endswith("signals. Buy low.")
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ohlcv import OHLCVStore, merge_tail, to_bars, window
+
+
+def _frame(start, closes):
+    index = pd.bdate_range(start, periods=len(closes))
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 1.0}, index=index)
+
+
+class FakeFetch:
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, ticker, start):
+        with self.lock:
+            self.calls.append((ticker, start))
+        if start is None:
+            return self.history
+        return self.history[self.history.index >= start]
+
+
+def test_first_read_downloads_then_only_the_tail_is_fetched(tmp_path):
+    fetch = FakeFetch(_frame("2024-01-01", [float(i) for i in range(30)]))
+    store = OHLCVStore(str(tmp_path), fetch, max_age=300)
+
+    assert len(store.bars("aapl")) == 30
+    assert fetch.calls == [("AAPL", None)]
+    assert os.path.exists(tmp_path / "AAPL.npy")
+
+    # The last stored bar was partial: the tail replaces it and appends new ones.
+    fetch.history = pd.concat([fetch.history.iloc[:-1], _frame(fetch.history.index[-1], [99.0, 100.0, 101.0])])
+    assert store.update("AAPL") == 3
+    bars = store.bars("AAPL")
+    assert fetch.calls[-1] == ("AAPL", pd.Timestamp(fetch.history.index[-3]))
+    assert len(bars) == 32
+    assert list(bars["close"][-3:]) == [99.0, 100.0, 101.0]
+    assert np.all(np.diff(bars["ts"]).astype("int64") > 0)
+
+
+def test_windows_are_zero_copy_slices_of_the_memory_map(tmp_path):
+    store = OHLCVStore(str(tmp_path), FakeFetch(_frame("2024-01-01", [1.0] * 300)))
+    bars = store.bars("MSFT")
+    week, month = store.window("MSFT", "5d"), store.window("MSFT", "1mo")
+
+    assert isinstance(bars, np.memmap)
+    assert np.shares_memory(week, bars) and np.shares_memory(month, bars)
+    assert len(week) == 5
+    assert month["ts"][-1] == bars["ts"][-1]
+    assert month["ts"][-1] - month["ts"][0] <= np.timedelta64(30, "D")
+
+
+def test_stale_store_is_served_while_refreshing_in_background(tmp_path):
+    gate = threading.Event()
+    fetch = FakeFetch(_frame("2024-01-01", [1.0, 2.0, 3.0]))
+    store = OHLCVStore(str(tmp_path), fetch, max_age=60)
+    store.bars("TSLA")
+
+    def slow_tail(ticker, start):
+        gate.wait(2)
+        return _frame(start, [3.0, 4.0])
+
+    store.fetch = slow_tail
+    old = time.time() - 3600
+    os.utime(tmp_path / "TSLA.npy", (old, old))
+
+    assert len(store.bars("TSLA")) == 3  # served immediately from disk
+    gate.set()
+    deadline = time.monotonic() + 2
+    while len(store.bars("TSLA")) != 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(store.bars("TSLA")["close"]) == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_merge_and_window_on_plain_arrays():
+    stored = to_bars(_frame("2024-01-01", [1.0, 2.0, 3.0]))
+    merged = merge_tail(stored, to_bars(_frame("2024-01-03", [30.0, 40.0])))
+    assert list(merged["close"]) == [1.0, 2.0, 30.0, 40.0]
+    assert merge_tail(stored, to_bars(_frame("2024-01-01", [])[:0])) is stored
+    assert len(window(merged, "1d")) == 1 and len(window(merged[:0], "1y")) == 0
@@ -0,0 +1,74 @@
+from prometheus_client import REGISTRY
+
+from app.utils import prompts
+
+
+TEMPLATE = "Analyze {ticker}:\n\n{news}\n\nBe concise."
+
+
+def _ratio_count(node):
+    return REGISTRY.get_sample_value("prompt_compression_ratio_count", {"node": node}) or 0.0
+
+
+def test_near_duplicate_news_across_sources_is_kept_once():
+    items = (
+        prompts.split_items("Apple shares rise on upbeat iPhone guidance", "tavily")
+        + prompts.split_items("1719568800 - Apple shares rise on upbeat iPhone guidance: Reuters report", "finnhub")
+        + prompts.split_items("2024-06-28T10:00:00Z - Apple Shares Rise On Upbeat iPhone Guidance\nFed holds rates", "newsapi")
+    )
+    kept = prompts.dedupe(items)
+    assert kept == [
+        "[finnhub] 1719568800 - Apple shares rise on upbeat iPhone guidance: Reuters report",
+        "[newsapi] Fed holds rates",
+    ]
+
+
+def test_compress_keeps_relevant_sentences_in_order_within_budget():
+    filler = " ".join(f"Unrelated filler sentence number {word}." for word in ["one", "two", "three", "four"] * 10)
+    text = f"Intro line. {filler}\nAAPL revenue grew 8% on services. Weather was mild today."
+    out = prompts.compress(text, budget=30, keywords=["AAPL", "revenue"])
+
+    assert prompts.count_tokens(out) <= 30
+    assert "AAPL revenue grew 8% on services." in out
+    assert out.index("Intro line.") < out.index("AAPL revenue")
+    assert prompts.compress("short", budget=30) == "short"
+
+
+def test_compress_truncates_a_sentence_larger_than_the_budget():
+    text = "AAPL " + " ".join(f"segment{i} revenue" for i in range(200)) + "."
+    out = prompts.compress(text, budget=20, keywords=["AAPL"])
+    assert out.startswith("AAPL segment0 revenue")
+    assert 0 < prompts.count_tokens(out) <= 20
+    assert text.startswith(out)
+
+
+def test_gemini_is_counted_by_length_not_with_a_gpt_encoding():
+    text = "Revenue grew 12% year over year."
+    assert prompts.count_tokens(text, "gemini-2.0-flash") == -(-len(text) // 4)
+    assert prompts._encoding("gemini-2.0-flash") is None
+
+
+def test_build_prompt_is_unchanged_under_budget():
+    before = _ratio_count("test_small")
+    prompt = prompts.build_prompt("test_small", "", TEMPLATE, fixed={"ticker": "AAPL"},
+                                  flexible={"news": "One story."}, budget=1000)
+    assert prompt == TEMPLATE.format(ticker="AAPL", news="One story.")
+    assert _ratio_count("test_small") == before + 1
+
+
+def test_build_prompt_fits_budget_and_records_compression():
+    stories = [" ".join(f"topic{i}x{k}" for k in range(6)) + " hurt margins." for i in range(200)]
+    news = [f"[tavily] {story}" for story in stories] + [f"[newsapi] {story}" for story in stories]
+    prompt = prompts.build_prompt("test_big", "", TEMPLATE, fixed={"ticker": "AAPL"},
+                                  flexible={"news": news}, keywords=["margins"], budget=300)
+
+    assert prompts.count_tokens(prompt) <= 300
+    assert prompt.startswith("Analyze AAPL:") and prompt.endswith("Be concise.")
+    assert "[newsapi]" not in prompt  # duplicates of the tavily stories
+    ratio_sum = REGISTRY.get_sample_value("prompt_compression_ratio_sum", {"node": "test_big"})
+    assert 0 < ratio_sum < 0.2
+
+
+def test_budgets_come_from_config():
+    assert prompts.budget_for("analyze") > 0
+    assert prompts.budget_for("infer_ticker") is None
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.utils import providers
+
+
+def test_provider_is_built_once_on_first_use():
+    built = []
+
+    class Client:
+        model = "fake"
+
+    providers.register("test-client", lambda: built.append(1) or Client())
+    proxy = providers.LazyProvider("test-client")
+    assert not built
+    assert not hasattr(proxy, "__self__")
+    assert not built
+
+    assert proxy.model == "fake"
+    assert proxy.model == "fake"
+    assert built == [1]
+
+    providers.reset("test-client")
+    assert proxy.model == "fake"
+    assert built == [1, 1]
+
+
+def test_importing_graph_and_ui_skips_heavy_dependencies():
+    heavy = ["gradio", "yfinance", "matplotlib", "langchain_google_genai", "langchain_groq"]
+    code = (
+        "import sys, app.graph.builder, app.ui.gradio_app, app.batch; "
+        f"print([m for m in {heavy!r} if m in sys.modules])"
+    )
+    root = Path(__file__).resolve().parents[1]
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, env={**os.environ, "PYTHONPATH": str(root)},
+        capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == "[]"
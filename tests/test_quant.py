@@ -0,0 +1,114 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.utils.market_data as md
+from app.utils import quant
+from app.utils.ohlcv import OHLCVStore, to_bars
+
+
+def _bars(closes, end="2024-06-28"):
+    index = pd.bdate_range(end=end, periods=len(closes))
+    closes = np.asarray(closes, dtype=float)
+    return to_bars(pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 1.0}, index=index))
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(7)
+    index_returns = rng.normal(0.0004, 0.01, 260)
+    stock_returns = 1.3 * index_returns + rng.normal(0, 0.004, 260)
+    return _bars(100 * np.exp(np.cumsum(stock_returns))), _bars(400 * np.exp(np.cumsum(index_returns)))
+
+
+def test_metrics_match_reference_pandas_computations(market):
+    stock, index = market
+    m = quant.compute_metrics({"AAPL": stock}, index)["AAPL"]
+    close = pd.Series(stock["close"])
+    log_returns = np.log(close).diff().dropna()
+    index_returns = np.log(pd.Series(index["close"])).diff().dropna()
+
+    assert m["as_of"] == "2024-06-28"
+    assert m["price"] == pytest.approx(close.iloc[-1])
+    assert m["volatility"] == pytest.approx(log_returns.std() * math.sqrt(252))
+    assert m["max_drawdown"] == pytest.approx((close / close.cummax() - 1).min())
+    assert m["beta"] == pytest.approx(np.cov(log_returns, index_returns)[0, 1] / index_returns.var())
+    assert m["sma_50"] == pytest.approx(close.tail(50).mean())
+    assert m["sma_200"] == pytest.approx(close.tail(200).mean())
+
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    assert m["rsi_14"] == pytest.approx((100 - 100 / (1 + gain / loss)).iloc[-1], rel=1e-4)
+
+    dates = pd.DatetimeIndex(stock["ts"])
+    month_start = close[dates >= dates[-1] - pd.Timedelta(days=30)].iloc[0]
+    assert m["return_1mo"] == pytest.approx(close.iloc[-1] / month_start - 1)
+
+
+def test_batch_aligns_tickers_with_different_histories(market):
+    stock, index = market
+    short = _bars([10.0, 11.0, 12.0], end="2024-06-26")
+    out = quant.compute_metrics({"AAPL": stock, "NEW": short}, index)
+
+    assert out["AAPL"] == quant.compute_metrics({"AAPL": stock}, index)["AAPL"]
+    # Carried forward to the common last date; too short for long-window metrics.
+    assert out["NEW"]["price"] == 12.0
+    assert out["NEW"]["return_1mo"] != out["NEW"]["return_1mo"]  # NaN
+    assert math.isnan(out["NEW"]["sma_50"]) and math.isnan(out["NEW"]["rsi_14"])
+
+
+def test_format_block_is_compact_and_skips_missing_values():
+    metrics = {"as_of": "2024-06-28", "price": 190.0, "return_1mo": 0.05, "return_1y": float("nan"),
+               "volatility": 0.25, "beta": 1.2, "sma_50": float("nan"), "rsi_14": 61.2,
+               "valuation": quant.valuation({"trailingPE": 29.5, "marketCap": 2.9e12, "sector": "Tech",
+                                             "dividendYield": None, "profitMargins": 0.26})}
+    block = quant.format_block("AAPL", metrics, benchmark="SPY")
+
+    assert block.splitlines() == [
+        "AAPL metrics (as of 2024-06-28)",
+        "price 190.00 | return 1mo +5.0%",
+        "volatility 25.0% | beta vs SPY 1.20",
+        "RSI14 61",
+        "mcap 2.90T | P/E 29.50 | net margin 26.0%",
+    ]
+    assert "nan" not in block
+
+
+def test_valuation_uses_yahoo_units():
+    # Shapes as yfinance returns them for AAPL: yield already in percent, D/E as a percentage.
+    info = {"dividendYield": 0.44, "debtToEquity": 154.49, "profitMargins": 0.2397,
+            "returnOnEquity": 1.5081, "revenueGrowth": 0.051, "trailingPE": 34.7}
+    ratios = quant.valuation(info)
+    assert ratios["dividendYield"] == 0.44
+    assert ratios["debtToEquity"] == pytest.approx(1.5449)
+    assert ratios["profitMargins"] == pytest.approx(23.97)
+
+    line = quant.format_block("AAPL", {"valuation": ratios}).splitlines()[-1]
+    assert line == "P/E 34.70 | div yield 0.4% | net margin 24.0% | ROE 150.8% | D/E 1.54 | rev growth 5.1%"
+
+
+def test_compute_many_loads_all_tickers_in_one_download(tmp_path, monkeypatch):
+    md.clear_caches()
+    monkeypatch.setattr(md, "_store", OHLCVStore(str(tmp_path), fetch=md._fetch_bars))
+    monkeypatch.setattr(md._history_batcher, "window", 0.05, raising=True)
+    calls, lock = [], threading.Lock()
+
+    def fake_download(tickers, period=None, interval="1d", **_):
+        with lock:
+            calls.append(sorted(tickers))
+        frame = pd.DataFrame(index=pd.bdate_range(end="2024-06-28", periods=60))
+        return pd.concat({t: frame.assign(Close=np.linspace(50, 60, 60)) for t in tickers}, axis=1)
+
+    monkeypatch.setattr(md.yf, "download", fake_download, raising=True)
+    monkeypatch.setattr(md, "_fetch_info", lambda ticker: {"symbol": ticker, "trailingPE": 20.0})
+
+    out = quant.compute_many(["aapl", "msft"], benchmark="SPY")
+    assert calls == [["AAPL", "MSFT", "SPY"]]
+    assert set(out) == {"AAPL", "MSFT"}
+    assert out["MSFT"]["price"] == pytest.approx(60.0)
+    assert out["AAPL"]["beta"] == pytest.approx(1.0)
+    assert out["AAPL"]["valuation"] == {"trailingPE": 20.0}
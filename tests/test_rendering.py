@@ -0,0 +1,32 @@
+import markdown
+
+from app.ui.rendering import IncrementalMarkdown
+
+
+TEXT = (
+    "## Outlook\n\nRevenue grew **12%** year over year.\n\n"
+    "1. Buy on dips\n\n2. Hold core position\n\n"
+    "```\ncode block\n\nstill code\n```\n\nFinal paragraph."
+)
+
+
+def feed_in_chunks(text: str, size: int) -> str:
+    renderer = IncrementalMarkdown()
+    html = ""
+    for i in range(0, len(text), size):
+        html = renderer.feed(text[i:i + size])
+    return html
+
+
+def test_incremental_render_matches_full_render_text():
+    html = feed_in_chunks(TEXT, 3)
+    for fragment in ("<h2>Outlook</h2>", "<strong>12%</strong>", "Final paragraph.", "still code"):
+        assert fragment in html
+    assert html.count("<ol>") == markdown.markdown(TEXT).count("<ol>")
+
+
+def test_incremental_render_caches_finished_blocks():
+    renderer = IncrementalMarkdown()
+    renderer.feed("First paragraph.\n\nSecond")
+    assert renderer._done_html == ["<p>First paragraph.</p>"]
+    assert renderer._pending == "Second"
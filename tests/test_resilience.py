@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from app.utils import resilience
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BACKOFF", 0.0)
+    resilience.reset()
+    yield
+    resilience.reset()
+
+
+def test_deadline_bounds_a_hung_call():
+    start = time.monotonic()
+    with pytest.raises(resilience.DeadlineExceeded):
+        resilience.call("test-hang", lambda: time.sleep(2), timeout=0.1, retries=0)
+    assert time.monotonic() - start < 0.5
+
+
+def test_transient_failures_are_retried():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert resilience.call("test-retry", flaky, retries=2) == "ok"
+    assert len(attempts) == 3
+
+
+def test_non_transient_errors_are_not_retried():
+    attempts = []
+
+    def bad():
+        attempts.append(1)
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        resilience.call("test-noretry", bad, retries=2)
+    assert len(attempts) == 1
+    assert resilience.get_breaker("test-noretry").state == resilience.CLOSED
+
+
+def test_breaker_opens_and_serves_last_good_value():
+    healthy = [True]
+
+    def fetch():
+        if not healthy[0]:
+            raise TimeoutError("down")
+        return "fresh"
+
+    assert resilience.call("test-breaker", fetch, retries=0, fallback_key="k") == "fresh"
+    healthy[0] = False
+    breaker = resilience.get_breaker("test-breaker")
+    for _ in range(breaker.failure_threshold):
+        assert resilience.call("test-breaker", fetch, retries=0, fallback_key="k") == "fresh"
+    assert breaker.state == resilience.OPEN
+
+    with pytest.raises(resilience.CircuitOpenError):
+        resilience.call("test-breaker", fetch, retries=0)
+
+
+def test_breaker_half_opens_after_reset_timeout():
+    breaker = resilience.CircuitBreaker("test-half-open", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+
+
+def test_slow_call_is_hedged_past_p95():
+    window = resilience._latency_window("test-hedge")
+    for _ in range(50):
+        window.add(0.01)
+    calls = []
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(1.0 if first else 0.01)
+        return "slow" if first else "hedged"
+
+    start = time.monotonic()
+    assert resilience.call("test-hedge", fetch, hedge=True) == "hedged"
+    assert time.monotonic() - start < 0.5
+    assert len(calls) == 2
@@ -0,0 +1,38 @@
+from app.utils.symbols import SymbolIndex
+
+
+def make_index():
+    entries = [
+        ("AAPL", "Apple Inc."),
+        ("META", "Meta Platforms Inc."),
+        ("MSFT", "Microsoft Corporation"),
+        ("JNJ", "Johnson & Johnson"),
+        ("GS", "Goldman Sachs Group Inc."),
+    ]
+    return SymbolIndex(entries, {"FB": "META"})
+
+
+def test_lookup_exact_symbol_name_and_alias():
+    index = make_index()
+    assert index.lookup("aapl").symbol == "AAPL"
+    assert index.lookup("Apple").kind == "name"
+    assert index.lookup("johnson and johnson").symbol == "JNJ"
+    match = index.lookup("FB")
+    assert match.symbol == "META" and match.kind == "alias"
+
+
+def test_lookup_prefix():
+    match = make_index().lookup("Goldman")
+    assert match.symbol == "GS" and match.kind == "prefix"
+
+
+def test_lookup_fuzzy_typos():
+    index = make_index()
+    assert index.lookup("aaplee").symbol == "AAPL"
+    match = index.lookup("microsft")
+    assert match.symbol == "MSFT" and match.confidence >= 0.8
+
+
+def test_lookup_unrelated_query_has_low_confidence():
+    match = make_index().lookup("invest in renewable energy")
+    assert match is None or match.confidence < 0.8
@@ -0,0 +1,106 @@
+import contextvars
+import json
+import threading
+
+from app.observability import tracing
+
+
+def read_spans(path):
+    tracing.flush()
+    return {s["name"]: s for s in map(json.loads, path.read_text().splitlines())}
+
+
+def test_nested_spans_share_trace_and_link_parents(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure_tracing(tracing.FileExporter(str(path)))
+    try:
+        with tracing.span("query", new_trace=True, user_input="Apple"):
+            with tracing.span("node.crawl", ticker="AAPL"):
+                ctx = contextvars.copy_context()
+
+                def work():
+                    with tracing.span("source.newsapi"):
+                        tracing.set_attributes(cache_hit=False, retries=0)
+
+                thread = threading.Thread(target=ctx.run, args=(work,))
+                thread.start()
+                thread.join()
+        spans = read_spans(path)
+    finally:
+        tracing.configure_tracing(None)
+
+    query, node, source = spans["query"], spans["node.crawl"], spans["source.newsapi"]
+    assert query["parent_id"] is None
+    assert node["parent_id"] == query["span_id"]
+    assert source["parent_id"] == node["span_id"]
+    assert len({query["trace_id"], node["trace_id"], source["trace_id"]}) == 1
+    assert source["attributes"] == {"cache_hit": False, "retries": 0}
+    assert node["attributes"]["ticker"] == "AAPL"
+
+
+def test_span_records_errors(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure_tracing(tracing.FileExporter(str(path)))
+    try:
+        try:
+            with tracing.span("llm.groq", new_trace=True):
+                raise TimeoutError("slow")
+        except TimeoutError:
+            pass
+        spans = read_spans(path)
+    finally:
+        tracing.configure_tracing(None)
+    assert spans["llm.groq"]["error"] == "TimeoutError: slow"
+
+
+def test_span_is_noop_without_exporter():
+    tracing.configure_tracing(None)
+    with tracing.span("anything") as current:
+        tracing.set_attributes(ignored=True)
+    assert current is None
+
+
+def test_request_json_records_an_http_span_per_call(tmp_path, monkeypatch):
+    import httpx
+
+    from app.utils import http, resilience, tools
+
+    def handler(request):
+        return httpx.Response(200, json={"path": request.url.path})
+
+    monkeypatch.setattr(http, "get_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+    resilience.reset()
+    path = tmp_path / "traces.jsonl"
+    tracing.configure_tracing(tracing.FileExporter(str(path)))
+    try:
+        with tracing.span("source.finnhub", new_trace=True):
+            tools._finnhub("/company-news", None, {"symbol": "AAPL"})
+            tools._finnhub("/stock/metric", None, {"symbol": "AAPL"})
+        tracing.flush()
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+    finally:
+        tracing.configure_tracing(None)
+
+    calls = [s for s in spans if s["name"] == "http.finnhub"]
+    assert [s["attributes"]["url"].rsplit("/", 1)[-1] for s in calls] == ["company-news", "metric"]
+    parent = next(s for s in spans if s["name"] == "source.finnhub")
+    for call in calls:
+        assert call["parent_id"] == parent["span_id"]
+        assert call["attributes"]["status"] == 200
+        assert call["attributes"]["retries"] == 0
+
+
+def test_export_failures_are_logged(caplog):
+    class Broken:
+        def export(self, spans):
+            raise ConnectionError("collector down")
+
+    tracing.configure_tracing(Broken())
+    try:
+        with caplog.at_level("WARNING", logger=tracing.__name__):
+            with tracing.span("query", new_trace=True):
+                pass
+            tracing.flush()
+    finally:
+        tracing.configure_tracing(None)
+    assert "collector down" in caplog.text
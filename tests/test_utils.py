@@ -37,3 +37,7 @@ def test_extract_portfolio_section():
     assert "Suggested Portfolio Allocation" in section
     assert "5% AAPL" in section
 
+
+def test_extract_portfolio_allocations_skips_non_ticker_words():
+    text = "Put 5% of the portfolio to AAPL, 2-4% in MSFT and 3% of your savings into bonds."
+    assert extract_portfolio_allocations(text) == {"AAPL": 5.0, "MSFT": 3.0}